@@ -16,3 +16,27 @@ NGROK_PORT = int(os.environ.get("NGROK_PORT", "5000"))
 
 # Local status server port
 LOCAL_SERVER_PORT = int(os.environ.get("LOCAL_SERVER_PORT", "5000"))
+
+# Directory for recorded candles, trades and orderbooks (see market_recorder)
+MARKET_DATA_DIR = Path(os.environ.get("NOVA_MARKET_DATA_DIR", str(LOG_BASE_DIR / "market_data")))
+RECORD_MARKET_DATA = os.environ.get("NOVA_RECORD_MARKET", "False") == "True"
+
+# Upbit endpoints; point these at mock_upbit_server.py for local load tests
+UPBIT_API_URL = os.environ.get("UPBIT_API_URL", "https://api.upbit.com")
+UPBIT_WS_URL = os.environ.get("UPBIT_WS_URL", "wss://api.upbit.com/websocket/v1")
+
+# Event-driven trading loop: evaluate on a new bar or when the orderbook
+# imbalance moves by at least IMBALANCE_DELTA, and at least every
+# HEARTBEAT_SECONDS.  With EVENT_DRIVEN off the loop runs every POLL_SECONDS.
+EVENT_DRIVEN = os.environ.get("NOVA_EVENT_DRIVEN", "True") == "True"
+IMBALANCE_DELTA = float(os.environ.get("NOVA_IMBALANCE_DELTA", "0.1"))
+HEARTBEAT_SECONDS = float(os.environ.get("NOVA_HEARTBEAT_SECONDS", "30"))
+POLL_SECONDS = float(os.environ.get("NOVA_POLL_SECONDS", "2"))
+
+# Evaluate every strategy per tick and log the non-selected ones as
+# ``shadow_decisions`` events for counterfactual comparison.
+SHADOW_STRATEGIES = os.environ.get("NOVA_SHADOW_STRATEGIES", "True") == "True"
+
+# Seconds between LearningAgent state snapshots; changes in between are
+# appended to its journal.
+LEARNING_SNAPSHOT_SECONDS = float(os.environ.get("NOVA_LEARNING_SNAPSHOT_SECONDS", "300"))
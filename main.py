@@ -1,3 +1,5 @@
+import atexit
+import threading
 import time
 import os
 import sys
@@ -19,9 +21,16 @@ from agents.risk_manager import RiskManager
 from agents.emotion_axis import EmotionAxis
 from agents.logger_agent import LoggerAgent
 from agents.learning_agent import LearningAgent
+from agents.strategy_evaluator import IncrementalEvaluator
 from agents.missed_hold_tracker import track_failed_hold
 from agents.human_compare import HumanCompareAgent
-from agents.utils import get_upbit_candles, get_upbit_orderbook
+from agents.features import FeatureCache
+from agents.indicators import IndicatorEngine
+from agents.utils import get_upbit_orderbook
+from candle_feed import CandleFeed
+from local_orderbook import LocalOrderBook
+from price_feed_upbit_ws import UpbitWebSocket
+from market_snapshot import MarketSnapshot, SnapshotFetcher
 from status_server import start_status_server, update_state
 import json
 from pathlib import Path
@@ -31,7 +40,16 @@ from version import STRATEGY_VERSION
 import webbrowser
 import subprocess
 import psutil
-from config import UI_PATH
+from config import (
+    UI_PATH,
+    RECORD_MARKET_DATA,
+    EVENT_DRIVEN,
+    IMBALANCE_DELTA,
+    HEARTBEAT_SECONDS,
+    POLL_SECONDS,
+    SHADOW_STRATEGIES,
+)
+from market_recorder import MarketRecorder, set_recorder
 from nova_core import save_decision
 
 # Launch local React UI if built without reopening if already open
@@ -50,58 +68,286 @@ def is_ui_already_open() -> bool:
     return False
 
 
-if ui_file.exists() and not is_ui_already_open():
-    webbrowser.open(ui_url)
-else:
-    print("[✔] UI 이미 실행 중이거나 파일 없음 → 생략됨")
+def launch_ui() -> None:
+    """Open the React dashboard and the legacy HTML UI when available."""
+    if ui_file.exists() and not is_ui_already_open():
+        webbrowser.open(ui_url)
+    else:
+        print("[✔] UI 이미 실행 중이거나 파일 없음 → 생략됨")
 
-# Automatically open the legacy HTML UI if available
-if os.path.exists(UI_PATH):
-    subprocess.Popen(["start", str(UI_PATH)], shell=True)
+    # Automatically open the legacy HTML UI if available
+    if os.path.exists(UI_PATH):
+        subprocess.Popen(["start", str(UI_PATH)], shell=True)
 
 
 SYMBOL = "KRW-BTC"
+# Number of 1-minute closes handed to the indicator agents each tick
+CANDLE_COUNT = 20
 
 
 class TradingApp:
     """Main application that coordinates all agents."""
 
-    def __init__(self):
-        self.sentiment_agent = MarketSentimentAgent()
+    def __init__(
+        self,
+        symbol: str = SYMBOL,
+        *,
+        shared: dict | None = None,
+        balance: float | None = None,
+        publish: bool = True,
+        sentiment_agent: MarketSentimentAgent | None = None,
+        entry_agent: EntryDecisionAgent | None = None,
+    ):
+        """Create the agent stack for ``symbol``.
+
+        ``shared`` may provide ``position_manager``, ``risk``, ``logger``,
+        ``learning_agent`` and ``human_compare`` instances reused across
+        several apps.  ``sentiment_agent`` and ``entry_agent`` replace the
+        default per-app instances.  With ``publish`` disabled the app skips
+        the status server, decision file and log analysis side effects.
+        """
+        shared = shared or {}
+        self.symbol = symbol
+        self.publish = publish
+        self.sentiment_agent = sentiment_agent or MarketSentimentAgent()
         self.strategy_selector = StrategySelector()
-        self.entry_agent = EntryDecisionAgent()
-        self.position_manager = PositionManager()
-        self.risk = RiskManager(max_risk_pct=0.1)
+        self.entry_agent = entry_agent or EntryDecisionAgent()
+        self.position_manager = shared.get("position_manager") or PositionManager()
+        self.risk = shared.get("risk") or RiskManager(max_risk_pct=0.1)
         self.emotion_axis = EmotionAxis()
-        self.logger = LoggerAgent()
-        self.learning_agent = LearningAgent()
-        self.human_compare = HumanCompareAgent()
+        self.logger = shared.get("logger") or LoggerAgent()
+        self.learning_agent = shared.get("learning_agent") or LearningAgent()
+        self.human_compare = shared.get("human_compare") or HumanCompareAgent()
+        self.candle_feed = CandleFeed(symbol)
+        self.order_book = LocalOrderBook(symbol)
+        self.indicators = IndicatorEngine(symbol)
+        self.features = FeatureCache(symbol, self.indicators)
+        self.snapshot_fetcher = SnapshotFetcher(
+            symbol,
+            self.candle_feed.window,
+            self._orderbook_source,
+            candle_count=CANDLE_COUNT,
+            timeframe_source=self.candle_feed.timeframe_closes,
+        )
         self.positions = []
         self.last_signal = "HOLD"
         self.current_price = 0.0
-        self.balance = float(INITIAL_CAPITAL)
+        self.balance = float(INITIAL_CAPITAL if balance is None else balance)
         self.last_trade_time = None
         self.trade_history = []
-
-    def loop(self):
+        self.performance = IncrementalEvaluator()
+        self.imbalance_delta = IMBALANCE_DELTA
+        self.heartbeat = HEARTBEAT_SECONDS
+        self.shadow_strategies = SHADOW_STRATEGIES
+        self.eval_stats = {"evaluated": 0, "skipped": 0}
+        self._wake = threading.Event()
+        self._last_bar = None
+        self._last_closes = None
+        self._last_imbalance = 0.0
+        self._last_eval_at = None
+
+    def start_streams(self) -> None:
+        """Subscribe to trades and orderbook updates on one WebSocket."""
+        socket = UpbitWebSocket(
+            self.symbol,
+            types=("trade", "orderbook"),
+            coalesce=True,
+            verbose=False,
+        )
+        socket.add_listener(self.order_book.on_message)
+        self.candle_feed.start(socket)
+        socket.add_listener(self._on_market_event)
+        self.seed_indicators()
+
+    def seed_indicators(self) -> None:
+        """Warm the indicator engine up from the backfilled candle history."""
+        history = self.candle_feed.history()
+        if history.closes:
+            self.indicators.reset(history.closes, history.times)
+
+    def _orderbook_source(self, symbol: str) -> dict:
+        """Return the streamed book, falling back to REST when it is stale."""
+        if self.order_book.ready:
+            return self.order_book.to_dict()
+        return get_upbit_orderbook(symbol)
+
+    # ------------------------------------------------------------------
+    def _on_market_event(self, data: dict) -> None:
+        """WebSocket listener waking :meth:`run` on material changes."""
+        msg_type = data.get("type")
+        if msg_type == "reconnect":
+            self._wake.set()
+        elif msg_type == "trade":
+            ts = data.get("trade_timestamp") or data.get("timestamp")
+            if ts is None:
+                return
+            minute = int(ts) // 1000 // 60 * 60
+            if self._last_bar is None or minute > self._last_bar:
+                self._wake.set()
+        elif msg_type == "orderbook":
+            if abs(self.order_book.imbalance() - self._last_imbalance) >= self.imbalance_delta:
+                self._wake.set()
+
+    @staticmethod
+    def _imbalance(order_book) -> float:
+        imbalance = order_book.get("imbalance")
+        if imbalance is not None:
+            return imbalance
+        bid = order_book.get("bid_volume") or 0.0
+        ask = order_book.get("ask_volume") or 0.0
+        total = bid + ask
+        return (bid - ask) / total if total > 0 else 0.0
+
+    def evaluation_reason(self, snapshot: MarketSnapshot, now: float | None = None) -> str | None:
+        """Return why ``snapshot`` should be evaluated, or ``None`` to skip it."""
+        now = time.monotonic() if now is None else now
+        if self._last_eval_at is None:
+            return "start"
+        if snapshot.bar_times:
+            if snapshot.bar_times[-1] != self._last_bar:
+                return "new_bar"
+        elif snapshot.closes != self._last_closes:
+            return "candles"
+        if abs(self._imbalance(snapshot.order_book) - self._last_imbalance) >= self.imbalance_delta:
+            return "orderbook"
+        if now - self._last_eval_at >= self.heartbeat:
+            return "heartbeat"
+        return None
+
+    def _mark_evaluated(self, snapshot: MarketSnapshot, now: float | None = None) -> None:
+        self._last_bar = snapshot.bar_times[-1] if snapshot.bar_times else None
+        self._last_closes = snapshot.closes
+        self._last_imbalance = self._imbalance(snapshot.order_book)
+        self._last_eval_at = time.monotonic() if now is None else now
+
+    def step(self, snapshot: MarketSnapshot, now: float | None = None) -> str | None:
+        """Evaluate ``snapshot`` if it carries a new event; return the reason."""
+        reason = self.evaluation_reason(snapshot, now)
+        if reason is None:
+            self.eval_stats["skipped"] += 1
+            return None
+        self.loop(snapshot)
+        self._mark_evaluated(snapshot, now)
+        self.eval_stats["evaluated"] += 1
+        return reason
+
+    def run(self, *, on_snapshot=None, event_driven: bool = EVENT_DRIVEN, stop: threading.Event | None = None) -> None:
+        """Run the trading loop until ``stop`` is set.
+
+        In event-driven mode the loop sleeps until a new bar starts, the
+        streamed orderbook imbalance moves by ``imbalance_delta`` or the
+        heartbeat is due, and skips evaluation when nothing changed.  Without
+        a stream the snapshot is polled every ``POLL_SECONDS`` and gated the
+        same way.  ``on_snapshot`` is called with every fetched snapshot.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            # cleared before fetching so events landing after this point
+            # wake the next wait instead of being discarded
+            self._wake.clear()
+            snapshot = self.fetch_snapshot()
+            if snapshot is None:
+                stop.wait(POLL_SECONDS)
+                continue
+            if on_snapshot is not None:
+                on_snapshot(self, snapshot)
+            if not event_driven:
+                self.loop(snapshot)
+                stop.wait(POLL_SECONDS)
+                continue
+            self.step(snapshot)
+            if self.candle_feed.streaming:
+                elapsed = time.monotonic() - (self._last_eval_at or 0.0)
+                self._wake.wait(max(self.heartbeat - elapsed, 0.05))
+            else:
+                stop.wait(POLL_SECONDS)
+
+    def fetch_snapshot(self) -> MarketSnapshot | None:
+        """Fetch this tick's candles and orderbook concurrently."""
         try:
-            candle_data = get_upbit_candles(SYMBOL, 20)
-            order_book = get_upbit_orderbook(SYMBOL)
+            return self.snapshot_fetcher.fetch()
         except Exception as e:
             print(f"시장 데이터를 가져오지 못했습니다: {e}")
+            return None
+
+    def book_state(self, snapshot: MarketSnapshot) -> dict:
+        """Return the orderbook fields for :func:`update_state`.
+
+        While the stream is live the local book is passed through so the
+        status server reads its running totals; otherwise the snapshot's
+        levels are sent.
+        """
+        if self.order_book.ready:
+            return {"order_book": self.order_book}
+        book = snapshot.order_book
+        return {
+            "bids": snapshot.bid_levels(),
+            "asks": snapshot.ask_levels(),
+            "bid_volume": book.get("bid_volume"),
+            "ask_volume": book.get("ask_volume"),
+            "orderbook_imbalance": self._imbalance(book),
+        }
+
+    def _track_excursions(self) -> None:
+        """Update each open position's best and worst return so far."""
+        for pos in self.positions:
+            change = (self.current_price - pos["entry_price"]) / pos["entry_price"]
+            pos["max_profit"] = max(pos.get("max_profit", 0.0), change)
+            pos["max_loss"] = min(pos.get("max_loss", 0.0), change)
+
+    def _record_closed(self, pos: dict, strategy: str, return_rate: float) -> None:
+        """Record a closed position in the trade history, metrics and learning state."""
+        self.trade_history.append({"strategy": strategy, "return": return_rate})
+        self.performance.add(
+            return_rate,
+            {
+                "market_phase": self.strategy_selector.market_phase,
+                "max_profit": pos.get("max_profit", 0.0),
+                "max_loss": pos.get("max_loss", 0.0),
+            },
+        )
+        self.learning_agent.record_trade(strategy, return_rate)
+
+    def log_shadow_decisions(self, selected: str, decisions: dict) -> None:
+        """Log the non-selected strategies of one tick as a single compact event."""
+        shadows = {}
+        for name, decision in decisions.items():
+            if name == selected:
+                continue
+            entry = [decision["signal"], decision["conflict_index"]]
+            if decision["confidence"] is not None:
+                entry.append(round(decision["confidence"], 4))
+            shadows[name] = entry
+        if not shadows:
+            return
+        self.logger.log_event({
+            "type": "shadow_decisions",
+            "symbol": self.symbol,
+            "price": self.current_price,
+            "selected": selected,
+            "score_percent": self.entry_agent.last_score_percent,
+            "decisions": shadows,
+        })
+
+    def loop(self, snapshot: MarketSnapshot | None = None):
+        if snapshot is None:
+            snapshot = self.fetch_snapshot()
+            if snapshot is None:
+                return
+        candle_data = snapshot.closes
+        order_book = snapshot.order_book
+        if not candle_data:
             return
 
         self.current_price = candle_data[-1]
+        self._track_excursions()
+        self.indicators.sync(candle_data, snapshot.bar_times, history=self.candle_feed.history)
+        features = self.features.get(candle_data, order_book, snapshot.bar_times)
 
         # recent volatility for risk management
-        if len(candle_data) >= 20:
-            mean20 = sum(candle_data[-20:]) / 20
-            var20 = sum((c - mean20) ** 2 for c in candle_data[-20:]) / 20
-            volatility = (var20 ** 0.5) / mean20 if mean20 else 0.0
-        else:
-            volatility = 0.0
+        volatility = features.candle.volatility
 
-        sentiment = self.sentiment_agent.update(candle_data, order_book, None)
+        sentiment = self.sentiment_agent.update(candle_data, order_book, None, features=features)
         rsi = self.sentiment_agent.rsi
         bb_score = self.sentiment_agent.bb_score
         ts_score = self.sentiment_agent.ts_score
@@ -123,21 +369,37 @@ class TradingApp:
                 self.current_price - first["entry_price"]
             ) / first["entry_price"]
 
-        result = self.entry_agent.evaluate(
-            (strategy, params),
-            candle_data,
-            order_status,
-            order_book,
-            logger=self.logger,
-            symbol=SYMBOL,
-            emotion_index=self.sentiment_agent.applied_emotion_index,
-        )
-        if isinstance(result, dict):
-            signal = result.get("signal")
-            confidence = result.get("confidence")
+        if self.shadow_strategies:
+            decisions = self.entry_agent.evaluate_all(
+                candle_data,
+                order_status,
+                order_book,
+                selected=strategy,
+                logger=self.logger,
+                symbol=self.symbol,
+                emotion_index=self.sentiment_agent.applied_emotion_index,
+                features=features,
+            )
+            signal = decisions[strategy]["signal"]
+            confidence = decisions[strategy]["confidence"]
+            self.log_shadow_decisions(strategy, decisions)
         else:
-            signal = result
-            confidence = None
+            result = self.entry_agent.evaluate(
+                (strategy, params),
+                candle_data,
+                order_status,
+                order_book,
+                logger=self.logger,
+                symbol=self.symbol,
+                emotion_index=self.sentiment_agent.applied_emotion_index,
+                features=features,
+            )
+            if isinstance(result, dict):
+                signal = result.get("signal")
+                confidence = result.get("confidence")
+            else:
+                signal = result
+                confidence = None
         score_percent = self.entry_agent.last_score_percent
         self.last_signal = signal
         decision_info = {
@@ -146,7 +408,7 @@ class TradingApp:
             "action": signal,
         }
         if signal == "HOLD":
-            track_failed_hold(decision_info, self.current_price, SYMBOL)
+            track_failed_hold(decision_info, self.current_price, self.symbol)
 
         # update weights based on signal quality
         self.learning_agent.adjust_from_signal(strategy, score_percent, confidence)
@@ -179,15 +441,16 @@ class TradingApp:
             "classified_emotion": classified_emotion,
             "market_emotion_index": emotion_index,
         }
-        update_state(decision=decision_data)
-        save_decision(
-            signal,
-            reason,
-            human_action,
-            score_vs_human,
-            classified_emotion=classified_emotion,
-            market_emotion_index=emotion_index,
-        )
+        if self.publish:
+            update_state(decision=decision_data)
+            save_decision(
+                signal,
+                reason,
+                human_action,
+                score_vs_human,
+                classified_emotion=classified_emotion,
+                market_emotion_index=emotion_index,
+            )
 
         allow_entry, entry_reason = self.entry_agent.decide_entry(signal, reason, score_percent)
 
@@ -198,21 +461,21 @@ class TradingApp:
             if order_amount > 0:
                 qty = order_amount / self.current_price
                 self.balance -= order_amount
-                self.positions.append({"entry_price": self.current_price, "quantity": qty, "symbol": SYMBOL})
+                self.positions.append({"entry_price": self.current_price, "quantity": qty, "symbol": self.symbol})
             self.position_manager.record_trade("BUY")
             self.emotion_axis.record_result(True)
             ts = self.logger.log(
                 "EntryDecisionAgent",
                 "BUY",
                 price=self.current_price,
-                symbol=SYMBOL,
+                symbol=self.symbol,
                 return_rate=0.0,
             )
             if ts:
                 self.last_trade_time = ts
             self.logger.log_event({
                 "type": "entry_approved",
-                "symbol": SYMBOL,
+                "symbol": self.symbol,
                 "confidence": confidence,
                 "score_percent": score_percent,
                 "reason": entry_reason,
@@ -234,8 +497,7 @@ class TradingApp:
             )
             if ts:
                 self.last_trade_time = ts
-            self.trade_history.append({"strategy": strategy, "return": return_rate})
-            self.learning_agent.record_trade(strategy, return_rate)
+            self._record_closed(pos, strategy, return_rate)
         else:
             if signal == "BUY":
                 self.emotion_axis.record_result(False)
@@ -244,7 +506,7 @@ class TradingApp:
             if signal == "BUY":
                 self.logger.log_event({
                     "type": "entry_denied",
-                    "symbol": SYMBOL,
+                    "symbol": self.symbol,
                     "reason": entry_reason,
                     "confidence": confidence,
                     "score_percent": score_percent,
@@ -265,6 +527,7 @@ class TradingApp:
                     strategy=strategy,
                     return_rate=return_rate,
                 )
+                self._record_closed(pos, strategy, return_rate)
                 continue
 
             decision = self.position_manager.update(
@@ -285,8 +548,7 @@ class TradingApp:
                 )
                 if ts:
                     self.last_trade_time = ts
-                self.trade_history.append({"strategy": strategy, "return": return_rate})
-                self.learning_agent.record_trade(strategy, return_rate)
+                self._record_closed(pos, strategy, return_rate)
                 to_remove.append(pos)
         for pos in to_remove:
             if pos in self.positions:
@@ -304,14 +566,14 @@ class TradingApp:
                 "return_rate": return_rate,
             }
 
+        self.learning_agent.update()
+        if not self.publish:
+            return
+
         logs = load_logs("log")
         stats = analyze_logs(logs)
         cumulative_return = stats.get("cumulative_return", 0.0)
 
-        self.learning_agent.update()
-        bids = [[b["price"], b["volume"]] for b in order_book.get("bids", []) if b.get("volume")]
-        asks = [[a["price"], a["volume"]] for a in order_book.get("asks", []) if a.get("volume")]
-
         update_state(
             sentiment=sentiment,
             classified_emotion=classified_emotion,
@@ -326,10 +588,6 @@ class TradingApp:
             balance=self.balance,
             weight=weight,
             weights=self.learning_agent.weights,
-            bid_volume=order_book.get("bid_volume"),
-            ask_volume=order_book.get("ask_volume"),
-            bids=bids,
-            asks=asks,
             positions=self.positions,
             orderbook_score=confidence,
             rsi=rsi,
@@ -342,30 +600,36 @@ class TradingApp:
             last_trade_time=self.last_trade_time,
             buy_count=self.position_manager.total_buys,
             sell_count=self.position_manager.total_sells,
+            **self.book_state(snapshot),
         )
 
 
+def publish_market_state(app: TradingApp, snapshot: MarketSnapshot) -> None:
+    """Push the latest book and agent state to the status server."""
+    update_state(
+        classified_emotion=app.sentiment_agent.classified_emotion,
+        emotion_index=app.sentiment_agent.applied_emotion_index,
+        buy_count=app.position_manager.total_buys,
+        sell_count=app.position_manager.total_sells,
+        nearest_failed=app.entry_agent.nearest_failed,
+        cooldown=app.emotion_axis.in_cooldown(),
+        strategy_mode=app.strategy_selector.strategy_mode,
+        feed_stats=app.candle_feed.socket.get_stats() if app.candle_feed.streaming else None,
+        eval_stats=dict(app.eval_stats),
+        **app.book_state(snapshot),
+    )
+
+
 if __name__ == "__main__":
+    launch_ui()
+    if RECORD_MARKET_DATA:
+        recorder = MarketRecorder()
+        set_recorder(recorder)
+        atexit.register(recorder.flush)
     app = TradingApp()
+    atexit.register(app.learning_agent.snapshot)
     # Launch the Flask status server in a background daemon thread so
     # that the trading loop can run uninterrupted.
     start_status_server(position_manager=app.position_manager, logger_agent=app.logger)
-    symbol = SYMBOL
-    while True:
-        orderbook = get_upbit_orderbook(symbol)
-        update_state(
-            bids=[[b["price"], b["volume"]] for b in orderbook.get("bids", []) if b.get("volume")],
-            asks=[[a["price"], a["volume"]] for a in orderbook.get("asks", []) if a.get("volume")],
-            bid_volume=orderbook.get("bid_volume"),
-            ask_volume=orderbook.get("ask_volume"),
-            classified_emotion=app.sentiment_agent.classified_emotion,
-            emotion_index=app.sentiment_agent.applied_emotion_index,
-            buy_count=app.position_manager.total_buys,
-            sell_count=app.position_manager.total_sells,
-            nearest_failed=app.entry_agent.nearest_failed,
-            cooldown=app.emotion_axis.in_cooldown(),
-            strategy_mode=app.strategy_selector.strategy_mode,
-        )
-        app.loop()
-        time.sleep(2)
-
+    app.start_streams()
+    app.run(on_snapshot=publish_market_state)
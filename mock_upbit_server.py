@@ -0,0 +1,548 @@
+"""Local stand-in for the Upbit quotation REST and WebSocket APIs.
+
+Serves ``/v1/candles/minutes/1``, ``/v1/orderbook``, ``/v1/ticker``,
+``/v1/market/all`` and ``/websocket/v1`` from synthetic random-walk or
+replayed candles, with configurable message rate, latency, 429 responses,
+per-second quotas and forced disconnects.  Point the bot at it with::
+
+    UPBIT_API_URL=http://127.0.0.1:8765 \\
+    UPBIT_WS_URL=ws://127.0.0.1:8765/websocket/v1 python main.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import queue
+import random
+import socket
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+BOOK_LEVELS = 15
+
+
+@dataclass
+class FaultConfig:
+    """Failure injection settings."""
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    quota_per_sec: Optional[int] = None
+    disconnect_every: Optional[float] = None
+
+
+class _Market:
+    def __init__(self, code: str, price: float, rng: random.Random, replay: Optional[Sequence[float]]) -> None:
+        self.code = code
+        self.price = price
+        self.prev_close = price
+        self.rng = rng
+        self.replay = list(replay) if replay else None
+        self.replay_pos = 0
+        self.candles: List[Dict[str, Any]] = []
+        self.sequential_id = 0
+        self.acc_volume = 0.0
+        self.acc_price = 0.0
+
+    def next_price(self, volatility: float) -> float:
+        if self.replay:
+            self.price = self.replay[self.replay_pos % len(self.replay)]
+            self.replay_pos += 1
+        else:
+            self.price = max(self.price * (1 + self.rng.gauss(0, volatility)), 1e-8)
+        return self.price
+
+
+def _candle_row(code: str, start: datetime, o: float, h: float, l: float, c: float, volume: float) -> Dict[str, Any]:
+    return {
+        "market": code,
+        "candle_date_time_utc": start.strftime("%Y-%m-%dT%H:%M:%S"),
+        "candle_date_time_kst": (start + timedelta(hours=9)).strftime("%Y-%m-%dT%H:%M:%S"),
+        "opening_price": o,
+        "high_price": h,
+        "low_price": l,
+        "trade_price": c,
+        "timestamp": int(start.replace(tzinfo=timezone.utc).timestamp() * 1000),
+        "candle_acc_trade_price": c * volume,
+        "candle_acc_trade_volume": volume,
+        "unit": 1,
+    }
+
+
+class MarketSimulator:
+    """Thread-safe synthetic (or replayed) market state for many codes."""
+
+    def __init__(
+        self,
+        markets: Sequence[str],
+        *,
+        price: float = 50_000_000.0,
+        volatility: float = 0.0005,
+        history: int = 200,
+        seed: int = 0,
+        replay: Optional[Dict[str, Sequence[float]]] = None,
+    ) -> None:
+        self.rng = random.Random(seed)
+        self.volatility = volatility
+        self.lock = threading.Lock()
+        self.markets: Dict[str, _Market] = {}
+        now = datetime.now(timezone.utc).replace(second=0, microsecond=0, tzinfo=None)
+        for code in markets:
+            m = _Market(code, price, random.Random(self.rng.random()), (replay or {}).get(code))
+            for i in range(history, 0, -1):
+                o = m.price
+                c = m.next_price(volatility * 4)
+                start = now - timedelta(minutes=i)
+                m.candles.append(_candle_row(code, start, o, max(o, c), min(o, c), c, self.rng.uniform(0.1, 5)))
+            m.candles.append(_candle_row(code, now, m.price, m.price, m.price, m.price, 0.0))
+            m.prev_close = m.price
+            self.markets[code] = m
+
+    # ------------------------------------------------------------------
+    def trade(self, code: str) -> Dict[str, Any]:
+        """Advance ``code`` by one trade and return the trade message."""
+        with self.lock:
+            m = self.markets[code]
+            price = m.next_price(self.volatility)
+            volume = m.rng.uniform(0.001, 0.5)
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            minute = now.replace(second=0, microsecond=0)
+            last = m.candles[-1]
+            if last["candle_date_time_utc"] != minute.strftime("%Y-%m-%dT%H:%M:%S"):
+                m.prev_close = last["trade_price"]
+                m.candles.append(_candle_row(code, minute, price, price, price, price, 0.0))
+                if len(m.candles) > 2000:
+                    del m.candles[:1000]
+                last = m.candles[-1]
+            last["high_price"] = max(last["high_price"], price)
+            last["low_price"] = min(last["low_price"], price)
+            last["trade_price"] = price
+            last["candle_acc_trade_volume"] += volume
+            last["candle_acc_trade_price"] += price * volume
+            m.acc_volume += volume
+            m.acc_price += price * volume
+            m.sequential_id += 1
+            ts = int(now.replace(tzinfo=timezone.utc).timestamp() * 1000)
+            return {
+                "type": "trade",
+                "code": code,
+                "timestamp": ts,
+                "trade_date": now.strftime("%Y-%m-%d"),
+                "trade_time": now.strftime("%H:%M:%S"),
+                "trade_timestamp": ts,
+                "trade_price": price,
+                "trade_volume": volume,
+                "ask_bid": "BID" if m.rng.random() < 0.5 else "ASK",
+                "prev_closing_price": m.prev_close,
+                "change": "RISE" if price > m.prev_close else "FALL" if price < m.prev_close else "EVEN",
+                "change_price": abs(price - m.prev_close),
+                "sequential_id": m.sequential_id,
+                "stream_type": "REALTIME",
+            }
+
+    def orderbook(self, code: str) -> Dict[str, Any]:
+        with self.lock:
+            m = self.markets[code]
+            tick = max(m.price * 0.0001, 1e-8)
+            skew = m.rng.uniform(-0.5, 0.5)
+            units = [
+                {
+                    "ask_price": m.price + tick * (i + 1),
+                    "bid_price": m.price - tick * (i + 1),
+                    "ask_size": m.rng.uniform(0.01, 2.0) * (1 - skew),
+                    "bid_size": m.rng.uniform(0.01, 2.0) * (1 + skew),
+                }
+                for i in range(BOOK_LEVELS)
+            ]
+        return {
+            "type": "orderbook",
+            "market": code,
+            "code": code,
+            "timestamp": int(time.time() * 1000),
+            "total_ask_size": sum(u["ask_size"] for u in units),
+            "total_bid_size": sum(u["bid_size"] for u in units),
+            "orderbook_units": units,
+            "stream_type": "REALTIME",
+        }
+
+    def ticker(self, code: str) -> Dict[str, Any]:
+        with self.lock:
+            m = self.markets[code]
+            now_ms = int(time.time() * 1000)
+            return {
+                "type": "ticker",
+                "market": code,
+                "code": code,
+                "trade_price": m.price,
+                "prev_closing_price": m.prev_close,
+                "signed_change_rate": (m.price - m.prev_close) / m.prev_close if m.prev_close else 0.0,
+                "trade_volume": 0.0,
+                "trade_timestamp": now_ms,
+                "timestamp": now_ms,
+                "acc_trade_price_24h": m.acc_price,
+                "acc_trade_volume_24h": m.acc_volume,
+            }
+
+    def candles(self, code: str, count: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.markets[code].candles[-count:]
+            return [dict(r) for r in reversed(rows)]
+
+
+class _QuotaTracker:
+    def __init__(self, limit: Optional[int]) -> None:
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.second = 0
+        self.counts: Dict[str, int] = {}
+
+    def take(self, group: str) -> Optional[int]:
+        """Return remaining requests this second, or ``-1`` when exhausted."""
+        if self.limit is None:
+            return None
+        with self.lock:
+            second = int(time.time())
+            if second != self.second:
+                self.second = second
+                self.counts = {}
+            used = self.counts.get(group, 0) + 1
+            self.counts[group] = used
+            return self.limit - used if used <= self.limit else -1
+
+
+# ----------------------------------------------------------------------
+def _ws_frame(payload: bytes, opcode: int = 0x2) -> bytes:
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 1 << 16:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    return header + payload
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            raise ConnectionError("client closed")
+        data += chunk
+    return data
+
+
+def _ws_read(sock: socket.socket) -> tuple:
+    b1, b2 = _recv_exact(sock, 2)
+    opcode = b1 & 0x0F
+    length = b2 & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _recv_exact(sock, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _recv_exact(sock, 8))[0]
+    mask = _recv_exact(sock, 4) if b2 & 0x80 else None
+    payload = _recv_exact(sock, length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class MockUpbitServer(ThreadingHTTPServer):
+    """HTTP + WebSocket server backed by a :class:`MarketSimulator`."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple,
+        simulator: MarketSimulator,
+        *,
+        rate: float = 10.0,
+        book_every: int = 5,
+        faults: Optional[FaultConfig] = None,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.sim = simulator
+        self.rate = rate
+        self.book_every = book_every
+        self.faults = faults or FaultConfig()
+        self.quota = _QuotaTracker(self.faults.quota_per_sec)
+        self.rng = random.Random(1)
+        self.counters = {"rest": 0, "rest_429": 0, "ws_messages": 0, "ws_disconnects": 0}
+        self._subscribers: List[tuple] = []
+        self._sub_lock = threading.Lock()
+        self._stopped = threading.Event()
+        threading.Thread(target=self._generate, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def ws_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"ws://{host}:{port}/websocket/v1"
+
+    def subscribe(self, codes: Sequence[str], types: Sequence[str]) -> queue.Queue:
+        q: queue.Queue = queue.Queue(maxsize=10_000)
+        with self._sub_lock:
+            self._subscribers.append((set(codes), set(types), q))
+        return q
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        with self._sub_lock:
+            self._subscribers = [s for s in self._subscribers if s[2] is not q]
+
+    def _publish(self, msg_type: str, code: str, message: Dict[str, Any]) -> None:
+        frame = None
+        with self._sub_lock:
+            subscribers = list(self._subscribers)
+        for codes, types, q in subscribers:
+            if code in codes and msg_type in types:
+                if frame is None:
+                    frame = _ws_frame(json.dumps(message).encode("utf-8"))
+                try:
+                    q.put_nowait(frame)
+                except queue.Full:
+                    pass
+
+    def _generate(self) -> None:
+        interval = 1.0 / self.rate if self.rate > 0 else 1.0
+        step = 0
+        next_at = time.perf_counter()
+        while not self._stopped.is_set():
+            step += 1
+            for code in list(self.sim.markets):
+                self._publish("trade", code, self.sim.trade(code))
+                if step % self.book_every == 0:
+                    self._publish("orderbook", code, self.sim.orderbook(code))
+                    self._publish("ticker", code, self.sim.ticker(code))
+            next_at += interval
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_at = time.perf_counter()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        super().shutdown()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: MockUpbitServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_: Any) -> None:  # keep the console quiet
+        pass
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server API
+        parsed = urlparse(self.path)
+        if parsed.path == "/websocket/v1" and self.headers.get("Upgrade", "").lower() == "websocket":
+            self._websocket()
+            return
+        self._rest(parsed.path, {k: v[-1] for k, v in parse_qs(parsed.query).items()})
+
+    # ------------------------------------------------------------------
+    def _rest(self, path: str, params: Dict[str, str]) -> None:
+        srv = self.server
+        faults = srv.faults
+        srv.counters["rest"] += 1
+        if faults.latency_ms or faults.latency_jitter_ms:
+            time.sleep(max(0.0, faults.latency_ms + srv.rng.uniform(-1, 1) * faults.latency_jitter_ms) / 1000)
+        group = path.strip("/").split("/")[1] if path.count("/") >= 2 else "default"
+        remaining = srv.quota.take(group)
+        if remaining == -1 or (faults.error_rate and srv.rng.random() < faults.error_rate):
+            srv.counters["rest_429"] += 1
+            self._send_json(429, {"error": {"name": "too_many_requests"}}, {"Remaining-Req": f"group={group}; min=0; sec=0"})
+            return
+        headers = {"Remaining-Req": f"group={group}; min=1800; sec={remaining if remaining is not None else 29}"}
+        sim = srv.sim
+        try:
+            if path == "/v1/candles/minutes/1":
+                body = sim.candles(params["market"], int(params.get("count", 1)))
+            elif path == "/v1/orderbook":
+                body = [_strip_stream(sim.orderbook(c)) for c in params["markets"].split(",")]
+            elif path == "/v1/ticker":
+                body = [_strip_stream(sim.ticker(c)) for c in params["markets"].split(",")]
+            elif path == "/v1/market/all":
+                body = [{"market": c, "korean_name": c, "english_name": c} for c in sim.markets]
+            elif path == "/mock/stats":
+                body = dict(srv.counters)
+            else:
+                self._send_json(404, {"error": {"name": "not_found"}})
+                return
+        except KeyError as exc:
+            self._send_json(404, {"error": {"name": "invalid_market", "message": str(exc)}})
+            return
+        self._send_json(200, body, headers)
+
+    # ------------------------------------------------------------------
+    def _websocket(self) -> None:
+        srv = self.server
+        key = self.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + _WS_GUID).encode()).digest()).decode()
+        self.send_response(101, "Switching Protocols")
+        self.send_header("Upgrade", "websocket")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Sec-WebSocket-Accept", accept)
+        self.end_headers()
+        self.wfile.flush()
+        self.close_connection = True
+        sock = self.connection
+        send_lock = threading.Lock()
+        try:
+            opcode, payload = _ws_read(sock)
+            request = json.loads(payload.decode("utf-8"))
+        except (ConnectionError, ValueError, OSError):
+            return
+        codes: List[str] = []
+        types: List[str] = []
+        for item in request:
+            if isinstance(item, dict) and "type" in item:
+                types.append(item["type"])
+                codes.extend(item.get("codes", []))
+        q = srv.subscribe(codes, types)
+        closed = threading.Event()
+
+        def reader() -> None:
+            try:
+                while not closed.is_set():
+                    op, data = _ws_read(sock)
+                    if op == 0x9:  # ping -> pong
+                        with send_lock:
+                            sock.sendall(_ws_frame(data, 0xA))
+                    elif op == 0x8:
+                        break
+            except (ConnectionError, OSError):
+                pass
+            closed.set()
+
+        threading.Thread(target=reader, daemon=True).start()
+        deadline = None
+        if srv.faults.disconnect_every:
+            deadline = time.monotonic() + srv.faults.disconnect_every
+        try:
+            while not closed.is_set():
+                if deadline is not None and time.monotonic() >= deadline:
+                    srv.counters["ws_disconnects"] += 1
+                    break
+                try:
+                    frame = q.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                with send_lock:
+                    sock.sendall(frame)
+                srv.counters["ws_messages"] += 1
+        except OSError:
+            pass
+        finally:
+            closed.set()
+            srv.unsubscribe(q)
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def _strip_stream(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a WebSocket message in REST form."""
+    return {k: v for k, v in message.items() if k not in ("type", "code", "stream_type")}
+
+
+def start_mock_server(
+    markets: Sequence[str] = ("KRW-BTC",),
+    *,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    rate: float = 10.0,
+    faults: Optional[FaultConfig] = None,
+    seed: int = 0,
+    replay: Optional[Dict[str, Sequence[float]]] = None,
+) -> MockUpbitServer:
+    """Start a server on a background thread and return it."""
+    sim = MarketSimulator(markets, seed=seed, replay=replay)
+    server = MockUpbitServer((host, port), sim, rate=rate, faults=faults)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Upbit stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--markets", default="KRW-BTC", help="comma separated market codes")
+    parser.add_argument("--rate", type=float, default=10.0, help="trades per second per market")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of REST calls answered with 429")
+    parser.add_argument("--quota", type=int, help="REST requests per second per group before 429")
+    parser.add_argument("--disconnect-every", type=float, help="drop WebSocket clients after N seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay-start", type=int, help="replay recorded candles from this epoch second")
+    parser.add_argument("--replay-end", type=int, help="replay recorded candles until this epoch second")
+    args = parser.parse_args(argv)
+
+    markets = [m.strip() for m in args.markets.split(",") if m.strip()]
+    replay = None
+    if args.replay_start is not None and args.replay_end is not None:
+        import os
+        import sys
+
+        sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+        from market_recorder import load_records
+
+        replay = {
+            m: [float(c) for c in load_records("candle", m, args.replay_start * 1000, args.replay_end * 1000)["close"]]
+            for m in markets
+        }
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        quota_per_sec=args.quota,
+        disconnect_every=args.disconnect_every,
+    )
+    server = start_mock_server(
+        markets,
+        host=args.host,
+        port=args.port,
+        rate=args.rate,
+        faults=faults,
+        seed=args.seed,
+        replay=replay,
+    )
+    print(f"[mock upbit] REST {server.url}  WS {server.ws_url}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"[mock upbit] {server.counters}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Run the agent stack over many KRW markets from one process."""
+
+from __future__ import annotations
+
+import atexit
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from main import TradingApp, CANDLE_COUNT
+from agents.market_sentiment import MarketSentimentAgent
+from agents.position_manager import PositionManager, INITIAL_CAPITAL
+from agents.risk_manager import RiskManager
+from agents.logger_agent import LoggerAgent
+from agents.learning_agent import LearningAgent
+from agents.human_compare import HumanCompareAgent
+from agents.utils import get_upbit_orderbooks, get_upbit_tickers, get_upbit_markets
+from market_snapshot import MarketSnapshot, freeze_order_book
+from price_feed_upbit_ws import UpbitWebSocket
+from status_server import start_status_server, update_state
+from config import LOG_BASE_DIR
+
+
+def select_markets(count: int = 50, quote: str = "KRW") -> List[str]:
+    """Return the ``count`` most traded markets by 24h value."""
+    markets = get_upbit_markets(quote)
+    tickers = get_upbit_tickers(markets)
+    ranked = sorted(
+        markets,
+        key=lambda m: tickers.get(m, {}).get("acc_trade_price_24h", 0.0),
+        reverse=True,
+    )
+    return ranked[:count]
+
+
+class MultiMarketEngine:
+    """Evaluate one :class:`TradingApp` per market on shared data requests.
+
+    Each market keeps its own sentiment, entry, emotion and position state
+    while the logger, learning agent, risk and position counters are shared.
+    Orderbooks (and tickers when the WebSocket is unavailable) are fetched for
+    all markets in a handful of batched ``markets=`` requests, candles are
+    built from a single multi-code trade stream, and each market goes
+    through :meth:`TradingApp.step`, so it is only evaluated when a new bar
+    starts, its orderbook imbalance moves by ``imbalance_delta`` or its
+    heartbeat is due.
+    """
+
+    def __init__(
+        self,
+        symbols: List[str],
+        *,
+        capital: float = INITIAL_CAPITAL,
+        orderbook_fetcher: Callable[[List[str]], Dict[str, Dict[str, Any]]] | None = None,
+        ticker_fetcher: Callable[[List[str]], Dict[str, Dict[str, Any]]] | None = None,
+    ) -> None:
+        if not symbols:
+            raise ValueError("at least one symbol is required")
+        self.symbols = list(symbols)
+        self.orderbook_fetcher = orderbook_fetcher or get_upbit_orderbooks
+        self.ticker_fetcher = ticker_fetcher or get_upbit_tickers
+        self.shared = {
+            "position_manager": PositionManager(),
+            "risk": RiskManager(max_risk_pct=0.1),
+            "logger": LoggerAgent(),
+            "learning_agent": LearningAgent(),
+            "human_compare": HumanCompareAgent(),
+        }
+        per_market = capital / len(self.symbols)
+        ma_dir = LOG_BASE_DIR / "감정지수"
+        self.apps: Dict[str, TradingApp] = {
+            symbol: TradingApp(
+                symbol,
+                shared=self.shared,
+                balance=per_market,
+                publish=False,
+                sentiment_agent=MarketSentimentAgent(ma_path=ma_dir / f"emotion_MA_{symbol}.json"),
+            )
+            for symbol in self.symbols
+        }
+        self.socket: UpbitWebSocket | None = None
+        self.streaming = False
+
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Backfill every market and subscribe to one multi-code stream."""
+        for app in self.apps.values():
+            try:
+                app.candle_feed.backfill()
+            except RuntimeError as exc:
+                print(f"[멀티마켓] {app.symbol} 캔들 로드 실패: {exc}")
+            # candles are now fed by the engine, not by per-read REST polling
+            app.candle_feed.streaming = True
+            app.seed_indicators()
+        self.socket = UpbitWebSocket(
+            self.symbols[0],
+            codes=self.symbols,
+            coalesce=True,
+            verbose=False,
+        )
+        self.socket.add_listener(self._dispatch)
+        try:
+            self.socket.run()
+            self.streaming = True
+        except RuntimeError as exc:
+            print(f"[멀티마켓] WebSocket 사용 불가, 시세 일괄 조회로 대체: {exc}")
+            self.streaming = False
+
+    def _dispatch(self, data: Dict[str, Any]) -> None:
+        if data.get("type") == "reconnect":
+            for app in self.apps.values():
+                app.candle_feed.on_message(data)
+            return
+        app = self.apps.get(data.get("code"))
+        if app is not None:
+            app.candle_feed.on_message(data)
+
+    def poll_tickers(self) -> None:
+        """Fold the latest batched ticker prices into every candle feed."""
+        tickers = self.ticker_fetcher(self.symbols)
+        for symbol, row in tickers.items():
+            app = self.apps.get(symbol)
+            if app is None or row.get("trade_price") is None:
+                continue
+            ts = row.get("trade_timestamp") or row.get("timestamp") or time.time() * 1000
+            app.candle_feed.on_trade(float(row["trade_price"]), 0.0, int(ts) // 1000)
+
+    # ------------------------------------------------------------------
+    def tick(self) -> List[str]:
+        """Run one evaluation pass and return the markets evaluated."""
+        if not self.streaming:
+            self.poll_tickers()
+        books = self.orderbook_fetcher(self.symbols)
+        now = time.time()
+        evaluated = []
+        for symbol, app in self.apps.items():
+            book = books.get(symbol)
+            if book is None:
+                continue
+            try:
+                times, closes = app.candle_feed.window(CANDLE_COUNT)
+            except RuntimeError as exc:
+                print(f"[멀티마켓] {symbol} 캔들 없음: {exc}")
+                continue
+            if not closes:
+                continue
+            frames = app.candle_feed.timeframe_closes(CANDLE_COUNT)
+            snapshot = MarketSnapshot(
+                symbol,
+                now,
+                tuple(closes),
+                freeze_order_book(book),
+                timeframes={m: tuple(v) for m, v in frames.items()},
+                bar_times=tuple(times),
+            )
+            if app.step(snapshot) is not None:
+                evaluated.append(symbol)
+        return evaluated
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-market price, signal, balance and position counts."""
+        return {
+            symbol: {
+                "price": app.current_price,
+                "signal": app.last_signal,
+                "balance": app.balance,
+                "positions": len(app.positions),
+                "equity": app.balance + sum(app.current_price * p["quantity"] for p in app.positions),
+            }
+            for symbol, app in self.apps.items()
+        }
+
+    def publish(self) -> None:
+        markets = self.summary()
+        pm = self.shared["position_manager"]
+        update_state(
+            markets=markets,
+            balance=sum(m["balance"] for m in markets.values()),
+            market_equity=sum(m["equity"] for m in markets.values()),
+            buy_count=pm.total_buys,
+            sell_count=pm.total_sells,
+            feed_stats=self.socket.get_stats() if self.streaming else None,
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = sys.argv[1:] if argv is None else argv
+    if args and args[0].isdigit():
+        symbols = select_markets(int(args[0]))
+    elif args:
+        symbols = args
+    else:
+        symbols = select_markets()
+    engine = MultiMarketEngine(symbols)
+    atexit.register(engine.shared["learning_agent"].snapshot)
+    start_status_server(
+        position_manager=engine.shared["position_manager"],
+        logger_agent=engine.shared["logger"],
+    )
+    engine.start()
+    while True:
+        started = time.perf_counter()
+        try:
+            evaluated = engine.tick()
+        except RuntimeError as exc:
+            print(f"[멀티마켓] 시장 데이터를 가져오지 못했습니다: {exc}")
+            evaluated = []
+        engine.publish()
+        elapsed = time.perf_counter() - started
+        print(f"[멀티마켓] {len(evaluated)}/{len(symbols)} 종목 평가 ({elapsed:.2f}s)")
+        time.sleep(max(0.0, 2 - elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""Deterministic accelerated replay of market data through TradingApp."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import main
+from main import TradingApp, CANDLE_COUNT
+from agents import clock
+from agents.clock import VirtualClock
+from agents.entry_decision import EntryDecisionAgent
+from agents.logger_agent import LoggerAgent
+from agents.learning_agent import LearningAgent
+from agents.market_sentiment import MarketSentimentAgent
+from agents.strategy_scorer import StrategyScorer
+from candle_feed import DEFAULT_TIMEFRAMES, TimeframeAggregator
+from market_snapshot import MarketSnapshot, freeze_order_book
+
+BAR_SECONDS = 60
+
+
+class ReplayLogger(LoggerAgent):
+    """LoggerAgent that keeps events in memory instead of writing files."""
+
+    def __init__(self, log_dir: Path) -> None:
+        super().__init__(log_dir)
+        self.events: List[Dict[str, Any]] = []
+        self.trades: List[Dict[str, Any]] = []
+        self.judgments = 0
+
+    def log_event(self, data: dict) -> str:
+        data = dict(data)
+        data.setdefault("timestamp", clock.utcnow().isoformat())
+        if data.get("type") != "condition_evaluation":
+            self.events.append(data)
+        return data["timestamp"]
+
+    def log(self, agent, action, price=None, confidence=None, symbol=None, return_rate=None, *, reason=None):
+        timestamp = clock.utcnow().isoformat()
+        self.trades.append(
+            {
+                "timestamp": timestamp,
+                "agent": agent,
+                "action": action,
+                "price": price,
+                "symbol": symbol,
+                "return_rate": return_rate,
+            }
+        )
+        return timestamp
+
+    def log_success(self, agent, action, *, price, strategy, return_rate) -> None:
+        self.log(agent, action, price=price, return_rate=return_rate)
+
+    def log_judgment(self, **_) -> None:
+        self.judgments += 1
+
+
+class ReplayLearningAgent(LearningAgent):
+    """LearningAgent whose state lives only in memory."""
+
+    def _load(self) -> None:
+        self.weights = {}
+        self.history = []
+
+    def _journal(self, entry) -> None:
+        pass
+
+    def _save(self) -> None:
+        pass
+
+
+def synthetic_bars(
+    count: int,
+    *,
+    start: int = 1_700_000_000,
+    price: float = 50_000_000.0,
+    volatility: float = 0.002,
+    seed: int = 0,
+) -> List[Dict[str, float]]:
+    """Return ``count`` random-walk 1-minute OHLCV bars."""
+    rng = random.Random(seed)
+    start -= start % BAR_SECONDS
+    bars = []
+    for i in range(count):
+        open_ = price
+        path = [open_]
+        for _ in range(4):
+            path.append(path[-1] * (1 + rng.gauss(0, volatility / 2)))
+        price = path[-1]
+        bars.append(
+            {
+                "timestamp": start + i * BAR_SECONDS,
+                "open": open_,
+                "high": max(path),
+                "low": min(path),
+                "close": price,
+                "volume": rng.uniform(0.1, 5.0),
+            }
+        )
+    return bars
+
+
+def synthetic_orderbook(price: float, rng: random.Random, depth: int = 10) -> Dict[str, Any]:
+    """Return a book around ``price`` with a random bid/ask imbalance."""
+    tick = max(price * 0.0001, 1e-8)
+    skew = rng.uniform(-0.8, 0.8)
+    bids = [{"price": price - tick * (i + 1), "volume": rng.uniform(0.1, 1.0) * (1 + skew)} for i in range(depth)]
+    asks = [{"price": price + tick * (i + 1), "volume": rng.uniform(0.1, 1.0) * (1 - skew)} for i in range(depth)]
+    return {
+        "bids": bids,
+        "asks": asks,
+        "bid_volume": sum(b["volume"] for b in bids),
+        "ask_volume": sum(a["volume"] for a in asks),
+    }
+
+
+def recorded_bars(symbol: str, start_ms: int, end_ms: int, root: str | Path | None = None) -> List[Dict[str, float]]:
+    """Load bars captured by :class:`market_recorder.MarketRecorder`."""
+    from market_recorder import load_records
+
+    rows = load_records("candle", symbol, start_ms, end_ms, root=root)
+    return [
+        {
+            "timestamp": int(r["ts"]) // 1000,
+            "open": float(r["open"]),
+            "high": float(r["high"]),
+            "low": float(r["low"]),
+            "close": float(r["close"]),
+            "volume": float(r["volume"]),
+        }
+        for r in rows
+    ]
+
+
+@contextmanager
+def _sandbox(virtual_clock: VirtualClock) -> Iterator[None]:
+    """Install the virtual clock and stub network-scheduling side effects."""
+    original_tracker = main.track_failed_hold
+    main.track_failed_hold = lambda *_, **__: None
+    clock.set_clock(virtual_clock)
+    try:
+        yield
+    finally:
+        clock.set_clock(None)
+        main.track_failed_hold = original_tracker
+
+
+class ReplayEngine:
+    """Feed bars and orderbooks into an unchanged :class:`TradingApp`.
+
+    Each bar is one tick: the virtual clock is moved to the bar close, the
+    last ``CANDLE_COUNT`` closes and the matching orderbook form a
+    :class:`MarketSnapshot`, and ``TradingApp.loop`` runs on it.  Logging,
+    learning state and the emotion moving average are kept in memory or in a
+    throwaway directory, and the global RNG is seeded so runs repeat exactly.
+    """
+
+    def __init__(
+        self,
+        bars: Sequence[Dict[str, float]],
+        *,
+        symbol: str = "KRW-BTC",
+        orderbooks: Optional[Sequence[Dict[str, Any]]] = None,
+        seed: int = 0,
+        work_dir: str | Path | None = None,
+    ) -> None:
+        if orderbooks is not None and len(orderbooks) != len(bars):
+            raise ValueError("orderbooks must align with bars")
+        self.bars = list(bars)
+        self.orderbooks = orderbooks
+        self.symbol = symbol
+        self.seed = seed
+        self._tmp = None
+        if work_dir is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="nova_replay_")
+            work_dir = self._tmp.name
+        self.work_dir = Path(work_dir)
+        self.clock = VirtualClock(self.bars[0]["timestamp"] if self.bars else 0)
+
+    def _build_app(self) -> TradingApp:
+        logger = ReplayLogger(self.work_dir / "log")
+        shared = {
+            "logger": logger,
+            "learning_agent": ReplayLearningAgent(self.work_dir / "learning_state.json"),
+        }
+        app = TradingApp(
+            self.symbol,
+            shared=shared,
+            publish=False,
+            sentiment_agent=MarketSentimentAgent(ma_path=self.work_dir / "emotion_MA.json"),
+            entry_agent=EntryDecisionAgent(
+                scorer=StrategyScorer(log_dir=self.work_dir / "strategy_scorer")
+            ),
+        )
+        return app
+
+    def run(self) -> Dict[str, Any]:
+        """Replay every bar and return PnL and decision statistics."""
+        random.seed(self.seed)
+        book_rng = random.Random(self.seed)
+        started = time.perf_counter()
+        signals: Counter = Counter()
+        with _sandbox(self.clock):
+            app = self._build_app()
+            closes: List[float] = []
+            times: List[int] = []
+            frames = {m: TimeframeAggregator(m, CANDLE_COUNT) for m in DEFAULT_TIMEFRAMES}
+            for i, bar in enumerate(self.bars):
+                closes.append(bar["close"])
+                times.append(bar["timestamp"])
+                if len(closes) > CANDLE_COUNT:
+                    del closes[0]
+                    del times[0]
+                for agg in frames.values():
+                    agg.update(bar["timestamp"], bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"])
+                self.clock.set(bar["timestamp"] + BAR_SECONDS)
+                if self.orderbooks is not None:
+                    book = self.orderbooks[i]
+                else:
+                    book = synthetic_orderbook(bar["close"], book_rng)
+                snapshot = MarketSnapshot(
+                    self.symbol,
+                    self.clock.time(),
+                    tuple(closes),
+                    freeze_order_book(book),
+                    timeframes={m: tuple(agg.buffer.closes()) for m, agg in frames.items()},
+                    bar_times=tuple(times),
+                )
+                app.loop(snapshot)
+                signals[app.last_signal] += 1
+        elapsed = time.perf_counter() - started
+        report = self._report(app, signals, elapsed)
+        if self._tmp is not None:
+            self._tmp.cleanup()
+        return report
+
+    def _report(self, app: TradingApp, signals: Counter, elapsed: float) -> Dict[str, Any]:
+        logger: ReplayLogger = app.logger
+        initial = main.INITIAL_CAPITAL
+        equity = app.balance + sum(app.current_price * p["quantity"] for p in app.positions)
+        returns = [t["return"] for t in app.trade_history]
+        denied = Counter(e.get("reason") for e in logger.events if e.get("type") == "entry_denied")
+        actions = Counter(t["action"] for t in logger.trades)
+        return {
+            "bars": len(self.bars),
+            "elapsed_sec": elapsed,
+            "bars_per_sec": len(self.bars) / elapsed if elapsed else float("inf"),
+            "initial_capital": initial,
+            "final_equity": equity,
+            "pnl": equity - initial,
+            "total_return": (equity - initial) / initial,
+            "open_positions": len(app.positions),
+            "closed_trades": len(returns),
+            "win_rate": sum(1 for r in returns if r > 0) / len(returns) if returns else 0.0,
+            "performance": app.performance.metrics(),
+            "signals": dict(signals),
+            "actions": dict(actions),
+            "entry_denied": dict(denied),
+        }
+
+
+def main_cli(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbol", default="KRW-BTC")
+    parser.add_argument("--bars", type=int, default=1440, help="synthetic bars to generate")
+    parser.add_argument("--start", type=int, help="recorded data start (epoch seconds)")
+    parser.add_argument("--end", type=int, help="recorded data end (epoch seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    if args.start is not None and args.end is not None:
+        bars = recorded_bars(args.symbol, args.start * 1000, args.end * 1000)
+    else:
+        bars = synthetic_bars(args.bars, seed=args.seed)
+    report = ReplayEngine(bars, symbol=args.symbol, seed=args.seed).run()
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main_cli()
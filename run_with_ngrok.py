@@ -1,6 +1,6 @@
+import atexit
 import sys
 import subprocess
-import time
 import webbrowser
 
 try:
@@ -9,14 +9,15 @@ except ImportError:  # pragma: no cover - auto install for convenience
     subprocess.check_call([sys.executable, "-m", "pip", "install", "pyngrok"])
     from pyngrok import ngrok
 
-from status_server import start_status_server, update_state
-from main import TradingApp, SYMBOL
+from status_server import start_status_server
+from main import TradingApp, launch_ui, publish_market_state
 from config import USE_NGROK, NGROK_PORT, LOCAL_SERVER_PORT
-from agents.utils import get_upbit_orderbook
 
 
 def main():
+    launch_ui()
     app = TradingApp()
+    atexit.register(app.learning_agent.snapshot)
     start_status_server(
         port=LOCAL_SERVER_PORT,
         position_manager=app.position_manager,
@@ -34,19 +35,8 @@ def main():
     except Exception:
         pass
 
-    symbol = SYMBOL
-    while True:
-        orderbook = get_upbit_orderbook(symbol)
-        update_state(
-            bids=[[b["price"], b["volume"]] for b in orderbook.get("bids", []) if b.get("volume")],
-            asks=[[a["price"], a["volume"]] for a in orderbook.get("asks", []) if a.get("volume")],
-            bid_volume=orderbook.get("bid_volume"),
-            ask_volume=orderbook.get("ask_volume"),
-            buy_count=app.position_manager.total_buys,
-            sell_count=app.position_manager.total_sells,
-        )
-        app.loop()
-        time.sleep(2)
+    app.start_streams()
+    app.run(on_snapshot=publish_market_state)
 
 
 if __name__ == "__main__":
@@ -7,7 +7,7 @@ from .emotion_axis import EmotionAxis
 from .logger_agent import LoggerAgent
 from .learning_agent import LearningAgent
 from .strategy_generator import StrategyGenerator
-from .strategy_evaluator import StrategyEvaluator
+from .strategy_evaluator import IncrementalEvaluator, StrategyEvaluator
 from .daily_logger import DailyLogger
 from .session_logger import SessionLogger
 from .missed_hold_tracker import track_failed_hold
@@ -15,6 +15,8 @@ from .strategy_scorer import StrategyScorer
 from .human_compare import HumanCompareAgent
 from .news_adjuster import NewsAdjuster, news_adjuster
 from .visualizer_agent import VisualizerAgent
+from .indicators import IndicatorEngine
+from .features import FeatureCache, FeatureSnapshot
 
 __all__ = [
     'MarketSentimentAgent',
@@ -28,6 +30,7 @@ __all__ = [
     'LearningAgent',
     'StrategyGenerator',
     'StrategyEvaluator',
+    'IncrementalEvaluator',
     'DailyLogger',
     'track_failed_hold',
     'StrategyScorer',
@@ -35,4 +38,7 @@ __all__ = [
     'NewsAdjuster',
     'news_adjuster',
     'VisualizerAgent',
+    'IndicatorEngine',
+    'FeatureCache',
+    'FeatureSnapshot',
 ]
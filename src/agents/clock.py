@@ -0,0 +1,50 @@
+"""Process-wide clock used by agents for time-dependent state.
+
+Agents call :func:`utcnow` and :func:`time` instead of ``datetime.utcnow``
+and ``time.time`` so that replays and backtests can install a
+:class:`VirtualClock` and run faster than real time.
+"""
+
+from __future__ import annotations
+
+import time as _time
+from datetime import datetime, timezone
+from typing import Optional
+
+
+class VirtualClock:
+    """Manually advanced clock expressed in epoch seconds."""
+
+    def __init__(self, start: float = 0.0) -> None:
+        self.now = float(start)
+
+    def time(self) -> float:
+        return self.now
+
+    def utcnow(self) -> datetime:
+        return datetime.fromtimestamp(self.now, tz=timezone.utc).replace(tzinfo=None)
+
+    def set(self, timestamp: float) -> None:
+        self.now = float(timestamp)
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+_clock: Optional[VirtualClock] = None
+
+
+def set_clock(clock: Optional[VirtualClock]) -> None:
+    """Install ``clock`` for all agents; ``None`` restores the wall clock."""
+    global _clock
+    _clock = clock
+
+
+def time() -> float:
+    """Return the current epoch time in seconds."""
+    return _clock.time() if _clock is not None else _time.time()
+
+
+def utcnow() -> datetime:
+    """Return the current naive UTC datetime."""
+    return _clock.utcnow() if _clock is not None else datetime.utcnow()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
 
+from . import clock
+
 
 class EmotionAxis:
     """Track consecutive failures and enforce cooldown/pause rules."""
@@ -16,12 +18,12 @@ class EmotionAxis:
             return
         self.consecutive_failures += 1
         if self.consecutive_failures >= 3:
-            self.cooldown_until = datetime.utcnow() + timedelta(minutes=30)
+            self.cooldown_until = clock.utcnow() + timedelta(minutes=30)
             self.consecutive_failures = 0
 
     def in_cooldown(self) -> bool:
         """Return ``True`` if trading is currently paused."""
-        return bool(self.cooldown_until and datetime.utcnow() < self.cooldown_until)
+        return bool(self.cooldown_until and clock.utcnow() < self.cooldown_until)
 
     def should_pause_for_greed(self, rsi: float) -> bool:
         """Return ``True`` if RSI indicates extreme greed (>85)."""
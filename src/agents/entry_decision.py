@@ -1,14 +1,29 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
+from . import clock
+from .features import book_features, candle_features
+from .indicators import MACD
 from .strategy_scorer import StrategyScorer
 from .news_adjuster import news_adjuster
 
+# Strategies compared by ``EntryDecisionAgent.evaluate_all``
+STRATEGIES = ("reversal", "swing", "trend_follow", "momentum", "take_profit", "orderbook_weighted")
+
+# Decision thresholds; ``walk_forward`` searches over these
+DEFAULT_THRESHOLDS = {
+    "rsi": 48.0,  # base RSI level for ``rsi_above_threshold``
+    "volatility": 0.02,  # max std/mean for ``volatility_threshold``
+    "diff": 1.5,  # buy/sell score gap that forces the signal
+    "conflict": 0.5,  # conflict index at which the score gap decides
+}
+
 
 class EntryDecisionAgent:
     """Determine trade entry signals for various strategies."""
 
-    def __init__(self, adjuster=None):
+    def __init__(self, adjuster=None, thresholds=None, scorer=None):
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
         self.last_score_percent = 0.0
-        self.scorer = StrategyScorer()
+        self.scorer = scorer if scorer is not None else StrategyScorer()
         self.adjuster = adjuster if adjuster is not None else news_adjuster
         self.nearest_failed = None
         self.failed_conditions = []
@@ -25,6 +40,11 @@ class EntryDecisionAgent:
         """Return normalized strength score from orderbook price-volume lists."""
         bid_strength = sum(b.get("price", 0) * b.get("volume", 0) for b in bids)
         ask_strength = sum(a.get("price", 0) * a.get("volume", 0) for a in asks)
+        return self.normalize_orderbook_totals(bid_strength, ask_strength)
+
+    @staticmethod
+    def normalize_orderbook_totals(bid_strength, ask_strength):
+        """Return normalized strength score from precomputed notional totals."""
         total = bid_strength + ask_strength
         if total == 0:
             return 0.0
@@ -42,28 +62,103 @@ class EntryDecisionAgent:
         emotion_index=None,
         emotion_ma=None,
         news_emotion=None,
+        indicators=None,
+        features=None,
     ):
         """Return BUY, SELL, or HOLD signal or detailed dict for special strategy.
 
         When ``logger`` is provided, a ``condition_evaluation`` event will be written
         with detailed condition scores and the overall satisfaction percentage.
         The most recent percentage is stored in ``last_score_percent`` for external
-        use.
+        use.  ``indicators`` is an optional :class:`IndicatorEngine` synced with
+        ``chart_data`` from which moving averages, RSI and variance are read;
+        ``features`` is a :class:`FeatureSnapshot` for ``chart_data`` and
+        ``order_book`` that replaces both.
         """
         name = strategy[0] if isinstance(strategy, tuple) else strategy
         if not chart_data or len(chart_data) < 20:
             self.last_score_percent = 0.0
             return "HOLD"
 
-        recent_close = chart_data[-1]
-        ma5 = sum(chart_data[-5:]) / 5
-        ma20 = sum(chart_data[-20:]) / 20
+        ctx = self._conditions(
+            chart_data, order_book, indicators, features, emotion_index, emotion_ma, news_emotion
+        )
+        self._score_conditions(ctx, logger=logger, symbol=symbol, emotion_index=emotion_index)
+        result, _ = self._decide(name, ctx, chart_data, order_status, order_book)
+        return result
 
-        rsi = self._calc_rsi(chart_data)
-        if len(chart_data) >= 15:
-            rsi_prev = self._calc_rsi(chart_data[:-1])
+    def evaluate_all(
+        self,
+        chart_data,
+        order_status,
+        order_book=None,
+        *,
+        selected=None,
+        strategies=STRATEGIES,
+        logger=None,
+        symbol=None,
+        emotion_index=None,
+        emotion_ma=None,
+        news_emotion=None,
+        indicators=None,
+        features=None,
+    ):
+        """Evaluate every strategy in ``strategies`` against one set of features.
+
+        Conditions, ``score_percent`` and weight tuning run once, exactly as a
+        single :meth:`evaluate` call.  Returns ``{name: {"signal", "confidence",
+        "score_percent", "conflict_index"}}``; only the ``selected`` strategy
+        updates ``last_conflict`` and the flip history, so its entry equals
+        ``evaluate(selected, ...)`` and the others are side-effect free shadows.
+        """
+        names = list(strategies)
+        if selected is not None and selected not in names:
+            names.append(selected)
+        if not chart_data or len(chart_data) < 20:
+            self.last_score_percent = 0.0
+            return {
+                name: {"signal": "HOLD", "confidence": None, "score_percent": 0.0, "conflict_index": 0.0}
+                for name in names
+            }
+
+        ctx = self._conditions(
+            chart_data, order_book, indicators, features, emotion_index, emotion_ma, news_emotion
+        )
+        self._score_conditions(ctx, logger=logger, symbol=symbol, emotion_index=emotion_index)
+        decisions = {}
+        # shadows first: they peek at the flip history before the selected
+        # strategy appends this tick's signal to it
+        for name in sorted(names, key=lambda n: n == selected):
+            result, conflict = self._decide(
+                name, ctx, chart_data, order_status, order_book, record=name == selected
+            )
+            if isinstance(result, dict):
+                signal, confidence = result["signal"], result["confidence"]
+            else:
+                signal, confidence = result, None
+            decisions[name] = {
+                "signal": signal,
+                "confidence": confidence,
+                "score_percent": self.last_score_percent,
+                "conflict_index": conflict["conflict_index"],
+            }
+        return {name: decisions[name] for name in names}
+
+    def _conditions(self, chart_data, order_book, indicators, features, emotion_index, emotion_ma, news_emotion):
+        """Return the strategy-independent inputs of one evaluation."""
+        if features is None:
+            candle = candle_features(chart_data, indicators)
+            book = book_features(order_book)
         else:
-            rsi_prev = rsi
+            candle = features.candle
+            book = features.book
+        recent_close = candle.close
+        ma5 = candle.ma5
+        ma20 = candle.ma20
+        ma_10 = candle.ma10
+        ma_34 = candle.ma34
+        rsi = candle.rsi
+        rsi_prev = candle.rsi_prev
         rsi_diff = rsi - rsi_prev
         buy_sens = 1.0
         sell_sens = 1.0
@@ -78,42 +173,19 @@ class EntryDecisionAgent:
         if emotion_ma is not None and emotion_ma <= -0.3:
             sell_sens *= 1.1
 
-        ma_10 = sum(chart_data[-10:]) / 10
-        ma_34 = sum(chart_data[-34:]) / 34 if len(chart_data) >= 34 else ma20
-
-        volatility = 0.0
-        bb_score_val = 0
-        if len(chart_data) >= 20:
-            mean20 = sum(chart_data[-20:]) / 20
-            var20 = sum((c - mean20) ** 2 for c in chart_data[-20:]) / 20
-            std20 = (var20 ** 0.5)
-            volatility = std20 / mean20 if mean20 else 0.0
-            upper = mean20 + 2 * std20
-            lower = mean20 - 2 * std20
-            if recent_close > upper:
-                bb_score_val = 1
-            elif recent_close < lower:
-                bb_score_val = -1
-        
-        golden_cross = False
-        if len(chart_data) >= 25:
-            prev_ma20 = sum(chart_data[-21:-1]) / 20
-            golden_cross = ma5 > ma20 and chart_data[-6] <= prev_ma20
-
-        rsi_threshold = 48.0
+        volatility = candle.volatility
+        bb_score_val = candle.bb_score
+        golden_cross = candle.golden_cross
+
+        rsi_threshold = self.thresholds["rsi"]
+        vol_threshold = self.thresholds["volatility"]
         if self.adjuster.active:
             rsi_threshold += self.adjuster.adjustments.get("rsi_offset", 0)
         if emotion_index is not None:
             rsi_threshold += emotion_index * 5
 
-        if order_book:
-            bid_volume = order_book.get("bid_volume")
-            ask_volume = order_book.get("ask_volume")
-            if bid_volume is None or ask_volume is None:
-                bid_volume = sum(b.get("volume", 0) for b in order_book.get("bids", []))
-                ask_volume = sum(a.get("volume", 0) for a in order_book.get("asks", []))
-        else:
-            bid_volume = ask_volume = 0
+        bid_volume = book.bid_volume
+        ask_volume = book.ask_volume
 
         condition_scores = {
             "rsi_above_threshold": rsi > rsi_threshold,
@@ -121,7 +193,7 @@ class EntryDecisionAgent:
             "golden_cross": golden_cross,
             "orderbook_bias_up": bid_volume > ask_volume,
             "orderbook_bias_down": ask_volume > bid_volume,
-            "volatility_threshold": volatility < 0.02,
+            "volatility_threshold": volatility < vol_threshold,
         }
 
         condition_details = {
@@ -157,9 +229,9 @@ class EntryDecisionAgent:
             },
             "volatility_threshold": {
                 "value": volatility,
-                "threshold": 0.02,
-                "diff": volatility - 0.02,
-                "passed": volatility < 0.02,
+                "threshold": vol_threshold,
+                "diff": volatility - vol_threshold,
+                "passed": volatility < vol_threshold,
             },
         }
 
@@ -185,6 +257,23 @@ class EntryDecisionAgent:
             elif emotion_ma < 0:
                 sell_score += abs(emotion_ma)
 
+        return {
+            "recent_close": recent_close,
+            "ma5": ma5,
+            "rsi": rsi,
+            "rsi_threshold": rsi_threshold,
+            "golden_cross": golden_cross,
+            "macd_hist": candle.macd_hist,
+            "notional_score": book.notional_score,
+            "condition_scores": condition_scores,
+            "condition_details": condition_details,
+            "diff": buy_sens * buy_score - sell_sens * sell_score,
+        }
+
+    def _score_conditions(self, ctx, *, logger=None, symbol=None, emotion_index=None):
+        """Update ``last_score_percent`` and the failed conditions for ``ctx``."""
+        condition_scores = ctx["condition_scores"]
+        condition_details = ctx["condition_details"]
         failed_conditions = {k: v for k, v in condition_details.items() if not v["passed"]}
         self.failed_conditions = list(failed_conditions)
         if failed_conditions:
@@ -212,58 +301,62 @@ class EntryDecisionAgent:
                 "score_percent": self.last_score_percent,
             })
 
+    def _decide(self, name, ctx, chart_data, order_status, order_book, *, record=True):
+        """Return ``(result, conflict)`` for strategy ``name``.
+
+        With ``record`` false the flip history and ``last_conflict`` are left
+        untouched.
+        """
+        rsi = ctx["rsi"]
+        rsi_threshold = ctx["rsi_threshold"]
         signal = "HOLD"
         if name in ["momentum", "trend_follow"]:
-            if golden_cross and rsi > rsi_threshold:
+            if ctx["golden_cross"] and rsi > rsi_threshold:
                 signal = "BUY"
-        elif name == "reversal" and recent_close < ma5:
+        elif name == "reversal" and ctx["recent_close"] < ctx["ma5"]:
             signal = "BUY"
 
         if name == "orderbook_weighted" and order_book:
-            bids = order_book.get("bids") or []
-            asks = order_book.get("asks") or []
-            score = self.normalize_orderbook_strength(bids[:10], asks[:10])
+            # bid/ask notional over the top 10 levels
+            score = ctx["notional_score"]
             signal = "HOLD"
             if score > 0.3:
                 signal = "BUY"
             elif score < -0.3:
                 signal = "SELL"
-            self._compute_conflict(condition_scores, rsi, rsi_threshold, chart_data, order_book, signal)
-            ci = self.last_conflict.get("conflict_index", 0.0)
-            diff = buy_sens * buy_score - sell_sens * sell_score
-            if ci >= 0.5:
-                if diff > 0:
-                    signal = "BUY"
-                elif diff < 0:
-                    signal = "SELL"
-                else:
-                    signal = "HOLD"
-            if abs(diff) >= 1.5:
-                signal = "BUY" if diff > 0 else "SELL"
-            return {
-                "signal": signal,
-                "confidence": score,
-                "strategy": "orderbook_weighted",
-                "score_percent": self.last_score_percent,
-            }
-
-        if name == "take_profit" and order_status and order_status.get("has_position"):
+        elif name == "take_profit" and order_status and order_status.get("has_position"):
             if order_status.get("return_rate", 0) >= 0.05:
                 signal = "SELL"
 
-        self._compute_conflict(condition_scores, rsi, rsi_threshold, chart_data, order_book, signal)
-        ci = self.last_conflict.get("conflict_index", 0.0)
-        diff = buy_sens * buy_score - sell_sens * sell_score
-        if ci >= 0.5:
+        conflict = self._compute_conflict(
+            ctx["condition_scores"],
+            rsi,
+            rsi_threshold,
+            chart_data,
+            order_book,
+            signal,
+            macd_hist=ctx["macd_hist"],
+            record=record,
+        )
+        ci = conflict.get("conflict_index", 0.0)
+        diff = ctx["diff"]
+        if ci >= self.thresholds["conflict"]:
             if diff > 0:
                 signal = "BUY"
             elif diff < 0:
                 signal = "SELL"
             else:
                 signal = "HOLD"
-        if abs(diff) >= 1.5:
+        if abs(diff) >= self.thresholds["diff"]:
             signal = "BUY" if diff > 0 else "SELL"
-        return signal
+        if name == "orderbook_weighted" and order_book:
+            return {
+                "signal": signal,
+                "confidence": score,
+                "strategy": "orderbook_weighted",
+                "score_percent": self.last_score_percent,
+            }, conflict
+        return signal, conflict
 
     def _calc_rsi(self, closes, period=14):
         if len(closes) < period + 1:
@@ -284,33 +377,17 @@ class EntryDecisionAgent:
         return 100 - (100 / (1 + rs))
 
     def _calc_macd(self, closes, fast=12, slow=26, signal=9):
+        """Return the MACD histogram of ``closes`` computed from scratch.
+
+        Live evaluation reads the persistent per-symbol state from
+        ``IndicatorEngine.macd_histogram`` instead.
+        """
         if len(closes) < slow + signal:
             return 0.0
-
-        def ema(vals, period):
-            k = 2 / (period + 1)
-            ema_val = vals[0]
-            for v in vals[1:]:
-                ema_val = v * k + ema_val * (1 - k)
-            return ema_val
-
-        fast_list = []
-        slow_list = []
-        e_fast = closes[0]
-        e_slow = closes[0]
-        for price in closes:
-            e_fast = price * (2 / (fast + 1)) + e_fast * (1 - 2 / (fast + 1))
-            e_slow = price * (2 / (slow + 1)) + e_slow * (1 - 2 / (slow + 1))
-            fast_list.append(e_fast)
-            slow_list.append(e_slow)
-        macd_list = [f - s for f, s in zip(fast_list, slow_list)]
-        e_signal = macd_list[0]
-        for m in macd_list:
-            e_signal = m * (2 / (signal + 1)) + e_signal * (1 - 2 / (signal + 1))
-        return macd_list[-1] - e_signal
+        return MACD.from_history(closes, fast, slow, signal).histogram
 
     def _recent_flip(self, new_signal: str) -> bool:
-        now = datetime.utcnow()
+        now = clock.utcnow()
         self.decision_history.append((now, new_signal))
         cutoff = now - timedelta(minutes=5)
         self.decision_history = [(t, s) for t, s in self.decision_history if t >= cutoff]
@@ -321,13 +398,22 @@ class EntryDecisionAgent:
             return True
         return False
 
-    def _compute_conflict(self, condition_scores, rsi, rsi_threshold, chart_data, order_book, signal) -> None:
+    def _would_flip(self, new_signal: str) -> bool:
+        """Return what ``_recent_flip`` would, without recording ``new_signal``."""
+        cutoff = clock.utcnow() - timedelta(minutes=5)
+        seq = [s for t, s in self.decision_history if t >= cutoff][-2:] + [new_signal]
+        return seq == ["BUY", "HOLD", "SELL"] or seq == ["SELL", "HOLD", "BUY"]
+
+    def _compute_conflict(
+        self, condition_scores, rsi, rsi_threshold, chart_data, order_book, signal, *, macd_hist=None, record=True
+    ) -> dict:
         sell_conditions = {
             "rsi_below_45": rsi < 45,
             "ma_cross_down": not condition_scores.get("ma_cross", False),
             "orderbook_bias_down": (order_book.get("ask_volume", 0) > order_book.get("bid_volume", 0)) if order_book else False,
         }
-        macd_hist = self._calc_macd(chart_data)
+        if macd_hist is None:
+            macd_hist = self._calc_macd(chart_data)
         index = 0.0
         factors = []
         if any(condition_scores.values()) and any(sell_conditions.values()):
@@ -336,14 +422,18 @@ class EntryDecisionAgent:
         if (rsi > rsi_threshold and macd_hist < 0) or (rsi < 45 and macd_hist > 0):
             index += 0.3
             factors.append("RSI↑ + MACD↓" if rsi > rsi_threshold else "RSI↓ + MACD↑")
-        if self._recent_flip(signal):
+        flipped = self._recent_flip(signal) if record else self._would_flip(signal)
+        if flipped:
             index += 0.2
             factors.append("잦은 판단 변경")
         index = min(index, 1.0)
-        self.last_conflict = {
+        conflict = {
             "conflict_index": round(index, 2),
             "conflict_factors": factors,
         }
+        if record:
+            self.last_conflict = conflict
+        return conflict
 
     def decide_entry(self, signal, reason, score_percent):
         """Return ``(allow, reason)`` applying override rules."""
@@ -0,0 +1,203 @@
+"""Per-bar feature snapshots shared by the agents within a tick.
+
+The trading loop runs every few seconds but candle-derived features only
+change when a bar is added or the live bar's close moves.  :class:`FeatureCache`
+computes candle features once per such change and orderbook features once
+per book version, and hands both out as an immutable :class:`FeatureSnapshot`.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Hashable, Mapping, Optional, Sequence, Tuple
+
+from .indicators import MACD, RSI, IndicatorEngine
+
+
+@dataclass(frozen=True)
+class CandleFeatures:
+    """Indicators derived from the close series alone."""
+
+    length: int
+    close: float
+    ma5: Optional[float] = None
+    ma10: Optional[float] = None
+    ma20: Optional[float] = None
+    ma34: Optional[float] = None
+    prev_ma20: Optional[float] = None
+    rsi: float = 50.0
+    rsi_prev: float = 50.0
+    rsi20: float = 50.0
+    mean20: Optional[float] = None
+    std20: Optional[float] = None
+    volatility: float = 0.0
+    bb_score: int = 0
+    golden_cross: bool = False
+    macd_hist: float = 0.0
+
+
+@dataclass(frozen=True)
+class BookFeatures:
+    """Totals and ratios derived from one orderbook state."""
+
+    bid_volume: float = 0.0
+    ask_volume: float = 0.0
+    imbalance: float = 0.0
+    notional_score: float = 0.0
+    present: bool = False
+
+
+@dataclass(frozen=True)
+class FeatureSnapshot:
+    symbol: str
+    bar_timestamp: Optional[int]
+    book_version: Optional[Hashable]
+    candle: CandleFeatures
+    book: BookFeatures
+
+
+def candle_features(closes: Sequence[float], indicators: Optional[IndicatorEngine] = None) -> CandleFeatures:
+    """Compute :class:`CandleFeatures` for ``closes`` (oldest first).
+
+    ``indicators`` must already be synced with ``closes``; without it the
+    values are computed from the list directly.
+    """
+    n = len(closes)
+    if not n:
+        return CandleFeatures(length=0, close=0.0)
+    if indicators is not None:
+        ma5 = indicators.sma(5)
+        ma10 = indicators.sma(10)
+        ma20 = indicators.sma(20)
+        ma34 = indicators.sma(34)
+        prev_ma20 = indicators.sma(20, prev=True) if n >= 25 else None
+        rsi = indicators.rsi(14)
+        rsi_prev = indicators.rsi(14, prev=True) if n >= 15 else rsi
+        rsi20 = indicators.rsi(20)
+        stats = indicators.mean_std(20)
+        macd_hist = indicators.macd_histogram()
+    else:
+        ma5 = sum(closes[-5:]) / 5 if n >= 5 else None
+        ma10 = sum(closes[-10:]) / 10 if n >= 10 else None
+        ma20 = sum(closes[-20:]) / 20 if n >= 20 else None
+        ma34 = sum(closes[-34:]) / 34 if n >= 34 else None
+        prev_ma20 = sum(closes[-21:-1]) / 20 if n >= 25 else None
+        rsi14 = RSI.from_history(closes, 14)
+        rsi = rsi14.value
+        rsi_prev = rsi14.prev if n >= 15 else rsi
+        rsi20 = RSI.from_history(closes, 20).value
+        stats = None
+        if ma20 is not None:
+            stats = (ma20, (sum((c - ma20) ** 2 for c in closes[-20:]) / 20) ** 0.5)
+        macd_hist = MACD.from_history(closes).histogram if n >= 35 else 0.0
+    close = closes[-1]
+    mean20 = std20 = None
+    volatility = 0.0
+    bb_score = 0
+    if stats is not None:
+        mean20, std20 = stats
+        volatility = std20 / mean20 if mean20 else 0.0
+        if close > mean20 + 2 * std20:
+            bb_score = 1
+        elif close < mean20 - 2 * std20:
+            bb_score = -1
+    golden_cross = False
+    if prev_ma20 is not None:
+        golden_cross = ma5 > ma20 and closes[-6] <= prev_ma20
+    return CandleFeatures(
+        length=n,
+        close=close,
+        ma5=ma5,
+        ma10=ma10,
+        ma20=ma20,
+        ma34=ma34 if ma34 is not None else ma20,
+        prev_ma20=prev_ma20,
+        rsi=rsi,
+        rsi_prev=rsi_prev,
+        rsi20=rsi20,
+        mean20=mean20,
+        std20=std20,
+        volatility=volatility,
+        bb_score=bb_score,
+        golden_cross=golden_cross,
+        macd_hist=macd_hist,
+    )
+
+
+def book_features(order_book: Optional[Mapping[str, Any]]) -> BookFeatures:
+    """Compute :class:`BookFeatures` from an orderbook dict."""
+    if not order_book:
+        return BookFeatures()
+    bid_volume = order_book.get("bid_volume")
+    ask_volume = order_book.get("ask_volume")
+    if bid_volume is None or ask_volume is None:
+        bid_volume = sum(b.get("volume", 0) for b in order_book.get("bids", []))
+        ask_volume = sum(a.get("volume", 0) for a in order_book.get("asks", []))
+    imbalance = order_book.get("imbalance")
+    if imbalance is None:
+        total = bid_volume + ask_volume
+        imbalance = (bid_volume - ask_volume) / total if total > 0 else 0.0
+    bid_notional = order_book.get("bid_notional")
+    ask_notional = order_book.get("ask_notional")
+    if bid_notional is None or ask_notional is None:
+        bid_notional = sum(b.get("price", 0) * b.get("volume", 0) for b in list(order_book.get("bids") or [])[:10])
+        ask_notional = sum(a.get("price", 0) * a.get("volume", 0) for a in list(order_book.get("asks") or [])[:10])
+    total = bid_notional + ask_notional
+    return BookFeatures(
+        bid_volume=bid_volume,
+        ask_volume=ask_volume,
+        imbalance=imbalance,
+        notional_score=(bid_notional - ask_notional) / total if total else 0.0,
+        present=True,
+    )
+
+
+class FeatureCache:
+    """Reuse candle and orderbook features while their inputs are unchanged.
+
+    Candle features are keyed by ``(last bar timestamp, last close, length)``
+    plus the indicator engine version, because the newest bar keeps trading
+    until the minute closes; without bar times the whole close tuple is the
+    key.  Orderbook features are keyed by
+    the ``version`` of a streamed book, or recomputed for books without one.
+    """
+
+    def __init__(self, symbol: str, indicators: Optional[IndicatorEngine] = None) -> None:
+        self.symbol = symbol
+        self.indicators = indicators
+        self.hits = 0
+        self.misses = 0
+        self._candle_key: Optional[Tuple] = None
+        self._candle: Optional[CandleFeatures] = None
+        self._book_key: Optional[Hashable] = None
+        self._book: Optional[BookFeatures] = None
+
+    def get(
+        self,
+        closes: Sequence[float],
+        order_book: Optional[Mapping[str, Any]],
+        bar_times: Sequence[int] = (),
+    ) -> FeatureSnapshot:
+        """Return features for this tick; sync ``indicators`` first."""
+        if bar_times:
+            version = self.indicators.version if self.indicators is not None else None
+            key: Tuple = (bar_times[-1], closes[-1] if closes else None, len(closes), version)
+        else:
+            key = tuple(closes)
+        if key != self._candle_key or self._candle is None:
+            self._candle = candle_features(closes, self.indicators)
+            self._candle_key = key
+            self.misses += 1
+        else:
+            self.hits += 1
+        version = order_book.get("version") if order_book else None
+        if version is None or version != self._book_key or self._book is None:
+            self._book = book_features(order_book)
+            self._book_key = version
+        return FeatureSnapshot(
+            symbol=self.symbol,
+            bar_timestamp=bar_times[-1] if bar_times else None,
+            book_version=version,
+            candle=self._candle,
+            book=self._book,
+        )
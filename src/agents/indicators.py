@@ -0,0 +1,483 @@
+"""Streaming technical indicators shared by the agents of one symbol.
+
+Every indicator supports ``push`` (a new bar closed or started) and
+``replace_last`` (the newest, still trading bar changed), both O(1), so the
+per-tick cost no longer depends on the window length.  :class:`IndicatorEngine`
+keeps one instance per indicator and parameter set and feeds them from the
+candle series handed to the agents each tick.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Sequence, Tuple
+
+# Full recomputation interval guarding against float drift in running sums
+_RESYNC_EVERY = 1000
+
+
+class SMA:
+    """Simple moving average over the last ``period`` values."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.values: Deque[float] = deque(maxlen=period)
+        self.total = 0.0
+        self.prev: Optional[float] = None
+        self._ops = 0
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.values) < self.period:
+            return None
+        return self.total / self.period
+
+    def push(self, x: float) -> None:
+        self.prev = self.value
+        if len(self.values) == self.period:
+            self.total -= self.values[0]
+        self.values.append(x)
+        self.total += x
+        self._tick()
+
+    def replace_last(self, x: float) -> None:
+        self.total += x - self.values[-1]
+        self.values[-1] = x
+        self._tick()
+
+    def _tick(self) -> None:
+        self._ops += 1
+        if self._ops % _RESYNC_EVERY == 0:
+            self.total = sum(self.values)
+
+
+class RollingStats:
+    """Rolling mean and population variance using Welford add/remove updates."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.values: Deque[float] = deque(maxlen=period)
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._ops = 0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.period
+
+    @property
+    def variance(self) -> float:
+        n = len(self.values)
+        return max(self._m2 / n, 0.0) if n else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def _add(self, x: float) -> None:
+        n = len(self.values)  # count including x
+        delta = x - self.mean
+        self.mean += delta / n
+        self._m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float) -> None:
+        n = len(self.values)  # count excluding x
+        if n == 0:
+            self.mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / n
+        self._m2 -= delta * (x - self.mean)
+
+    def push(self, x: float) -> None:
+        if len(self.values) == self.period:
+            old = self.values.popleft()
+            self._remove(old)
+        self.values.append(x)
+        self._add(x)
+        self._tick()
+
+    def replace_last(self, x: float) -> None:
+        old = self.values.pop()
+        self._remove(old)
+        self.values.append(x)
+        self._add(x)
+        self._tick()
+
+    def _tick(self) -> None:
+        self._ops += 1
+        if self._ops % _RESYNC_EVERY == 0:
+            n = len(self.values)
+            self.mean = sum(self.values) / n
+            self._m2 = sum((v - self.mean) ** 2 for v in self.values)
+
+
+class EMA:
+    """Exponential moving average seeded with the first value."""
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.alpha = 2 / (period + 1)
+        self.value: Optional[float] = None
+        self.count = 0
+        self._base: Optional[float] = None  # value before the newest input
+
+    def _apply(self, x: float) -> float:
+        if self._base is None:
+            return x
+        return x * self.alpha + self._base * (1 - self.alpha)
+
+    def push(self, x: float) -> None:
+        self._base = self.value
+        self.value = self._apply(x)
+        self.count += 1
+
+    def replace_last(self, x: float) -> None:
+        self.value = self._apply(x)
+
+
+class MACD:
+    """MACD line, signal line and histogram from streaming EMAs.
+
+    All three EMAs are seeded with their first input, as in
+    ``EntryDecisionAgent._calc_macd``, so after the same closes the
+    histogram equals both that function and ``batch_indicators.macd_histogram``.
+    """
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    @classmethod
+    def from_history(cls, closes: Sequence[float], fast: int = 12, slow: int = 26, signal: int = 9) -> "MACD":
+        """Return a MACD already advanced through ``closes``."""
+        macd = cls(fast, slow, signal)
+        for x in closes:
+            macd.push(x)
+        return macd
+
+    @property
+    def count(self) -> int:
+        return self.fast.count
+
+    @property
+    def ready(self) -> bool:
+        """``True`` once ``slow + signal`` closes have been seen."""
+        return self.count >= self.slow.period + self.signal.period
+
+    @property
+    def macd(self) -> float:
+        if self.fast.value is None:
+            return 0.0
+        return self.fast.value - self.slow.value
+
+    @property
+    def histogram(self) -> float:
+        if self.signal.value is None:
+            return 0.0
+        return self.macd - self.signal.value
+
+    def push(self, x: float) -> None:
+        self.fast.push(x)
+        self.slow.push(x)
+        self.signal.push(self.macd)
+
+    def replace_last(self, x: float) -> None:
+        self.fast.replace_last(x)
+        self.slow.replace_last(x)
+        self.signal.replace_last(self.macd)
+
+
+class RSI:
+    """Relative Strength Index over the last ``period`` price changes.
+
+    ``method="cutler"`` averages gains and losses with simple means over the
+    window, matching ``EntryDecisionAgent._calc_rsi`` and
+    ``MarketSentimentAgent.calc_rsi``.  ``method="wilder"`` uses Wilder's
+    smoothing seeded with the first ``period`` changes.  ``value`` is
+    ``50.0`` until ``period + 1`` closes have been seen.
+    """
+
+    def __init__(self, period: int = 14, method: str = "cutler") -> None:
+        if method not in ("cutler", "wilder"):
+            raise ValueError(f"unknown RSI method: {method}")
+        self.period = period
+        self.method = method
+        self.closes: Deque[float] = deque(maxlen=2)
+        self.count = 0
+        self.prev = 50.0
+        # cutler state
+        self.diffs: Deque[float] = deque(maxlen=period)
+        self.gain_sum = 0.0
+        self.loss_sum = 0.0
+        self.loss_count = 0
+        self._ops = 0
+        # wilder state: averages before and after the newest change
+        self._avg: Optional[Tuple[float, float]] = None
+        self._base: Optional[Tuple[float, float]] = None
+        self._seed: list = []
+
+    @classmethod
+    def from_history(cls, closes: Sequence[float], period: int = 14, method: str = "cutler") -> "RSI":
+        """Return an RSI already advanced through ``closes``.
+
+        ``value`` is the RSI of ``closes`` and ``prev`` that of ``closes[:-1]``.
+        """
+        rsi = cls(period, method)
+        for x in closes:
+            rsi.push(x)
+        return rsi
+
+    @staticmethod
+    def _from_averages(avg_gain: float, avg_loss: float) -> float:
+        if avg_loss == 0:
+            return 100.0
+        rs = avg_gain / avg_loss
+        return 100 - (100 / (1 + rs))
+
+    @property
+    def value(self) -> float:
+        if self.count < self.period + 1:
+            return 50.0
+        if self.method == "cutler":
+            if self.loss_count == 0:
+                return 100.0
+            return self._from_averages(self.gain_sum / self.period, self.loss_sum / self.period)
+        return self._from_averages(*self._avg)
+
+    # cutler ------------------------------------------------------------
+    def _add_diff(self, d: float) -> None:
+        if d > 0:
+            self.gain_sum += d
+        elif d < 0:
+            self.loss_sum -= d
+            self.loss_count += 1
+
+    def _drop_diff(self, d: float) -> None:
+        if d > 0:
+            self.gain_sum -= d
+        elif d < 0:
+            self.loss_sum += d
+            self.loss_count -= 1
+
+    # wilder ------------------------------------------------------------
+    def _wilder(self, base: Optional[Tuple[float, float]], d: float) -> Optional[Tuple[float, float]]:
+        gain, loss = max(d, 0.0), max(-d, 0.0)
+        if base is None:
+            if len(self._seed) < self.period:
+                return None
+            return (
+                sum(max(x, 0.0) for x in self._seed) / self.period,
+                sum(max(-x, 0.0) for x in self._seed) / self.period,
+            )
+        avg_gain, avg_loss = base
+        n = self.period
+        return ((avg_gain * (n - 1) + gain) / n, (avg_loss * (n - 1) + loss) / n)
+
+    def push(self, x: float) -> None:
+        self.prev = self.value
+        if self.closes:
+            d = x - self.closes[-1]
+            if self.method == "cutler":
+                if len(self.diffs) == self.period:
+                    self._drop_diff(self.diffs[0])
+                self.diffs.append(d)
+                self._add_diff(d)
+                self._tick()
+            else:
+                self._base = self._avg
+                if self._base is None:
+                    self._seed.append(d)
+                self._avg = self._wilder(self._base, d)
+        self.closes.append(x)
+        self.count += 1
+
+    def replace_last(self, x: float) -> None:
+        if len(self.closes) < 2:
+            self.closes[-1] = x
+            return
+        d = x - self.closes[-2]
+        self.closes[-1] = x
+        if self.method == "cutler":
+            self._drop_diff(self.diffs[-1])
+            self.diffs[-1] = d
+            self._add_diff(d)
+            self._tick()
+        else:
+            if self._base is None:
+                self._seed[-1] = d
+            self._avg = self._wilder(self._base, d)
+
+    def _tick(self) -> None:
+        self._ops += 1
+        if self._ops % _RESYNC_EVERY == 0:
+            self.gain_sum = sum(d for d in self.diffs if d > 0)
+            self.loss_sum = sum(-d for d in self.diffs if d < 0)
+
+
+class IndicatorEngine:
+    """Per-symbol registry of streaming indicators fed from one close series.
+
+    Agents request values through the accessor methods; the first request
+    for an indicator registers it and replays the stored history, after which
+    it is updated incrementally by :meth:`sync`.  Readiness follows the length
+    of the series last passed to :meth:`sync`, so an accessor returns the same
+    value the agent would compute from that list directly.
+    """
+
+    def __init__(self, symbol: str = "KRW-BTC", capacity: int = 200) -> None:
+        self.symbol = symbol
+        self.times: Deque[Optional[int]] = deque(maxlen=capacity)
+        self.closes: Deque[float] = deque(maxlen=capacity)
+        self.window = 0
+        self.version = 0
+        self._indicators: Dict[str, object] = {}
+        self._factories: Dict[str, Callable[[], object]] = {}
+
+    def __len__(self) -> int:
+        return len(self.closes)
+
+    # ------------------------------------------------------------------
+    def _get(self, key: str, factory: Callable[[], object]):
+        ind = self._indicators.get(key)
+        if ind is None:
+            ind = factory()
+            for x in self.closes:
+                ind.push(x)
+            self._indicators[key] = ind
+            self._factories[key] = factory
+        return ind
+
+    def push(self, close: float, timestamp: Optional[int] = None) -> None:
+        """Append a new bar."""
+        self.times.append(timestamp)
+        self.closes.append(close)
+        for ind in self._indicators.values():
+            ind.push(close)
+        self.version += 1
+
+    def replace_last(self, close: float) -> None:
+        """Update the newest bar's close."""
+        if close == self.closes[-1]:
+            return
+        self.closes[-1] = close
+        for ind in self._indicators.values():
+            ind.replace_last(close)
+        self.version += 1
+
+    def reset(self, closes: Sequence[float], times: Optional[Sequence[int]] = None) -> None:
+        """Drop all state and rebuild every registered indicator from ``closes``.
+
+        Also used to seed the engine from a long REST backfill so that
+        history-dependent indicators such as MACD start warmed up.
+        """
+        self.times.clear()
+        self.closes.clear()
+        self._indicators = {key: factory() for key, factory in self._factories.items()}
+        times = times if times else [None] * len(closes)
+        for ts, close in zip(times, closes):
+            self.push(close, ts)
+
+    def sync(
+        self,
+        closes: Sequence[float],
+        times: Sequence[int] = (),
+        *,
+        history: Optional[Callable[[], Tuple[Sequence[int], Sequence[float]]]] = None,
+    ) -> None:
+        """Bring the engine in line with ``closes`` (oldest first).
+
+        With bar start ``times`` only the bars after the last known one are
+        pushed, which is O(1) per tick.  Without times, or when the series
+        does not continue the stored one, everything is rebuilt: from
+        ``history()`` (``(times, closes)`` of the full candle buffer, e.g.
+        after a gap repair) when it ends with the same bars, otherwise from
+        ``closes`` alone.
+        """
+        self.window = len(closes)
+        if not closes:
+            return
+        if times and len(times) == len(closes) and self.times and self.times[-1] is not None:
+            last = self.times[-1]
+            j = len(times) - 1
+            while j >= 0 and times[j] > last:
+                j -= 1
+            continuous = j >= 0 and times[j] == last
+            if continuous and j >= 1 and len(self.closes) >= 2:
+                continuous = times[j - 1] == self.times[-2] and closes[j - 1] == self.closes[-2]
+            if continuous:
+                self.replace_last(closes[j])
+                for k in range(j + 1, len(closes)):
+                    self.push(closes[k], times[k])
+                return
+        if not times and list(self.closes)[-len(closes):] == list(closes):
+            return
+        if times and history is not None and self._reseed(closes, times, *history()):
+            return
+        self.reset(closes, times)
+
+    def _reseed(
+        self,
+        closes: Sequence[float],
+        times: Sequence[int],
+        history_times: Sequence[int],
+        history_closes: Sequence[float],
+    ) -> bool:
+        """Rebuild from the longer ``history`` if it covers the bars in ``times``."""
+        times = list(times)
+        history_times = list(history_times)
+        if len(history_times) <= len(times) or times[-1] not in history_times:
+            return False
+        end = history_times.index(times[-1]) + 1
+        if history_times[end - len(times): end] != times:
+            return False
+        self.reset(list(history_closes)[:end - 1] + [closes[-1]], history_times[:end])
+        return True
+
+    # ------------------------------------------------------------------
+    def sma(self, period: int, *, prev: bool = False) -> Optional[float]:
+        """Mean of the last ``period`` closes (``prev``: excluding the newest)."""
+        if self.window < period + (1 if prev else 0):
+            return None
+        ind = self._get(f"sma:{period}", lambda: SMA(period))
+        return ind.prev if prev else ind.value
+
+    def mean_std(self, period: int) -> Optional[Tuple[float, float]]:
+        """Return ``(mean, population std)`` of the last ``period`` closes."""
+        if self.window < period:
+            return None
+        ind = self._get(f"stats:{period}", lambda: RollingStats(period))
+        return ind.mean, ind.std
+
+    def bollinger(self, period: int = 20, k: float = 2.0) -> Optional[Tuple[float, float, float]]:
+        """Return ``(middle, upper, lower)`` Bollinger bands."""
+        stats = self.mean_std(period)
+        if stats is None:
+            return None
+        mean, std = stats
+        return mean, mean + k * std, mean - k * std
+
+    def rsi(self, period: int = 14, *, prev: bool = False, method: str = "cutler") -> float:
+        """RSI of the series (``prev``: of the series without the newest close)."""
+        if self.window - (1 if prev else 0) < period + 1:
+            return 50.0
+        ind = self._get(f"rsi:{method}:{period}", lambda: RSI(period, method))
+        return ind.prev if prev else ind.value
+
+    def ema(self, period: int) -> Optional[float]:
+        if not self.window:
+            return None
+        return self._get(f"ema:{period}", lambda: EMA(period)).value
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> MACD:
+        """Return the streaming MACD over every bar seen since the last reset."""
+        return self._get(f"macd:{fast}:{slow}:{signal}", lambda: MACD(fast, slow, signal))
+
+    def macd_histogram(self, fast: int = 12, slow: int = 26, signal: int = 9) -> float:
+        """MACD histogram, ``0.0`` until ``slow + signal`` bars have been seen."""
+        macd = self.macd(fast, slow, signal)
+        return macd.histogram if macd.ready else 0.0
+
@@ -1,17 +1,38 @@
 import json
-import time
+import os
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from config import LEARNING_SNAPSHOT_SECONDS
+
+from . import clock
+
 
 class LearningAgent:
-    """Persistently learn strategy weights from trade history."""
+    """Persistently learn strategy weights from trade history.
+
+    State is kept as a compact snapshot (``state_path``) plus an append-only
+    journal next to it.  Each weight change or trade appends one numbered
+    line to the journal; a snapshot is written every ``snapshot_every``
+    seconds and on :meth:`snapshot`, by renaming a temporary file over the
+    old one, after which the journal is truncated.  Loading applies the
+    journal lines newer than the snapshot's ``seq``.
+    """
 
-    def __init__(self, state_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        state_path: str | Path | None = None,
+        *,
+        snapshot_every: float = LEARNING_SNAPSHOT_SECONDS,
+    ) -> None:
         self.state_path = Path(state_path) if state_path else Path("data/learning_state.json")
+        self.journal_path = self.state_path.with_suffix(".journal.jsonl")
+        self.snapshot_every = snapshot_every
         self.weights: Dict[str, float] = {}
         self.history: List[Dict[str, Any]] = []
+        self.seq = 0
         self._load()
+        self._last_snapshot = clock.time()
 
     # ------------------------------------------------------------------
     def _load(self) -> None:
@@ -20,15 +41,66 @@ class LearningAgent:
                 data = json.load(f)
             self.weights = data.get("weights", {})
             self.history = data.get("history", [])
+            self.seq = data.get("seq", 0)
         except FileNotFoundError:
             self.weights = {}
             self.history = []
+            self.seq = 0
+        try:
+            with open(self.journal_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return
+        good = 0
+        for line in raw.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("unterminated line")
+                entry = json.loads(line)
+            except ValueError:
+                # a line cut short by a crash ends the journal
+                break
+            if entry.get("seq", 0) > self.seq:
+                self._apply(entry)
+            good += len(line)
+        if good < len(raw):
+            # drop the torn tail so later appends start on a fresh line
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good)
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        self.weights.update(entry.get("set", {}))
+        for name in entry.get("del", []):
+            self.weights.pop(name, None)
+        if "trade" in entry:
+            self.history.append(entry["trade"])
+        self.seq = entry["seq"]
+
+    def _journal(self, entry: Dict[str, Any]) -> None:
+        """Append ``entry`` to the journal and snapshot when one is due."""
+        self.seq += 1
+        entry["seq"] = self.seq
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if clock.time() - self._last_snapshot >= self.snapshot_every:
+            self._save()
 
     def _save(self) -> None:
         self.state_path.parent.mkdir(parents=True, exist_ok=True)
-        data = {"weights": self.weights, "history": self.history}
-        with open(self.state_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        data = {"seq": self.seq, "weights": self.weights, "history": self.history}
+        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.state_path)
+        # entries up to ``seq`` are in the snapshot; a crash before this
+        # truncation only leaves lines that loading skips
+        open(self.journal_path, "w", encoding="utf-8").close()
+        self._last_snapshot = clock.time()
+
+    def snapshot(self) -> None:
+        """Write the full state now, e.g. on shutdown."""
+        self._save()
 
     def record_trade(
         self,
@@ -39,23 +111,23 @@ class LearningAgent:
         risk: float | None = None,
     ) -> None:
         """Store trade result with additional context."""
-        self.history.append(
-            {
-                "strategy": strategy,
-                "return": return_rate,
-                "market_phase": market_phase,
-                "emotion": emotion_score,
-                "risk": risk,
-                "timestamp": time.time(),
-            }
-        )
-        self._save()
+        trade = {
+            "strategy": strategy,
+            "return": return_rate,
+            "market_phase": market_phase,
+            "emotion": emotion_score,
+            "risk": risk,
+            "timestamp": clock.time(),
+        }
+        self.history.append(trade)
+        self._journal({"trade": trade})
 
     def update(self, trade_history: Optional[List[Dict[str, Any]]] = None) -> Dict[str, float]:
         """Update strategy weights using the last month of trades."""
 
         history = trade_history if trade_history is not None else self.history
-        one_month_ago = time.time() - 30 * 24 * 3600
+        before = dict(self.weights)
+        one_month_ago = clock.time() - 30 * 24 * 3600
         recent = [t for t in history if t.get("timestamp", 0) >= one_month_ago]
 
         grouped: Dict[str, List[Dict[str, Any]]] = {}
@@ -76,7 +148,7 @@ class LearningAgent:
             if phase_counts:
                 phase_ratio = max(phase_counts.values()) / len(trades)
 
-            emotion = sum(t.get("emotion", 0.0) for t in trades) / len(trades)
+            emotion = sum(t.get("emotion") or 0.0 for t in trades) / len(trades)
 
             score = avg_ret + 0.1 * trend + 0.1 * emotion + 0.5 * phase_ratio
             old = self.weights.get(name, 1.0)
@@ -87,7 +159,13 @@ class LearningAgent:
             if self.weights[name] < -1:
                 del self.weights[name]
 
-        self._save()
+        changed = {k: v for k, v in self.weights.items() if before.get(k) != v}
+        removed = [k for k in before if k not in self.weights]
+        if changed or removed:
+            entry: Dict[str, Any] = {"set": changed}
+            if removed:
+                entry["del"] = removed
+            self._journal(entry)
         return self.weights
 
     def adjust_from_signal(self, strategy: str, score_percent: float, confidence: float | None) -> None:
@@ -96,5 +174,5 @@ class LearningAgent:
         weight = self.weights.get(strategy, 1.0)
         weight += 0.01 * (score_percent / 100.0) * conf
         self.weights[strategy] = weight
-        self._save()
+        self._journal({"set": {strategy: weight}})
 
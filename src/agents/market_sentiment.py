@@ -1,10 +1,14 @@
 import json
 import math
+from collections.abc import Mapping
 from pathlib import Path
 from config import LOG_BASE_DIR
 from datetime import datetime
 from typing import List, Optional
 
+from . import clock
+from .features import FeatureSnapshot
+from .indicators import IndicatorEngine
 from .utils import get_upbit_candles
 
 
@@ -13,7 +17,8 @@ class MarketSentimentAgent:
 
     LEVELS = ["EXTREME_FEAR", "FEAR", "NEUTRAL", "GREED", "EXTREME_GREED"]
 
-    def __init__(self):
+    def __init__(self, ma_path: str | Path | None = None):
+        self.ma_path = Path(ma_path) if ma_path else None
         self.state = "NEUTRAL"
         self.rsi = 50.0
         self.bb_score = 0
@@ -64,8 +69,17 @@ class MarketSentimentAgent:
         candle_data: Optional[List[float]] = None,
         order_book=None,
         trade_strength=None,
+        *,
+        indicators: Optional[IndicatorEngine] = None,
+        features: Optional[FeatureSnapshot] = None,
     ) -> str:
-        """Update sentiment using RSI, order book and Bollinger Bands."""
+        """Update sentiment using RSI, order book and Bollinger Bands.
+
+        ``indicators`` is an :class:`IndicatorEngine` already synced with
+        ``candle_data``; RSI and bands are then read from it instead of being
+        recomputed from the list.  ``features`` is a cached
+        :class:`FeatureSnapshot` for ``candle_data`` and ``order_book``.
+        """
 
         if candle_data is None:
             try:
@@ -73,15 +87,26 @@ class MarketSentimentAgent:
             except Exception:
                 return self.state
 
-        rsi = self.calc_rsi(candle_data, period=20)
+        if features is not None:
+            rsi = features.candle.rsi20
+            bands = None
+        elif indicators is not None:
+            rsi = indicators.rsi(20)
+            bands = indicators.bollinger(20, 2)
+        else:
+            rsi = self.calc_rsi(candle_data, period=20)
+            bands = None
+            if len(candle_data) >= 20:
+                ma = sum(candle_data[-20:]) / 20
+                variance = sum((c - ma) ** 2 for c in candle_data[-20:]) / 20
+                stddev = math.sqrt(variance)
+                bands = (ma, ma + 2 * stddev, ma - 2 * stddev)
         self.rsi = rsi
 
-        if len(candle_data) >= 20:
-            ma = sum(candle_data[-20:]) / 20
-            variance = sum((c - ma) ** 2 for c in candle_data[-20:]) / 20
-            stddev = math.sqrt(variance)
-            upper = ma + 2 * stddev
-            lower = ma - 2 * stddev
+        if features is not None:
+            bb_score = features.candle.bb_score
+        elif bands is not None:
+            _, upper, lower = bands
             price = candle_data[-1]
             bb_score = 1 if price > upper else -1 if price < lower else 0
         else:
@@ -89,16 +114,23 @@ class MarketSentimentAgent:
         self.bb_score = bb_score
 
         ob_score = 0
-        if order_book and isinstance(order_book, dict):
-            bid = order_book.get("bid_volume", 0)
-            ask = order_book.get("ask_volume", 0)
-            total = bid + ask
-            if total > 0:
-                ratio = (bid - ask) / total
-                if ratio > 0.6:
-                    ob_score = 1
-                elif ratio < -0.6:
-                    ob_score = -1
+        if features is not None and features.book.present:
+            ratio = features.book.imbalance
+            if ratio > 0.6:
+                ob_score = 1
+            elif ratio < -0.6:
+                ob_score = -1
+        elif order_book and isinstance(order_book, Mapping):
+            ratio = order_book.get("imbalance")
+            if ratio is None:
+                bid = order_book.get("bid_volume", 0)
+                ask = order_book.get("ask_volume", 0)
+                total = bid + ask
+                ratio = (bid - ask) / total if total > 0 else 0.0
+            if ratio > 0.6:
+                ob_score = 1
+            elif ratio < -0.6:
+                ob_score = -1
 
         ts_score = 0
         if trade_strength is not None:
@@ -152,7 +184,7 @@ class MarketSentimentAgent:
     # --------------------------------------------------------------
     def _update_ma(self) -> None:
         """Update 3-day moving average of emotion index."""
-        path = LOG_BASE_DIR / "감정지수" / "emotion_MA.json"
+        path = self.ma_path or LOG_BASE_DIR / "감정지수" / "emotion_MA.json"
         path.parent.mkdir(parents=True, exist_ok=True)
         try:
             with open(path, "r", encoding="utf-8") as f:
@@ -160,7 +192,7 @@ class MarketSentimentAgent:
         except Exception:
             data = {}
         history = data.get("history", [])
-        today = datetime.utcnow().strftime("%Y-%m-%d")
+        today = clock.utcnow().strftime("%Y-%m-%d")
         found = False
         for h in history:
             if h.get("date") == today:
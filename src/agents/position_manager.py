@@ -32,13 +32,20 @@ def calculate_order_amount(cash, recent_volatility: float | None = None):
     return amount
 
 
-def entry_block_reason(has_position: bool, confidence: Optional[float], score_percent: Optional[float]) -> Optional[str]:
+def entry_block_reason(
+    has_position: bool,
+    confidence: Optional[float],
+    score_percent: Optional[float],
+    *,
+    min_confidence: float = 0.7,
+    min_score: float = 75,
+) -> Optional[str]:
     """Return a reason string if trade entry should be denied."""
     if has_position:
         return "ALREADY_IN_POSITION"
-    if confidence is not None and confidence < 0.7:
+    if confidence is not None and confidence < min_confidence:
         return "LOW_CONFIDENCE"
-    if score_percent is not None and score_percent < 75:
+    if score_percent is not None and score_percent < min_score:
         return "INSUFFICIENT_CONDITION_SCORE"
     return None
 
@@ -46,7 +53,9 @@ def entry_block_reason(has_position: bool, confidence: Optional[float], score_pe
 class PositionManager:
     """Manage open positions and evaluate exit conditions."""
 
-    def __init__(self):
+    def __init__(self, take_profit: float = 0.03, stop_loss: float = -0.02):
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
         self.positions = []
         self.total_buys = 0
         self.total_sells = 0
@@ -61,9 +70,9 @@ class PositionManager:
     def update(self, position, entry_price, current_price):
         """Evaluate open position and return action.
 
-        - Profit >= 3%   -> ``CLOSE``
-        - Loss <= -2%    -> ``PARTIAL_CLOSE`` on first trigger, ``CLOSE`` if
-          already reduced.
+        - Profit >= ``take_profit`` (3%)  -> ``CLOSE``
+        - Loss <= ``stop_loss`` (-2%)     -> ``PARTIAL_CLOSE`` on first trigger,
+          ``CLOSE`` if already reduced.
         """
 
         if position is None:
@@ -71,10 +80,10 @@ class PositionManager:
 
         change = (current_price - entry_price) / entry_price
 
-        if change >= 0.03:
+        if change >= self.take_profit:
             return "CLOSE"
 
-        if change <= -0.02:
+        if change <= self.stop_loss:
             if not position.get("half_closed"):
                 position["quantity"] *= 0.5
                 position["half_closed"] = True
@@ -53,14 +53,27 @@ class StrategyEvaluator:
         avg_mae = statistics.mean(maes) if maes else 0.0
         return avg_mfe, avg_mae
 
-    def evaluate(self, returns: List[float], trades: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Return evaluation metrics for a strategy."""
+    def evaluate(
+        self,
+        returns: List[float],
+        trades: List[Dict[str, Any]],
+        *,
+        bootstrap: int = 0,
+        block: int | None = None,
+        seed: int | None = None,
+    ) -> Dict[str, Any]:
+        """Return evaluation metrics for a strategy.
+
+        With ``bootstrap`` set to a resample count, the result also holds a
+        ``"bootstrap"`` entry with block-bootstrap confidence intervals from
+        :func:`trade_bootstrap.bootstrap_metrics` (requires NumPy).
+        """
         total_return = sum(returns)
         max_dd = self._max_drawdown(returns)
         sqn = self._sqn(returns)
         phase, fit_ratio = self.market_fit(trades)
         avg_mfe, avg_mae = self.mfe_mae(trades)
-        return {
+        result = {
             "total_return": total_return,
             "max_drawdown": max_dd,
             "sqn": sqn,
@@ -69,3 +82,72 @@ class StrategyEvaluator:
             "avg_mfe": avg_mfe,
             "avg_mae": avg_mae,
         }
+        if bootstrap:
+            from trade_bootstrap import bootstrap_metrics
+
+            result["bootstrap"] = bootstrap_metrics(returns, samples=bootstrap, block=block, seed=seed)
+        return result
+
+
+class IncrementalEvaluator:
+    """:meth:`StrategyEvaluator.evaluate` metrics maintained trade by trade.
+
+    Each :meth:`add` is O(1): the running sum and peak give total return and
+    drawdown, Welford's update gives the SQN variance, and MFE/MAE and market
+    phases are kept as running sums and counts.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_return = 0.0
+        self.peak = 0.0
+        self.max_drawdown = 0.0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._trades = 0
+        self._mfe_sum = 0.0
+        self._mae_sum = 0.0
+        self._phases: Dict[str, int] = {}
+        self._phase_total = 0
+
+    def add(self, ret: float, trade: Dict[str, Any] | None = None) -> None:
+        """Record one closed trade's return and optional trade details."""
+        self.count += 1
+        self.total_return += ret
+        self.peak = max(self.peak, self.total_return)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.total_return)
+        delta = ret - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (ret - self._mean)
+        if trade is not None:
+            self._trades += 1
+            self._mfe_sum += trade.get("max_profit", 0.0)
+            self._mae_sum += trade.get("max_loss", 0.0)
+            phase = trade.get("market_phase")
+            if phase:
+                self._phases[phase] = self._phases.get(phase, 0) + 1
+                self._phase_total += 1
+
+    @property
+    def sqn(self) -> float:
+        if self.count < 2 or self._m2 <= 0:
+            return 0.0
+        std = (self._m2 / (self.count - 1)) ** 0.5
+        return (self._mean / std) * (self.count ** 0.5)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the same keys as :meth:`StrategyEvaluator.evaluate`."""
+        if self._phases:
+            phase = max(self._phases, key=self._phases.get)
+            fit_ratio = self._phases[phase] / self._phase_total
+        else:
+            phase, fit_ratio = "UNKNOWN", 0.0
+        return {
+            "total_return": self.total_return,
+            "max_drawdown": self.max_drawdown,
+            "sqn": self.sqn,
+            "market_fit": phase,
+            "fit_ratio": fit_ratio,
+            "avg_mfe": self._mfe_sum / self._trades if self._trades else 0.0,
+            "avg_mae": self._mae_sum / self._trades if self._trades else 0.0,
+        }
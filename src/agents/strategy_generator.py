@@ -1,7 +1,72 @@
+import hashlib
 import json
 import random
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Parameters that identify each condition type, in canonical order
+CONDITION_FIELDS = {
+    "MA": ("period", "direction"),
+    "RSI": ("period", "level", "op"),
+    "MACD": ("fast", "slow", "signal"),
+}
+
+
+def canonical_conditions(conditions: Iterable[Dict[str, Any]]) -> Tuple[Tuple[Any, ...], ...]:
+    """Return a hashable, order-insensitive form of a genome's conditions.
+
+    Conditions are combined with AND, so their order and repeats do not
+    change what a genome does.
+    """
+    keys = set()
+    for cond in conditions:
+        ctype = cond.get("type")
+        fields = CONDITION_FIELDS.get(ctype)
+        if fields is None:
+            raise ValueError(f"unknown condition type: {ctype!r}")
+        keys.add((ctype,) + tuple(cond[f] for f in fields))
+    return tuple(sorted(keys))
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def genome_signature(conditions: Iterable[Dict[str, Any]]) -> str:
+    """Return a stable hash of :func:`canonical_conditions`, usable across runs."""
+    canonical = [[_plain(v) for v in cond] for cond in canonical_conditions(conditions)]
+    return hashlib.sha1(json.dumps(canonical, separators=(",", ":")).encode()).hexdigest()
+
+
+class FitnessCache:
+    """Evaluation results keyed by genome signature and dataset version.
+
+    ``mutate`` and ``crossover`` often rebuild genomes that were already
+    scored under a different id; looking them up by signature skips the
+    backtest.  The dataset version names the price history and backtest
+    settings the metrics were computed with.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> None:
+        self.entries: Dict[str, Dict[str, Dict[str, Any]]] = entries or {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.entries.values())
+
+    def get(self, strategy: Dict[str, Any], dataset: str) -> Optional[Dict[str, Any]]:
+        found = self.entries.get(dataset, {}).get(genome_signature(strategy.get("conditions", [])))
+        if found is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(found)
+
+    def put(self, strategy: Dict[str, Any], dataset: str, metrics: Dict[str, Any]) -> None:
+        self.entries.setdefault(dataset, {})[genome_signature(strategy.get("conditions", []))] = dict(metrics)
 
 
 class StrategyGenerator:
@@ -10,6 +75,7 @@ class StrategyGenerator:
     def __init__(self, *, seed: Optional[int] = None) -> None:
         self.rng = random.Random(seed)
         self.generated: List[Dict[str, Any]] = []
+        self.fitness_cache = FitnessCache()
 
     # condition builders -------------------------------------------------
     def _ma_condition(self) -> Dict[str, Any]:
@@ -96,7 +162,7 @@ class StrategyGenerator:
 
     # persistence --------------------------------------------------------
     def save(self, path: str | Path) -> None:
-        data = {"strategies": self.generated}
+        data = {"strategies": self.generated, "fitness": self.fitness_cache.entries}
         Path(path).parent.mkdir(parents=True, exist_ok=True)
         with open(path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
@@ -106,6 +172,8 @@ class StrategyGenerator:
             with open(path, "r", encoding="utf-8") as f:
                 data = json.load(f)
             self.generated = data.get("strategies", [])
+            self.fitness_cache = FitnessCache(data.get("fitness"))
         except FileNotFoundError:
             self.generated = []
+            self.fitness_cache = FitnessCache()
         return self.generated
@@ -1,64 +1,130 @@
 """Utility functions for fetching market data."""
 
-try:
-    import requests  # type: ignore
-except Exception:  # pragma: no cover - fallback for minimal environments
-    class _DummyRequests:
-        class RequestException(Exception):
-            pass
-
-        @staticmethod
-        def get(*_, **__):
-            raise _DummyRequests.RequestException("requests library not available")
-
-    requests = _DummyRequests()
 import time
+from datetime import datetime, timezone
 from typing import List, Dict, Any
 
+from market_recorder import get_recorder
+from upbit_client import RequestException, get_client
+
+
+def _fetch_minute_candles(symbol: str, count: int) -> List[Dict[str, Any]]:
+    """Return raw 1-minute candle rows from Upbit, newest first."""
+    params = {"market": symbol, "count": count}
+    try:
+        data = get_client().get("/v1/candles/minutes/1", params)
+    except RequestException as exc:
+        raise RuntimeError(f"캔들 데이터를 가져오지 못했습니다: {exc}") from exc
+    recorder = get_recorder()
+    if recorder is not None:
+        # the newest candle is still forming; only closed bars are recorded
+        now = time.time()
+        closed = [b for b in _to_bars(data) if b["timestamp"] + 60 <= now]
+        recorder.record_candles(symbol, closed)
+    return data
+
+
+def _to_bars(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Convert raw candle rows (newest first) into chronological OHLCV dicts."""
+    bars = []
+    for candle in reversed(data):
+        start = datetime.fromisoformat(candle["candle_date_time_utc"])
+        bars.append(
+            {
+                "timestamp": int(start.replace(tzinfo=timezone.utc).timestamp()),
+                "open": candle["opening_price"],
+                "high": candle["high_price"],
+                "low": candle["low_price"],
+                "close": candle["trade_price"],
+                "volume": candle.get("candle_acc_trade_volume", 0.0),
+            }
+        )
+    return bars
+
 
 def get_upbit_candles(symbol: str = "KRW-BTC", count: int = 20) -> List[float]:
     """Fetch minute candles from Upbit and return a list of closing prices."""
-    url = "https://api.upbit.com/v1/candles/minutes/1"
-    params = {"market": symbol, "count": count}
-    while True:
-        try:
-            response = requests.get(url, params=params, timeout=5)
-            if response.status_code == 429:
-                time.sleep(1)
-                continue
-            response.raise_for_status()
-            data = response.json()
-            closes = [candle["trade_price"] for candle in reversed(data)]
-            return closes
-        except requests.RequestException as exc:
-            raise RuntimeError(f"캔들 데이터를 가져오지 못했습니다: {exc}") from exc
+    data = _fetch_minute_candles(symbol, count)
+    return [candle["trade_price"] for candle in reversed(data)]
+
+
+def get_upbit_candle_bars(symbol: str = "KRW-BTC", count: int = 20) -> List[Dict[str, Any]]:
+    """Fetch minute candles as OHLCV dicts in chronological order.
+
+    ``timestamp`` is the candle start time in epoch seconds (UTC).
+    """
+    return _to_bars(_fetch_minute_candles(symbol, count))
+
+
+# Maximum number of markets sent in one ``markets=`` query
+MARKETS_PER_REQUEST = 50
+
+
+def _parse_orderbook(data: Dict[str, Any], depth: int) -> Dict[str, Any]:
+    recorder = get_recorder()
+    if recorder is not None and data.get("market"):
+        ts = data.get("timestamp") or int(time.time() * 1000)
+        recorder.record_orderbook(data["market"], ts, data.get("orderbook_units", []))
+    units = data.get("orderbook_units", [])[:depth]
+    bids = [
+        {"price": u["bid_price"], "volume": u["bid_size"]}
+        for u in units
+    ]
+    asks = [
+        {"price": u["ask_price"], "volume": u["ask_size"]}
+        for u in units
+    ]
+    bid_volume = sum(u["bid_size"] for u in units)
+    ask_volume = sum(u["ask_size"] for u in units)
+    return {
+        "bids": bids,
+        "asks": asks,
+        "bid_volume": bid_volume,
+        "ask_volume": ask_volume,
+    }
 
 
 def get_upbit_orderbook(symbol: str = "KRW-BTC", depth: int = 10) -> Dict[str, Any]:
     """Fetch orderbook snapshot from Upbit with depth information."""
-    url = "https://api.upbit.com/v1/orderbook"
     params = {"markets": symbol}
     try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        data = response.json()[0]
-        units = data.get("orderbook_units", [])[:depth]
-        bids = [
-            {"price": u["bid_price"], "volume": u["bid_size"]}
-            for u in units
-        ]
-        asks = [
-            {"price": u["ask_price"], "volume": u["ask_size"]}
-            for u in units
-        ]
-        bid_volume = sum(u["bid_size"] for u in units)
-        ask_volume = sum(u["ask_size"] for u in units)
-        return {
-            "bids": bids,
-            "asks": asks,
-            "bid_volume": bid_volume,
-            "ask_volume": ask_volume,
-        }
-    except requests.RequestException as exc:
+        data = get_client().get("/v1/orderbook", params)[0]
+        return _parse_orderbook(data, depth)
+    except RequestException as exc:
         raise RuntimeError(f"호가 정보를 가져오지 못했습니다: {exc}") from exc
 
+
+def _get_batched(path: str, symbols: List[str]) -> List[Dict[str, Any]]:
+    """Query ``path`` for many markets using as few requests as possible."""
+    rows: List[Dict[str, Any]] = []
+    for i in range(0, len(symbols), MARKETS_PER_REQUEST):
+        chunk = symbols[i : i + MARKETS_PER_REQUEST]
+        rows.extend(get_client().get(path, {"markets": ",".join(chunk)}))
+    return rows
+
+
+def get_upbit_orderbooks(symbols: List[str], depth: int = 10) -> Dict[str, Dict[str, Any]]:
+    """Fetch orderbooks for ``symbols`` in batched requests, keyed by market."""
+    try:
+        rows = _get_batched("/v1/orderbook", symbols)
+    except RequestException as exc:
+        raise RuntimeError(f"호가 정보를 가져오지 못했습니다: {exc}") from exc
+    return {row["market"]: _parse_orderbook(row, depth) for row in rows}
+
+
+def get_upbit_tickers(symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Fetch ticker rows for ``symbols`` in batched requests, keyed by market."""
+    try:
+        rows = _get_batched("/v1/ticker", symbols)
+    except RequestException as exc:
+        raise RuntimeError(f"시세 정보를 가져오지 못했습니다: {exc}") from exc
+    return {row["market"]: row for row in rows}
+
+
+def get_upbit_markets(quote: str = "KRW") -> List[str]:
+    """Return the tradable market codes quoted in ``quote``."""
+    try:
+        rows = get_client().get("/v1/market/all", {"isDetails": "false"})
+    except RequestException as exc:
+        raise RuntimeError(f"마켓 목록을 가져오지 못했습니다: {exc}") from exc
+    return [row["market"] for row in rows if row["market"].startswith(f"{quote}-")]
@@ -0,0 +1,196 @@
+"""Vectorized indicators over whole price arrays for research and backtests.
+
+Each function takes closes oldest first and returns one value per bar.  The
+value at index ``i`` equals what the live implementation returns when called
+with ``closes[: i + 1]`` (``EntryDecisionAgent._calc_rsi``/``_calc_macd``,
+``MarketSentimentAgent.calc_rsi`` and the checks in
+``EntryDecisionAgent.evaluate``), so a backtest over years of minute bars sees
+the same signals as the bot without calling the per-window loops.
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Rows processed per step by the windowed reductions and the EMA recursion
+_CHUNK = 65_536
+_EMA_BLOCK = 256
+
+
+def _as_array(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _rolling(values: np.ndarray, period: int, reduce) -> np.ndarray:
+    """Apply ``reduce(windows)`` chunk by chunk; NaN before ``period`` values."""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    windows = sliding_window_view(values, period)
+    for start in range(0, len(windows), _CHUNK):
+        out[period - 1 + start: period - 1 + start + _CHUNK] = reduce(windows[start: start + _CHUNK])
+    return out
+
+
+def sma(closes, period: int) -> np.ndarray:
+    """Simple moving average; NaN until ``period`` closes are available."""
+    return _rolling(_as_array(closes), period, lambda w: w.sum(axis=1) / period)
+
+
+def rolling_std(closes, period: int) -> np.ndarray:
+    """Population standard deviation over the last ``period`` closes."""
+
+    def reduce(w: np.ndarray) -> np.ndarray:
+        mean = w.sum(axis=1) / period
+        return np.sqrt(((w - mean[:, None]) ** 2).sum(axis=1) / period)
+
+    return _rolling(_as_array(closes), period, reduce)
+
+
+def rsi(closes, period: int = 14) -> np.ndarray:
+    """Cutler RSI (simple averages of the last ``period`` changes).
+
+    ``50.0`` until ``period + 1`` closes exist and ``100.0`` when the window
+    holds no losses, as in the live implementations.
+    """
+    closes = _as_array(closes)
+    out = np.full(len(closes), 50.0)
+    if len(closes) < period + 1:
+        return out
+    diffs = np.diff(closes)
+    gains = _rolling(np.where(diffs > 0, diffs, 0.0), period, lambda w: w.sum(axis=1))[period - 1:]
+    losses = _rolling(np.where(diffs < 0, -diffs, 0.0), period, lambda w: w.sum(axis=1))[period - 1:]
+    avg_gain = gains / period
+    avg_loss = losses / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - (100 / (1 + avg_gain / avg_loss))
+    out[period:] = np.where(avg_loss == 0, 100.0, value)
+    return out
+
+
+def ema(values, period: int) -> np.ndarray:
+    """EMA seeded with the first value, computed block-wise.
+
+    Inside each block the recursion is unrolled into a lower-triangular
+    matrix product; the last value of a block carries into the next.
+    """
+    values = _as_array(values)
+    out = np.empty(len(values))
+    if not len(values):
+        return out
+    k = 2 / (period + 1)
+    decay = 1 - k
+    idx = np.arange(_EMA_BLOCK)
+    lag = idx[:, None] - idx[None, :]
+    weights = np.where(lag >= 0, k * decay ** np.maximum(lag, 0), 0.0)
+    carry_weights = decay ** (idx + 1)
+    carry = values[0]
+    for start in range(0, len(values), _EMA_BLOCK):
+        block = values[start: start + _EMA_BLOCK]
+        n = len(block)
+        result = weights[:n, :n] @ block + carry_weights[:n] * carry
+        out[start: start + n] = result
+        carry = result[-1]
+    return out
+
+
+def macd_histogram(closes, fast: int = 12, slow: int = 26, signal: int = 9) -> np.ndarray:
+    """MACD minus its signal line; ``0.0`` before ``slow + signal`` closes."""
+    closes = _as_array(closes)
+    return macd_histogram_from(ema(closes, fast), ema(closes, slow), slow, signal)
+
+
+def macd_histogram_from(fast_ema: np.ndarray, slow_ema: np.ndarray, slow: int, signal: int = 9) -> np.ndarray:
+    """:func:`macd_histogram` from precomputed fast and slow EMAs."""
+    line = fast_ema - slow_ema
+    hist = line - ema(line, signal)
+    hist[: slow + signal - 1] = 0.0
+    return hist
+
+
+def bollinger_score(closes, period: int = 20, k: float = 2.0) -> np.ndarray:
+    """``1`` above the upper band, ``-1`` below the lower band, else ``0``."""
+    closes = _as_array(closes)
+    mean = sma(closes, period)
+    std = rolling_std(closes, period)
+    score = np.zeros(len(closes), dtype=np.int8)
+    ready = ~np.isnan(mean)
+    score[ready & (closes > mean + k * std)] = 1
+    score[ready & (closes < mean - k * std)] = -1
+    return score
+
+
+def golden_cross(closes) -> np.ndarray:
+    """MA5 above MA20 while the close five bars back sat at or below the prior MA20."""
+    closes = _as_array(closes)
+    out = np.zeros(len(closes), dtype=bool)
+    if len(closes) < 25:
+        return out
+    ma5 = sma(closes, 5)
+    ma20 = sma(closes, 20)
+    prev_ma20 = np.empty(len(closes))
+    prev_ma20[0] = np.nan
+    prev_ma20[1:] = ma20[:-1]
+    lagged = np.empty(len(closes))
+    lagged[:5] = np.nan
+    lagged[5:] = closes[:-5]
+    out[24:] = (ma5[24:] > ma20[24:]) & (lagged[24:] <= prev_ma20[24:])
+    return out
+
+
+def condition_scores(
+    closes,
+    *,
+    bid_volume=None,
+    ask_volume=None,
+    rsi_threshold=48.0,
+) -> Dict[str, np.ndarray]:
+    """Return the ``condition_scores`` of ``EntryDecisionAgent.evaluate`` per bar.
+
+    ``bid_volume``/``ask_volume`` are optional per-bar orderbook totals and
+    ``rsi_threshold`` may be a scalar or a per-bar array.  Bars with fewer
+    than 20 closes, where ``evaluate`` returns early, are all ``False``.
+    """
+    closes = _as_array(closes)
+    n = len(closes)
+    ready = np.arange(n) >= 19
+    ma20 = sma(closes, 20)
+    ma10 = sma(closes, 10)
+    ma34 = sma(closes, 34)
+    ma34 = np.where(np.isnan(ma34), ma20, ma34)
+    std20 = rolling_std(closes, 20)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = np.where(ma20 != 0, std20 / ma20, 0.0)
+    if bid_volume is None or ask_volume is None:
+        bias_up = bias_down = np.zeros(n, dtype=bool)
+    else:
+        bid = _as_array(bid_volume)
+        ask = _as_array(ask_volume)
+        bias_up, bias_down = bid > ask, ask > bid
+    scores = {
+        "rsi_above_threshold": rsi(closes, 14) > np.asarray(rsi_threshold),
+        "ma_cross": ma10 > ma34,
+        "golden_cross": golden_cross(closes),
+        "orderbook_bias_up": bias_up,
+        "orderbook_bias_down": bias_down,
+        "volatility_threshold": volatility < 0.02,
+    }
+    return {name: values & ready for name, values in scores.items()}
+
+
+def feature_frame(closes, *, rsi_period: int = 14, sentiment_rsi_period: int = 20) -> Dict[str, np.ndarray]:
+    """Compute the common indicator columns for ``closes`` in one call."""
+    closes = _as_array(closes)
+    return {
+        "close": closes,
+        "sma5": sma(closes, 5),
+        "sma20": sma(closes, 20),
+        "rsi": rsi(closes, rsi_period),
+        "sentiment_rsi": rsi(closes, sentiment_rsi_period),
+        "macd_hist": macd_histogram(closes),
+        "bb_score": bollinger_score(closes),
+        "golden_cross": golden_cross(closes),
+    }
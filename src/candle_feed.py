@@ -0,0 +1,402 @@
+"""Locally maintained 1-minute candles fed by the Upbit trade stream.
+
+Higher timeframes (5m, 15m, 60m by default) are derived from the 1-minute
+series by :class:`TimeframeAggregator` instead of separate REST requests.
+"""
+
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from agents.utils import get_upbit_candle_bars
+from market_recorder import get_recorder
+from market_snapshot import CandleWindow
+from price_feed_upbit_ws import UpbitWebSocket
+
+MINUTE = 60
+DEFAULT_TIMEFRAMES = (5, 15, 60)
+
+
+class CandleRingBuffer:
+    """Fixed-size array-backed ring buffer of OHLCV bars.
+
+    Bars are stored oldest to newest; once ``capacity`` bars are held the
+    oldest bar is overwritten.  Timestamps are candle start times in epoch
+    seconds.
+    """
+
+    def __init__(self, capacity: int = 200) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._ts = array("q", [0] * capacity)
+        self._open = array("d", [0.0] * capacity)
+        self._high = array("d", [0.0] * capacity)
+        self._low = array("d", [0.0] * capacity)
+        self._close = array("d", [0.0] * capacity)
+        self._volume = array("d", [0.0] * capacity)
+        self._start = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, i: int) -> int:
+        """Map logical position ``i`` (0 = oldest) to a slot index."""
+        return (self._start + i) % self.capacity
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if not self._count:
+            return None
+        return self._ts[self._index(self._count - 1)]
+
+    def append(
+        self,
+        timestamp: int,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+    ) -> None:
+        """Add a new bar at the newest position."""
+        if self._count < self.capacity:
+            slot = self._index(self._count)
+            self._count += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._ts[slot] = timestamp
+        self._open[slot] = open_
+        self._high[slot] = high
+        self._low[slot] = low
+        self._close[slot] = close
+        self._volume[slot] = volume
+
+    def last(self) -> Optional[Tuple[int, float, float, float, float, float]]:
+        """Return the newest bar as ``(ts, open, high, low, close, volume)``."""
+        if not self._count:
+            return None
+        slot = self._index(self._count - 1)
+        return (
+            self._ts[slot],
+            self._open[slot],
+            self._high[slot],
+            self._low[slot],
+            self._close[slot],
+            self._volume[slot],
+        )
+
+    def replace_last(self, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Overwrite the OHLCV values of the newest bar."""
+        slot = self._index(self._count - 1)
+        self._open[slot] = open_
+        self._high[slot] = high
+        self._low[slot] = low
+        self._close[slot] = close
+        self._volume[slot] = volume
+
+    def update_last(self, price: float, volume: float = 0.0) -> None:
+        """Fold a trade into the newest bar."""
+        slot = self._index(self._count - 1)
+        if price > self._high[slot]:
+            self._high[slot] = price
+        if price < self._low[slot]:
+            self._low[slot] = price
+        self._close[slot] = price
+        self._volume[slot] += volume
+
+    def truncate_from(self, timestamp: int) -> None:
+        """Drop every bar starting at or after ``timestamp``."""
+        while self._count and self._ts[self._index(self._count - 1)] >= timestamp:
+            self._count -= 1
+
+    def closes(self, n: Optional[int] = None) -> List[float]:
+        """Return the last ``n`` closing prices (all when ``n`` is ``None``)."""
+        count = self._count if n is None else min(n, self._count)
+        first = self._count - count
+        return [self._close[self._index(i)] for i in range(first, self._count)]
+
+    def timestamps(self, n: Optional[int] = None) -> List[int]:
+        """Return the start times of the last ``n`` bars."""
+        count = self._count if n is None else min(n, self._count)
+        first = self._count - count
+        return [self._ts[self._index(i)] for i in range(first, self._count)]
+
+    def bars(self, n: Optional[int] = None) -> List[Dict[str, float]]:
+        """Return the last ``n`` bars as OHLCV dicts."""
+        count = self._count if n is None else min(n, self._count)
+        result = []
+        for i in range(self._count - count, self._count):
+            slot = self._index(i)
+            result.append(
+                {
+                    "timestamp": self._ts[slot],
+                    "open": self._open[slot],
+                    "high": self._high[slot],
+                    "low": self._low[slot],
+                    "close": self._close[slot],
+                    "volume": self._volume[slot],
+                }
+            )
+        return result
+
+
+class TimeframeAggregator:
+    """Fold 1-minute bars into ``minutes``-wide bars in O(1) per update.
+
+    The aggregate of the closed minutes of the current bucket is kept
+    separately from the minute still being traded, so repeated updates of
+    the live 1-minute bar simply recombine the two instead of rescanning the
+    bucket.  Buckets are aligned to multiples of ``minutes`` since the epoch,
+    which matches Upbit's minute candles.
+    """
+
+    def __init__(self, minutes: int, capacity: int = 200) -> None:
+        if minutes <= 1:
+            raise ValueError("minutes must be greater than 1")
+        self.minutes = minutes
+        self.seconds = minutes * MINUTE
+        self.buffer = CandleRingBuffer(capacity)
+        self._bucket: Optional[int] = None
+        self._minute: Optional[int] = None
+        self._closed: Optional[Tuple[float, float, float, float]] = None  # open, high, low, volume
+        self._current: Tuple[float, float, float, float, float] = (0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def bucket_start(self, timestamp: int) -> int:
+        return timestamp - timestamp % self.seconds
+
+    def update(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        """Apply the latest state of the 1-minute bar starting at ``timestamp``."""
+        bucket = self.bucket_start(timestamp)
+        if self._bucket is None or bucket > self._bucket:
+            self._bucket = bucket
+            self._minute = timestamp
+            self._closed = None
+            self._current = (open_, high, low, close, volume)
+            self.buffer.append(bucket, open_, high, low, close, volume)
+            return
+        if bucket < self._bucket or timestamp < self._minute:
+            return  # older than the bar being built
+        if timestamp > self._minute:
+            o, h, l, _, v = self._current
+            if self._closed is None:
+                self._closed = (o, h, l, v)
+            else:
+                co, ch, cl, cv = self._closed
+                self._closed = (co, max(ch, h), min(cl, l), cv + v)
+            self._minute = timestamp
+        self._current = (open_, high, low, close, volume)
+        if self._closed is None:
+            self.buffer.replace_last(open_, high, low, close, volume)
+        else:
+            co, ch, cl, cv = self._closed
+            self.buffer.replace_last(co, max(ch, high), min(cl, low), close, cv + volume)
+
+    def truncate_from(self, timestamp: int) -> int:
+        """Drop the bucket holding ``timestamp`` and later; return its start."""
+        start = self.bucket_start(timestamp)
+        self.buffer.truncate_from(start)
+        self._bucket = None
+        self._minute = None
+        self._closed = None
+        return start
+
+
+class CandleFeed:
+    """Build 1-minute candles locally from :class:`UpbitWebSocket` trades.
+
+    REST is used only for the initial backfill and to repair gaps after a
+    reconnect or a jump of more than one minute between trades.  When the
+    WebSocket cannot be started the feed falls back to REST on every read.
+    Every change to the 1-minute buffer is folded into the ``timeframes``
+    aggregators, so higher timeframes never need their own requests.
+    """
+
+    def __init__(
+        self,
+        symbol: str = "KRW-BTC",
+        capacity: int = 200,
+        *,
+        fetcher: Callable[[str, int], List[Dict[str, Any]]] | None = None,
+        timeframes: Sequence[int] = DEFAULT_TIMEFRAMES,
+    ) -> None:
+        self.symbol = symbol
+        self.buffer = CandleRingBuffer(capacity)
+        self.timeframes = {m: TimeframeAggregator(m, capacity) for m in timeframes}
+        self.fetcher = fetcher or get_upbit_candle_bars
+        self.socket: UpbitWebSocket | None = None
+        self.streaming = False
+        self._lock = threading.Lock()
+        self._repair_from: Optional[int] = None
+        self._backfilled = False
+
+    # ------------------------------------------------------------------
+    def start(self, socket: UpbitWebSocket | None = None) -> None:
+        """Backfill history and subscribe to the trade stream.
+
+        ``socket`` lets callers share one connection with other listeners.
+        """
+        try:
+            self.backfill()
+        except RuntimeError as exc:
+            # closes() retries the backfill on the next read
+            print(f"[캔들 피드] 초기 캔들 로드 실패: {exc}")
+        self.socket = socket or UpbitWebSocket(self.symbol)
+        self.socket.add_listener(self.on_message)
+        try:
+            self.socket.run()
+            self.streaming = True
+        except RuntimeError as exc:
+            print(f"[캔들 피드] WebSocket 사용 불가, REST 폴링으로 대체: {exc}")
+            self.streaming = False
+
+    def backfill(self, count: Optional[int] = None) -> None:
+        """Replace the buffer contents with ``count`` bars fetched via REST."""
+        bars = self.fetcher(self.symbol, count or self.buffer.capacity)
+        with self._lock:
+            if bars:
+                self.buffer.truncate_from(bars[0]["timestamp"])
+            for bar in bars:
+                self.buffer.append(
+                    bar["timestamp"],
+                    bar["open"],
+                    bar["high"],
+                    bar["low"],
+                    bar["close"],
+                    bar.get("volume", 0.0),
+                )
+            if bars:
+                self._resync_timeframes(bars[0]["timestamp"])
+            self._repair_from = None
+            self._backfilled = True
+
+    def _resync_timeframes(self, since: int) -> None:
+        """Rebuild higher-timeframe bars from ``since`` out of the 1-minute buffer."""
+        if not self.timeframes:
+            return
+        bars = self.buffer.bars()
+        for agg in self.timeframes.values():
+            start = agg.truncate_from(since)
+            for bar in bars:
+                if bar["timestamp"] >= start:
+                    agg.update(
+                        bar["timestamp"],
+                        bar["open"],
+                        bar["high"],
+                        bar["low"],
+                        bar["close"],
+                        bar["volume"],
+                    )
+
+    def repair(self) -> None:
+        """Refetch the bars missed since the last known good candle."""
+        with self._lock:
+            since = self._repair_from
+            last = self.buffer.last_timestamp
+        if since is None or last is None:
+            return
+        missing = (last - since) // MINUTE + 2
+        self.backfill(min(max(missing, 2), self.buffer.capacity))
+
+    # ------------------------------------------------------------------
+    def on_message(self, data: Dict[str, Any]) -> None:
+        """Handle a decoded WebSocket message."""
+        if data.get("type") == "reconnect":
+            with self._lock:
+                last = self.buffer.last_timestamp
+                if last is not None and self._repair_from is None:
+                    self._repair_from = last
+            return
+        price = data.get("trade_price")
+        if price is None:
+            return
+        ts_ms = data.get("trade_timestamp") or data.get("timestamp")
+        if ts_ms is None:
+            return
+        self.on_trade(float(price), float(data.get("trade_volume", 0.0)), int(ts_ms) // 1000)
+
+    def on_trade(self, price: float, volume: float, timestamp: int) -> None:
+        """Fold a single trade into the current minute candle.
+
+        The candle a trade rolls over is closed and handed to the market
+        recorder, unless a gap repair is pending; the REST repair records
+        those bars instead.
+        """
+        minute = timestamp - timestamp % MINUTE
+        closed = None
+        with self._lock:
+            last = self.buffer.last_timestamp
+            if last is None or minute > last:
+                if last is not None and self._repair_from is None:
+                    closed = self.buffer.last()
+                    if minute - last > MINUTE:
+                        self._repair_from = last
+                self.buffer.append(minute, price, price, price, price, volume)
+            elif minute == last:
+                self.buffer.update_last(price, volume)
+            else:
+                return  # trades older than the current candle are ignored
+            if self.timeframes:
+                bar = self.buffer.last()
+                for agg in self.timeframes.values():
+                    agg.update(*bar)
+        recorder = get_recorder()
+        if closed is not None and recorder is not None:
+            ts, open_, high, low, close, vol = closed
+            recorder.record_candles(
+                self.symbol,
+                [{"timestamp": ts, "open": open_, "high": high, "low": low, "close": close, "volume": vol}],
+            )
+
+    # ------------------------------------------------------------------
+    def _refresh(self, n: int) -> None:
+        if not self.streaming or not self._backfilled:
+            self.backfill(n if not self.streaming else None)
+        elif self._repair_from is not None:
+            try:
+                self.repair()
+            except RuntimeError as exc:
+                print(f"[캔들 피드] 누락 구간 복구 실패: {exc}")
+
+    def closes(self, n: int = 20) -> List[float]:
+        """Return the last ``n`` 1-minute closes, repairing gaps first."""
+        self._refresh(n)
+        with self._lock:
+            return self.buffer.closes(n)
+
+    def history(self) -> CandleWindow:
+        """Return every buffered 1-minute bar without touching REST."""
+        with self._lock:
+            return CandleWindow(self.buffer.timestamps(), self.buffer.closes())
+
+    def window(self, n: int = 20) -> CandleWindow:
+        """Like :meth:`closes` but paired with each bar's start time."""
+        self._refresh(n)
+        with self._lock:
+            return CandleWindow(self.buffer.timestamps(n), self.buffer.closes(n))
+
+    def _buffer(self, timeframe: int) -> CandleRingBuffer:
+        if timeframe == 1:
+            return self.buffer
+        try:
+            return self.timeframes[timeframe].buffer
+        except KeyError:
+            raise ValueError(f"timeframe {timeframe}m is not aggregated") from None
+
+    def bars(self, n: int = 20, timeframe: int = 1) -> List[Dict[str, float]]:
+        """Return the last ``n`` bars of the 1-minute or an aggregated timeframe."""
+        with self._lock:
+            return self._buffer(timeframe).bars(n)
+
+    def timeframe_closes(self, n: int = 20) -> Dict[int, List[float]]:
+        """Return the last ``n`` closes of every aggregated timeframe.
+
+        Unlike :meth:`closes` this never triggers REST; call it after
+        :meth:`closes` so that the 1-minute buffer is current.
+        """
+        with self._lock:
+            return {m: agg.buffer.closes(n) for m, agg in self.timeframes.items()}
@@ -0,0 +1,247 @@
+"""Array-backed populations of generated strategies.
+
+``StrategyGenerator`` keeps every strategy as a nested dict, which costs
+hundreds of bytes per genome and a JSON round trip per mutation.
+:class:`GenomeStore` keeps a population in one NumPy structured array with
+a fixed number of condition slots per genome, and mutates, recombines and
+selects the whole population with vectorized operations.  The operators
+follow ``StrategyGenerator``: a mutation nudges one condition (MA period
+±5, RSI level ±5, MACD signal ±1) and a crossover joins a prefix of one
+parent with a suffix of the other.  :meth:`GenomeStore.to_dicts` and
+:meth:`GenomeStore.from_dicts` convert to the dict format used by
+``StrategyGenerator.save``/``load``.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# condition kinds; 0 marks an empty slot
+NONE, MA, RSI, MACD = 0, 1, 2, 3
+_KINDS = {"MA": MA, "RSI": RSI, "MACD": MACD}
+_OPS = (">", "<")
+
+CONDITION_DTYPE = np.dtype(
+    [
+        ("kind", np.int8),
+        ("op", np.int8),  # index into _OPS: MA direction or RSI op
+        ("p1", np.int16),  # MA/RSI period, MACD fast
+        ("p2", np.int16),  # MACD slow
+        ("p3", np.int16),  # MACD signal
+        ("level", np.float32),  # RSI level
+    ]
+)
+
+_ID = re.compile(r"gen_(\d+)$")
+
+
+def genome_dtype(max_conditions: int) -> np.dtype:
+    return np.dtype([("id", np.int64), ("n", np.int8), ("cond", CONDITION_DTYPE, (max_conditions,))])
+
+
+def _number(value: float):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class GenomeStore:
+    """A population of genomes in a structured array.
+
+    ``max_conditions`` bounds the condition slots per genome; crossover
+    children longer than that keep their first ``max_conditions`` conditions.
+    """
+
+    def __init__(self, size: int = 0, *, max_conditions: int = 6, seed: Optional[int] = None) -> None:
+        self.max_conditions = max_conditions
+        self.rng = np.random.default_rng(seed)
+        self.data = np.zeros(size, dtype=genome_dtype(max_conditions))
+        self.next_id = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def _new_ids(self, count: int) -> np.ndarray:
+        ids = np.arange(self.next_id, self.next_id + count, dtype=np.int64)
+        self.next_id += count
+        return ids
+
+    # generation ---------------------------------------------------------
+    def randomize(self, size: int) -> "GenomeStore":
+        """Fill the store with ``size`` genomes from the ``StrategyGenerator`` parameter space."""
+        rng = self.rng
+        data = np.zeros(size, dtype=self.data.dtype)
+        data["id"] = self._new_ids(size)
+        data["n"] = rng.integers(1, 4, size=size)
+        cond = data["cond"]
+        shape = (size, self.max_conditions)
+        kind = rng.integers(MA, MACD + 1, size=shape).astype(np.int8)
+        kind[np.arange(self.max_conditions)[None, :] >= data["n"][:, None]] = NONE
+        cond["kind"] = kind
+        cond["op"] = rng.integers(0, 2, size=shape)
+        ma, rsi, macd = kind == MA, kind == RSI, kind == MACD
+        cond["p1"][ma] = rng.choice([5, 10, 20, 30, 60], size=int(ma.sum()))
+        cond["p1"][rsi] = rng.choice([14, 20], size=int(rsi.sum()))
+        cond["level"][rsi] = rng.choice([30, 45, 55, 70], size=int(rsi.sum()))
+        cond["p1"][macd] = rng.choice([12, 26], size=int(macd.sum()))
+        cond["p2"][macd] = rng.choice([26, 52], size=int(macd.sum()))
+        cond["p3"][macd] = rng.choice([9, 12], size=int(macd.sum()))
+        cond["op"][macd | (kind == NONE)] = 0
+        self.data = data
+        return self
+
+    # evolutionary operations -------------------------------------------
+    def mutate(self, parents: np.ndarray) -> np.ndarray:
+        """Return mutated copies of the genomes at index array ``parents``."""
+        rng = self.rng
+        child = self.data[parents].copy()
+        child["id"] = self._new_ids(len(child))
+        rows = np.flatnonzero(child["n"] > 0)
+        cols = (rng.random(len(rows)) * child["n"][rows]).astype(np.intp)
+        step = rng.choice(np.array([-1, 1], dtype=np.int16), size=len(rows))
+        cond = child["cond"]
+        kind = cond["kind"][rows, cols]
+        sel = kind == MA
+        r, c = rows[sel], cols[sel]
+        cond["p1"][r, c] = np.maximum(2, cond["p1"][r, c] + 5 * step[sel])
+        sel = kind == RSI
+        r, c = rows[sel], cols[sel]
+        cond["level"][r, c] = np.clip(cond["level"][r, c] + 5 * step[sel], 0, 100)
+        sel = kind == MACD
+        r, c = rows[sel], cols[sel]
+        cond["p3"][r, c] = np.maximum(1, cond["p3"][r, c] + step[sel])
+        return child
+
+    def crossover(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Return children of the genome pairs at index arrays ``a`` and ``b``.
+
+        Each child takes a random prefix of ``a`` and a random suffix of
+        ``b``; empty children are replaced by a mutation of either parent.
+        """
+        rng = self.rng
+        pa, pb = self.data[a], self.data[b]
+        na = pa["n"].astype(np.intp)
+        nb = pb["n"].astype(np.intp)
+        cut_a = (rng.random(len(a)) * (na + 1)).astype(np.intp)
+        cut_b = (rng.random(len(b)) * (nb + 1)).astype(np.intp)
+        slots = np.arange(self.max_conditions)[None, :]
+        from_a = slots < cut_a[:, None]
+        src_b = np.clip(cut_b[:, None] + slots - cut_a[:, None], 0, self.max_conditions - 1)
+        in_b = ~from_a & (slots - cut_a[:, None] < (nb - cut_b)[:, None])
+        rows = np.arange(len(a))[:, None]
+        child = np.zeros(len(a), dtype=self.data.dtype)
+        child["cond"] = np.where(from_a, pa["cond"], pb["cond"][rows, src_b])
+        child["cond"][~(from_a | in_b)] = np.zeros((), dtype=CONDITION_DTYPE)
+        child["n"] = np.minimum(cut_a + nb - cut_b, self.max_conditions)
+        child["id"] = self._new_ids(len(child))
+        empty = np.flatnonzero(child["n"] == 0)
+        if len(empty):
+            source = np.where(rng.random(len(empty)) < 0.5, a[empty], b[empty])
+            child[empty] = self.mutate(source)
+        return child
+
+    def evolve(self, performance: Sequence[float], *, mutation_rate: float = 0.2) -> "GenomeStore":
+        """Replace the population with its next generation, as ``StrategyGenerator.evolve``."""
+        size = len(self.data)
+        if not size:
+            return self
+        rng = self.rng
+        order = np.argsort(-np.asarray(performance, dtype=np.float64), kind="stable")
+        parents = order[: max(1, size // 2)]
+        mutated = rng.random(size) < mutation_rate
+        children = np.empty(size, dtype=self.data.dtype)
+        m = np.flatnonzero(mutated)
+        children[m] = self.mutate(rng.choice(parents, size=len(m)))
+        x = np.flatnonzero(~mutated)
+        if len(parents) >= 2:
+            first = rng.integers(0, len(parents), size=len(x))
+            # a distinct second parent, like ``rng.sample(parents, 2)``
+            second = (first + rng.integers(1, len(parents), size=len(x))) % len(parents)
+            children[x] = self.crossover(parents[first], parents[second])
+        else:
+            only = np.repeat(parents[:1], len(x))
+            children[x] = self.crossover(only, only)
+        self.data = children
+        return self
+
+    # conversion ---------------------------------------------------------
+    @classmethod
+    def from_dicts(
+        cls, strategies: Sequence[Dict[str, Any]], *, max_conditions: Optional[int] = None, seed: Optional[int] = None
+    ) -> "GenomeStore":
+        """Build a store from ``StrategyGenerator`` dicts.
+
+        Without ``max_conditions`` the slots fit the longest genome (at least
+        six); an explicit limit that a genome exceeds raises ``ValueError``.
+        """
+        longest = max((len(s.get("conditions", [])) for s in strategies), default=0)
+        if max_conditions is None:
+            max_conditions = max(6, longest)
+        elif longest > max_conditions:
+            raise ValueError(f"genome has {longest} conditions, max_conditions is {max_conditions}")
+        store = cls(len(strategies), max_conditions=max_conditions, seed=seed)
+        data = store.data
+        for i, strat in enumerate(strategies):
+            match = _ID.match(str(strat.get("id", "")))
+            data["id"][i] = int(match.group(1)) if match else -1
+            conds = strat.get("conditions", [])
+            data["n"][i] = len(conds)
+            for j, c in enumerate(conds):
+                slot = data["cond"][i, j]
+                kind = _KINDS.get(c.get("type"))
+                if kind is None:
+                    raise ValueError(f"unknown condition type: {c.get('type')!r}")
+                slot["kind"] = kind
+                if kind == MA:
+                    slot["p1"] = c["period"]
+                    slot["op"] = _OPS.index(c["direction"])
+                elif kind == RSI:
+                    slot["p1"] = c["period"]
+                    slot["level"] = c["level"]
+                    slot["op"] = _OPS.index(c["op"])
+                else:
+                    slot["p1"], slot["p2"], slot["p3"] = c["fast"], c["slow"], c["signal"]
+        missing = np.flatnonzero(data["id"] < 0)
+        store.next_id = int(data["id"].max()) + 1 if len(data) else 0
+        data["id"][missing] = store._new_ids(len(missing))
+        return store
+
+    def to_dicts(self, indices: Optional[Sequence[int]] = None) -> List[Dict[str, Any]]:
+        rows = self.data if indices is None else self.data[np.asarray(indices)]
+        out = []
+        for gid, n, conds in zip(rows["id"].tolist(), rows["n"].tolist(), rows["cond"].tolist()):
+            conditions = []
+            for kind, op, p1, p2, p3, level in conds[:n]:
+                if kind == MA:
+                    conditions.append({"type": "MA", "period": p1, "direction": _OPS[op]})
+                elif kind == RSI:
+                    conditions.append({"type": "RSI", "period": p1, "level": _number(level), "op": _OPS[op]})
+                elif kind == MACD:
+                    conditions.append({"type": "MACD", "fast": p1, "slow": p2, "signal": p3})
+            out.append({"id": f"gen_{gid}", "conditions": conditions})
+        return out
+
+    # persistence --------------------------------------------------------
+    def save(self, path: str | Path) -> None:
+        """Write the population in the ``StrategyGenerator.save`` format."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"strategies": self.to_dicts()}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str | Path, *, max_conditions: Optional[int] = None, seed: Optional[int] = None) -> "GenomeStore":
+        """Read a file written by ``StrategyGenerator.save`` or :meth:`save`."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(max_conditions=max_conditions or 6, seed=seed)
+        return cls.from_dicts(data.get("strategies", []), max_conditions=max_conditions, seed=seed)
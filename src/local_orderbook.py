@@ -0,0 +1,138 @@
+"""In-memory L2 orderbook maintained from the Upbit WebSocket stream."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Full recomputation interval guarding against float drift in running totals
+_RESYNC_EVERY = 1000
+
+
+class LocalOrderBook:
+    """Track the top ``depth`` levels of one market with running totals.
+
+    Upbit pushes the visible book on every change.  Each message is diffed
+    against the held levels and only changed levels adjust the running
+    bid/ask volume and notional totals, so imbalance, depth and strength
+    reads are O(1).  ``version`` increases with every applied update.
+    """
+
+    def __init__(
+        self,
+        symbol: str = "KRW-BTC",
+        depth: int = 10,
+        *,
+        max_age: float = 10.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.symbol = symbol
+        self.depth = depth
+        self.max_age = max_age
+        self._clock = clock
+        self._bids: Dict[float, float] = {}
+        self._asks: Dict[float, float] = {}
+        self._bid_levels: List[Tuple[float, float]] = []
+        self._ask_levels: List[Tuple[float, float]] = []
+        self.bid_volume = 0.0
+        self.ask_volume = 0.0
+        self.bid_notional = 0.0
+        self.ask_notional = 0.0
+        self.version = 0
+        self.updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def on_message(self, data: Dict[str, Any]) -> None:
+        """WebSocket listener; applies ``orderbook`` messages for this market."""
+        if data.get("type") != "orderbook":
+            return
+        if data.get("code", self.symbol) != self.symbol:
+            return
+        self.apply_units(data.get("orderbook_units", []))
+
+    def apply_units(self, units: List[Dict[str, Any]]) -> None:
+        """Apply an Upbit ``orderbook_units`` list (best level first)."""
+        units = units[: self.depth]
+        bid_levels = [(u["bid_price"], u["bid_size"]) for u in units]
+        ask_levels = [(u["ask_price"], u["ask_size"]) for u in units]
+        with self._lock:
+            self._apply_side(self._bids, bid_levels, "bid")
+            self._apply_side(self._asks, ask_levels, "ask")
+            self._bid_levels = bid_levels
+            self._ask_levels = ask_levels
+            self.version += 1
+            if self.version % _RESYNC_EVERY == 0:
+                self._resync()
+            self.updated_at = self._clock()
+
+    def _apply_side(self, book: Dict[float, float], levels: List[Tuple[float, float]], side: str) -> None:
+        new = dict(levels)
+        d_volume = 0.0
+        d_notional = 0.0
+        for price in [p for p in book if p not in new]:
+            size = book.pop(price)
+            d_volume -= size
+            d_notional -= price * size
+        for price, size in new.items():
+            delta = size - book.get(price, 0.0)
+            if delta:
+                book[price] = size
+                d_volume += delta
+                d_notional += price * delta
+        if side == "bid":
+            self.bid_volume += d_volume
+            self.bid_notional += d_notional
+        else:
+            self.ask_volume += d_volume
+            self.ask_notional += d_notional
+
+    def _resync(self) -> None:
+        self.bid_volume = sum(self._bids.values())
+        self.ask_volume = sum(self._asks.values())
+        self.bid_notional = sum(p * s for p, s in self._bids.items())
+        self.ask_notional = sum(p * s for p, s in self._asks.items())
+
+    # ------------------------------------------------------------------
+    @property
+    def ready(self) -> bool:
+        """``True`` when the book has been updated within ``max_age`` seconds."""
+        return self.updated_at is not None and self._clock() - self.updated_at <= self.max_age
+
+    def imbalance(self) -> float:
+        """Return ``(bid - ask) / (bid + ask)`` volume imbalance."""
+        total = self.bid_volume + self.ask_volume
+        return (self.bid_volume - self.ask_volume) / total if total > 0 else 0.0
+
+    def strength(self) -> float:
+        """Return the notional-weighted strength used by ``orderbook_weighted``."""
+        total = self.bid_notional + self.ask_notional
+        return (self.bid_notional - self.ask_notional) / total if total > 0 else 0.0
+
+    def depth_totals(self) -> Tuple[float, float]:
+        return self.bid_volume, self.ask_volume
+
+    def levels(self) -> Tuple[List[List[float]], List[List[float]]]:
+        """Return ``([[price, volume], ...] bids, asks)`` with empty levels removed."""
+        with self._lock:
+            bids = [[p, s] for p, s in self._bid_levels if s]
+            asks = [[p, s] for p, s in self._ask_levels if s]
+        return bids, asks
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the book in the dict format produced by ``get_upbit_orderbook``.
+
+        Precomputed totals are included so agents can skip re-summing levels.
+        """
+        with self._lock:
+            return {
+                "bids": [{"price": p, "volume": s} for p, s in self._bid_levels],
+                "asks": [{"price": p, "volume": s} for p, s in self._ask_levels],
+                "bid_volume": self.bid_volume,
+                "ask_volume": self.ask_volume,
+                "bid_notional": self.bid_notional,
+                "ask_notional": self.ask_notional,
+                "imbalance": self.imbalance(),
+                "version": self.version,
+            }
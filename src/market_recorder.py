@@ -0,0 +1,237 @@
+"""Append-only binary recorder for candles, trades and orderbooks.
+
+Records are fixed-width NumPy structured rows written to one file per kind,
+market and UTC day::
+
+    <root>/<kind>/<symbol>/<YYYY-MM-DD>.bin   raw rows, oldest first
+    <root>/<kind>/<symbol>/<YYYY-MM-DD>.idx   1440 int64 first-row offsets
+
+The ``.bin`` files have no header so they can be opened directly with
+``numpy.memmap``; the ``.idx`` file maps each minute of the day to its first
+row, letting readers slice any time range without scanning or parsing.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import MARKET_DATA_DIR
+
+BOOK_DEPTH = 10
+MINUTES_PER_DAY = 1440
+DAY_MS = 86_400_000
+
+CANDLE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+TRADE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("price", "<f8"),
+        ("volume", "<f8"),
+        ("side", "i1"),
+    ]
+)
+ORDERBOOK_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("bid_price", "<f8", (BOOK_DEPTH,)),
+        ("bid_size", "<f8", (BOOK_DEPTH,)),
+        ("ask_price", "<f8", (BOOK_DEPTH,)),
+        ("ask_size", "<f8", (BOOK_DEPTH,)),
+    ]
+)
+DTYPES = {"candle": CANDLE_DTYPE, "trade": TRADE_DTYPE, "orderbook": ORDERBOOK_DTYPE}
+
+
+def _day(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _paths(root: Path, kind: str, symbol: str, day: str) -> Tuple[Path, Path]:
+    base = root / kind / symbol
+    return base / f"{day}.bin", base / f"{day}.idx"
+
+
+def _open_index(path: Path) -> np.memmap:
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.full(MINUTES_PER_DAY, -1, dtype="<i8").tofile(path)
+    return np.memmap(path, dtype="<i8", mode="r+", shape=(MINUTES_PER_DAY,))
+
+
+class MarketRecorder:
+    """Buffer records in memory and append them to per-day binary files."""
+
+    def __init__(self, root: str | Path | None = None, *, batch_size: int = 256) -> None:
+        self.root = Path(root) if root else MARKET_DATA_DIR
+        self.batch_size = batch_size
+        self._pending: Dict[Tuple[str, str], List[tuple]] = {}
+        self._rows: Dict[Tuple[str, str, str], int] = {}
+        self._last_candle: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def _add(self, kind: str, symbol: str, row: tuple) -> None:
+        with self._lock:
+            self._append(kind, symbol, row)
+
+    def _append(self, kind: str, symbol: str, row: tuple) -> None:
+        """Buffer ``row``; the caller holds ``_lock``."""
+        pending = self._pending.setdefault((kind, symbol), [])
+        pending.append(row)
+        if len(pending) >= self.batch_size:
+            self._write(kind, symbol, pending)
+            self._pending[(kind, symbol)] = []
+
+    def _write(self, kind: str, symbol: str, rows: List[tuple]) -> None:
+        if not rows:
+            return
+        records = np.array(rows, dtype=DTYPES[kind])
+        days = records["ts"] // DAY_MS
+        for day_num in np.unique(days):
+            chunk = records[days == day_num]
+            day = _day(int(day_num) * DAY_MS)
+            bin_path, idx_path = _paths(self.root, kind, symbol, day)
+            bin_path.parent.mkdir(parents=True, exist_ok=True)
+            key = (kind, symbol, day)
+            start_row = self._rows.get(key)
+            if start_row is None:
+                start_row = bin_path.stat().st_size // DTYPES[kind].itemsize if bin_path.exists() else 0
+            with open(bin_path, "ab") as f:
+                chunk.tofile(f)
+            index = _open_index(idx_path)
+            minutes = (chunk["ts"] % DAY_MS) // 60_000
+            for offset, minute in enumerate(minutes):
+                if index[minute] < 0:
+                    index[minute] = start_row + offset
+            index.flush()
+            self._rows[key] = start_row + len(chunk)
+
+    def flush(self) -> None:
+        """Write all buffered records to disk."""
+        with self._lock:
+            for (kind, symbol), rows in self._pending.items():
+                self._write(kind, symbol, rows)
+            self._pending = {}
+
+    close = flush
+
+    # ------------------------------------------------------------------
+    def record_trade(self, symbol: str, ts_ms: int, price: float, volume: float, side: int = 0) -> None:
+        self._add("trade", symbol, (int(ts_ms), float(price), float(volume), side))
+
+    def record_candles(self, symbol: str, bars: Iterable[Dict[str, Any]]) -> None:
+        """Record closed 1-minute bars (``timestamp`` in epoch seconds).
+
+        Bars at or before the last recorded bar are skipped, so overlapping
+        backfills do not duplicate rows.  The check and the append happen
+        under one lock because the stream and REST fetches both record.
+        """
+        bars = sorted(bars, key=lambda b: b["timestamp"])
+        with self._lock:
+            last = self._last_candle.get(symbol, -1)
+            for bar in bars:
+                ts = int(bar["timestamp"])
+                if ts <= last:
+                    continue
+                self._append(
+                    "candle",
+                    symbol,
+                    (ts * 1000, bar["open"], bar["high"], bar["low"], bar["close"], bar.get("volume", 0.0)),
+                )
+                last = ts
+            self._last_candle[symbol] = last
+
+    def record_orderbook(self, symbol: str, ts_ms: int, units: List[Dict[str, Any]]) -> None:
+        """Record the top ``BOOK_DEPTH`` levels of an Upbit ``orderbook_units`` list."""
+        levels = np.zeros((4, BOOK_DEPTH))
+        for i, u in enumerate(units[:BOOK_DEPTH]):
+            levels[:, i] = (u["bid_price"], u["bid_size"], u["ask_price"], u["ask_size"])
+        self._add("orderbook", symbol, (int(ts_ms), levels[0], levels[1], levels[2], levels[3]))
+
+    def on_message(self, data: Dict[str, Any]) -> None:
+        """WebSocket listener recording trade and orderbook messages."""
+        msg_type = data.get("type")
+        symbol = data.get("code")
+        if not symbol:
+            return
+        if msg_type == "trade" and data.get("trade_price") is not None:
+            side = 1 if data.get("ask_bid") == "BID" else -1 if data.get("ask_bid") == "ASK" else 0
+            self.record_trade(
+                symbol,
+                data.get("trade_timestamp") or data.get("timestamp") or int(time.time() * 1000),
+                data["trade_price"],
+                data.get("trade_volume", 0.0),
+                side,
+            )
+        elif msg_type == "orderbook":
+            ts = data.get("timestamp") or int(time.time() * 1000)
+            self.record_orderbook(symbol, ts, data.get("orderbook_units", []))
+
+
+# ----------------------------------------------------------------------
+def load_records(
+    kind: str,
+    symbol: str,
+    start_ms: int,
+    end_ms: int,
+    root: str | Path | None = None,
+) -> np.ndarray:
+    """Return recorded rows with ``start_ms <= ts < end_ms``.
+
+    A range inside one day is returned as a read-only view onto the
+    memory-mapped file; ranges spanning days are concatenated.
+    """
+    root = Path(root) if root else MARKET_DATA_DIR
+    dtype = DTYPES[kind]
+    parts = []
+    day_start = start_ms - start_ms % DAY_MS
+    while day_start < end_ms:
+        bin_path, idx_path = _paths(root, kind, symbol, _day(day_start))
+        if bin_path.exists() and bin_path.stat().st_size >= dtype.itemsize:
+            rows = bin_path.stat().st_size // dtype.itemsize
+            data = np.memmap(bin_path, dtype=dtype, mode="r", shape=(rows,))
+            lo, hi = 0, rows
+            if idx_path.exists():
+                index = np.fromfile(idx_path, dtype="<i8")
+                first_min = max(0, (start_ms - day_start) // 60_000)
+                later = index[first_min:]
+                later = later[later >= 0]
+                lo = int(later[0]) if len(later) else rows
+            ts = data["ts"][lo:hi]
+            lo += int(np.searchsorted(ts, start_ms, side="left"))
+            hi = lo + int(np.searchsorted(data["ts"][lo:hi], end_ms, side="left"))
+            parts.append(data[lo:hi])
+        day_start += DAY_MS
+    if not parts:
+        return np.empty(0, dtype=dtype)
+    if len(parts) == 1:
+        return parts[0]
+    return np.concatenate(parts)
+
+
+_recorder: Optional[MarketRecorder] = None
+
+
+def set_recorder(recorder: Optional[MarketRecorder]) -> None:
+    """Install the process-wide recorder used by market data sources."""
+    global _recorder
+    _recorder = recorder
+
+
+def get_recorder() -> Optional[MarketRecorder]:
+    return _recorder
@@ -0,0 +1,106 @@
+"""Per-tick market snapshot fetched concurrently and shared read-only."""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+
+def freeze_order_book(order_book: Dict[str, Any]) -> Mapping[str, Any]:
+    """Return a read-only copy of an orderbook dict."""
+    frozen: Dict[str, Any] = {}
+    for key, value in order_book.items():
+        if isinstance(value, list):
+            value = tuple(MappingProxyType(dict(v)) if isinstance(v, dict) else v for v in value)
+        frozen[key] = value
+    return MappingProxyType(frozen)
+
+
+class CandleWindow(NamedTuple):
+    """Closes with the start time (epoch seconds) of each bar."""
+
+    times: Sequence[int]
+    closes: Sequence[float]
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Candles and orderbook observed for one tick.
+
+    ``timeframes`` maps a bar width in minutes (e.g. 5, 15, 60) to the closes
+    aggregated from the same 1-minute series as ``closes``.  ``bar_times``
+    holds the start time of each bar in ``closes`` when the source knows it.
+    """
+
+    symbol: str
+    timestamp: float
+    closes: Tuple[float, ...]
+    order_book: Mapping[str, Any]
+    fetch_latency: float = 0.0
+    timeframes: Mapping[int, Tuple[float, ...]] = field(default_factory=lambda: MappingProxyType({}))
+    bar_times: Tuple[int, ...] = ()
+
+    @property
+    def price(self) -> float | None:
+        return self.closes[-1] if self.closes else None
+
+    def bid_levels(self) -> List[List[float]]:
+        """Return ``[price, volume]`` pairs for non-empty bid levels."""
+        return [[b["price"], b["volume"]] for b in self.order_book.get("bids", ()) if b.get("volume")]
+
+    def ask_levels(self) -> List[List[float]]:
+        """Return ``[price, volume]`` pairs for non-empty ask levels."""
+        return [[a["price"], a["volume"]] for a in self.order_book.get("asks", ()) if a.get("volume")]
+
+
+class SnapshotFetcher:
+    """Fetch candles and orderbook in parallel exactly once per tick."""
+
+    def __init__(
+        self,
+        symbol: str,
+        candle_source: Callable[[int], Sequence[float] | CandleWindow],
+        orderbook_source: Callable[[str], Dict[str, Any]],
+        *,
+        candle_count: int = 20,
+        timeframe_source: Optional[Callable[[int], Mapping[int, Sequence[float]]]] = None,
+    ) -> None:
+        self.symbol = symbol
+        self.candle_source = candle_source
+        self.orderbook_source = orderbook_source
+        self.candle_count = candle_count
+        self.timeframe_source = timeframe_source
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="snapshot")
+
+    def fetch(self) -> MarketSnapshot:
+        """Return a new snapshot; raises if either source fails."""
+        start = time.perf_counter()
+        candles = self._executor.submit(self.candle_source, self.candle_count)
+        book = self._executor.submit(self.orderbook_source, self.symbol)
+        result = candles.result()
+        bar_times: Tuple[int, ...] = ()
+        if isinstance(result, CandleWindow):
+            bar_times = tuple(result.times)
+            result = result.closes
+        closes = tuple(result)
+        timeframes: Mapping[int, Tuple[float, ...]] = MappingProxyType({})
+        if self.timeframe_source is not None:
+            timeframes = MappingProxyType(
+                {m: tuple(v) for m, v in self.timeframe_source(self.candle_count).items()}
+            )
+        order_book = freeze_order_book(book.result())
+        return MarketSnapshot(
+            symbol=self.symbol,
+            timestamp=time.time(),
+            closes=closes,
+            order_book=order_book,
+            fetch_latency=time.perf_counter() - start,
+            timeframes=timeframes,
+            bar_times=bar_times,
+        )
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,282 @@
+"""Backtest whole generated populations against one price history.
+
+:class:`PopulationEvaluator` places the close array in shared memory once and
+splits the population across a process pool.  Every worker maps the same
+buffer, evaluates its chunk of genomes through a
+:class:`strategy_compiler.IndicatorPlan` (keeping indicator series between
+chunks), simulates the trades and scores the chunk with
+:func:`batch_metrics.evaluate_batch`, which returns the
+``StrategyEvaluator.evaluate`` metrics.
+Only genomes and metric dicts cross process boundaries.
+
+A trade opens at the close of a bar where the entry mask is set while flat
+and closes at the first later close that reaches ``take_profit`` or
+``stop_loss`` (the ``PositionManager.update`` thresholds) or where the mask
+turns off.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from agents.strategy_evaluator import StrategyEvaluator
+from agents.strategy_generator import FitnessCache, StrategyGenerator, genome_signature
+from batch_metrics import evaluate_batch, metric_dicts
+from strategy_compiler import IndicatorPlan, compile_strategy
+
+Metrics = Dict[str, Any]
+Fitness = Union[str, Callable[[Metrics], float]]
+
+# Worker-side view of the shared close array
+_worker: Dict[str, Any] = {}
+
+
+def simulate_trades(
+    mask: np.ndarray,
+    closes: Sequence[float],
+    *,
+    take_profit: float = 0.03,
+    stop_loss: float = -0.02,
+    exits: Optional[np.ndarray] = None,
+) -> Tuple[List[float], List[Dict[str, float]]]:
+    """Return per-trade returns and ``max_profit``/``max_loss`` excursions.
+
+    With ``exits``, positions close on bars where ``exits`` is set instead
+    of where the mask turns off.  Flat stretches are skipped with a search
+    over the entry bars; only bars spent in a position are scanned, one
+    scalar step each.
+    """
+    returns: List[float] = []
+    trades: List[Dict[str, float]] = []
+    entries = np.flatnonzero(mask).tolist()
+    if not entries:
+        return returns, trades
+    prices = closes.tolist() if isinstance(closes, np.ndarray) else list(closes)
+    # True where an open position must close
+    flags = (~mask).tolist() if exits is None else np.asarray(exits, dtype=bool).tolist()
+    last = len(prices) - 1
+    k = 0
+    while k < len(entries) and entries[k] < last:
+        entry = entries[k]
+        base = prices[entry]
+        high = low = 0.0
+        bar = entry
+        while True:
+            bar += 1
+            change = prices[bar] / base - 1
+            if change > high:
+                high = change
+            elif change < low:
+                low = change
+            if change >= take_profit or change <= stop_loss or flags[bar] or bar == last:
+                break
+        returns.append(change)
+        trades.append({"max_profit": high, "max_loss": low})
+        k = bisect_right(entries, bar, k)
+    return returns, trades
+
+
+def evaluate_genome(
+    genome,
+    closes: np.ndarray,
+    *,
+    take_profit: float = 0.03,
+    stop_loss: float = -0.02,
+    evaluator: Optional[StrategyEvaluator] = None,
+) -> Metrics:
+    """Backtest one genome and return ``StrategyEvaluator.evaluate`` metrics."""
+    mask = compile_strategy(genome)(closes)
+    returns, trades = simulate_trades(mask, closes, take_profit=take_profit, stop_loss=stop_loss)
+    metrics = (evaluator or StrategyEvaluator()).evaluate(returns, trades)
+    metrics["trades"] = len(returns)
+    return metrics
+
+
+def evaluate_genomes(
+    genomes: Sequence[Any],
+    closes: np.ndarray,
+    *,
+    take_profit: float = 0.03,
+    stop_loss: float = -0.02,
+    store: Optional[Dict[Any, np.ndarray]] = None,
+    prices: Optional[List[float]] = None,
+) -> List[Metrics]:
+    """Backtest several genomes and score them together.
+
+    Indicator series are shared through an :class:`IndicatorPlan` and the
+    metrics are computed for all genomes at once with
+    :func:`batch_metrics.evaluate_batch`.
+    """
+    prices = closes.tolist() if prices is None else prices
+    returns, profits, losses = [], [], []
+    for mask in IndicatorPlan(genomes).entry_masks(closes, store):
+        rets, trades = simulate_trades(mask, prices, take_profit=take_profit, stop_loss=stop_loss)
+        returns.append(rets)
+        profits.append([t["max_profit"] for t in trades])
+        losses.append([t["max_loss"] for t in trades])
+    return metric_dicts(evaluate_batch(returns, max_profit=profits, max_loss=losses))
+
+
+def _init_worker(name: str, length: int, take_profit: float, stop_loss: float) -> None:
+    shm = shared_memory.SharedMemory(name=name)
+    closes = np.ndarray((length,), dtype=np.float64, buffer=shm.buf)
+    _worker["shm"] = shm
+    _worker["closes"] = closes
+    _worker["kwargs"] = {
+        "take_profit": take_profit,
+        "stop_loss": stop_loss,
+        # indicator series are reused by every chunk this worker receives
+        "store": {},
+        "prices": closes.tolist(),
+    }
+
+
+def _evaluate_chunk(genomes: List[List[Dict[str, Any]]]) -> List[Metrics]:
+    return evaluate_genomes(genomes, _worker["closes"], **_worker["kwargs"])
+
+
+def fitness_scores(metrics: Sequence[Metrics], fitness: Fitness = "sqn") -> List[float]:
+    """Reduce metric dicts to the ``performance`` list ``evolve`` expects."""
+    if callable(fitness):
+        return [float(fitness(m)) for m in metrics]
+    return [float(m.get(fitness, 0.0)) for m in metrics]
+
+
+class PopulationEvaluator:
+    """Evaluate generated populations in parallel over a shared price array.
+
+    ``workers=0`` evaluates in the calling process, which is also used for
+    populations smaller than ``min_parallel``.  Use as a context manager or
+    call :meth:`close` to stop the pool and release the shared buffer.
+    """
+
+    def __init__(
+        self,
+        closes: Sequence[float],
+        *,
+        workers: Optional[int] = None,
+        take_profit: float = 0.03,
+        stop_loss: float = -0.02,
+        chunk_size: int = 128,
+        min_parallel: int = 128,
+    ) -> None:
+        self.closes = np.ascontiguousarray(closes, dtype=np.float64)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.chunk_size = chunk_size
+        self.min_parallel = min_parallel
+        # indicator series of ``closes`` shared by in-process evaluations
+        self.series: Dict[Any, np.ndarray] = {}
+        self._prices: Optional[List[float]] = None
+        self._dataset_version: Optional[str] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "PopulationEvaluator":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=max(self.closes.nbytes, 1))
+            np.ndarray(self.closes.shape, dtype=np.float64, buffer=self._shm.buf)[:] = self.closes
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._shm.name, len(self.closes), self.take_profit, self.stop_loss),
+            )
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    @property
+    def dataset_version(self) -> str:
+        """Hash of the closes and backtest thresholds, for :class:`FitnessCache`."""
+        if self._dataset_version is None:
+            digest = hashlib.sha1(self.closes.tobytes())
+            digest.update(f"{self.take_profit!r}/{self.stop_loss!r}".encode())
+            self._dataset_version = digest.hexdigest()
+        return self._dataset_version
+
+    def evaluate(
+        self, population: Sequence[Dict[str, Any]], *, cache: Optional[FitnessCache] = None
+    ) -> List[Metrics]:
+        """Return one metrics dict per strategy, in population order.
+
+        With ``cache``, genomes already scored on this dataset are looked up
+        and each distinct new genome is backtested once.
+        """
+        if cache is None:
+            return self._evaluate([list(s.get("conditions", [])) for s in population])
+        dataset = self.dataset_version
+        results: List[Optional[Metrics]] = [cache.get(s, dataset) for s in population]
+        pending: Dict[str, List[int]] = {}
+        for i, strategy in enumerate(population):
+            if results[i] is None:
+                pending.setdefault(genome_signature(strategy.get("conditions", [])), []).append(i)
+        if pending:
+            firsts = [population[rows[0]] for rows in pending.values()]
+            fresh = self._evaluate([list(s.get("conditions", [])) for s in firsts])
+            for rows, strategy, metrics in zip(pending.values(), firsts, fresh):
+                cache.put(strategy, dataset, metrics)
+                for i in rows:
+                    results[i] = dict(metrics)
+        return results
+
+    def _evaluate(self, genomes: List[List[Dict[str, Any]]]) -> List[Metrics]:
+        chunks = [genomes[i: i + self.chunk_size] for i in range(0, len(genomes), self.chunk_size)]
+        results: List[Metrics] = []
+        if self.workers <= 0 or len(genomes) < self.min_parallel:
+            if self._prices is None:
+                self._prices = self.closes.tolist()
+            for chunk in chunks:
+                results.extend(
+                    evaluate_genomes(
+                        chunk,
+                        self.closes,
+                        take_profit=self.take_profit,
+                        stop_loss=self.stop_loss,
+                        store=self.series,
+                        prices=self._prices,
+                    )
+                )
+            return results
+        pool = self._ensure_pool()
+        for part in pool.map(_evaluate_chunk, chunks):
+            results.extend(part)
+        return results
+
+    def evolve(
+        self,
+        generator: StrategyGenerator,
+        population: List[Dict[str, Any]],
+        *,
+        fitness: Fitness = "sqn",
+        mutation_rate: float = 0.2,
+    ) -> Tuple[List[Dict[str, Any]], List[Metrics]]:
+        """Evaluate ``population`` and return ``(children, metrics)``.
+
+        Results are cached in ``generator.fitness_cache`` and saved with it.
+        """
+        metrics = self.evaluate(population, cache=generator.fitness_cache)
+        children = generator.evolve(
+            population, fitness_scores(metrics, fitness), mutation_rate=mutation_rate
+        )
+        return children, metrics
@@ -4,6 +4,12 @@ from __future__ import annotations
 
 import json
 import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from config import UPBIT_WS_URL
+from market_recorder import get_recorder
 
 try:
     import websocket  # type: ignore
@@ -17,20 +23,171 @@ except Exception:  # pragma: no cover - optional dependency
 
     websocket = _DummyModule()
 
+# Fields kept from each message type; everything else is discarded on decode
+_FIELDS = {
+    "trade": ("code", "trade_price", "trade_volume", "trade_timestamp", "ask_bid"),
+    "orderbook": ("code", "orderbook_units", "total_bid_size", "total_ask_size", "timestamp"),
+    "ticker": ("code", "trade_price", "trade_volume", "trade_timestamp", "signed_change_rate", "timestamp"),
+}
+
+
+def decode_message(message: str | bytes) -> Dict[str, Any]:
+    """Decode a text or binary Upbit frame into a compact record."""
+    if isinstance(message, (bytes, bytearray)):
+        message = message.decode("utf-8")
+    data = json.loads(message)
+    msg_type = data.get("type", "trade")
+    fields = _FIELDS.get(msg_type)
+    if fields is None:
+        return data
+    record = {"type": msg_type}
+    for key in fields:
+        if key in data:
+            record[key] = data[key]
+    return record
+
+
+class FeedStats:
+    """Per-second message, drop and lag counters for a feed."""
+
+    def __init__(self, clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._second = int(clock())
+        self._current = self._empty()
+        self.last_second = self._empty()
+        self.totals = {"messages": 0, "dropped": 0, "coalesced": 0, "reconnects": 0}
+
+    @staticmethod
+    def _empty() -> Dict[str, float]:
+        return {"messages": 0, "dropped": 0, "coalesced": 0, "max_lag_ms": 0.0, "max_queue_ms": 0.0}
+
+    def _roll(self) -> None:
+        second = int(self._clock())
+        if second != self._second:
+            # a gap of more than one second means the last second was idle
+            self.last_second = self._current if second == self._second + 1 else self._empty()
+            self._current = self._empty()
+            self._second = second
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._roll()
+            if name in self._current:
+                self._current[name] += amount
+            self.totals[name] = self.totals.get(name, 0) + amount
+
+    def lag(self, exchange_ms: Optional[float], received: float) -> None:
+        """Record exchange-to-receive and receive-to-dispatch lag."""
+        now = self._clock()
+        with self._lock:
+            self._roll()
+            if exchange_ms:
+                self._current["max_lag_ms"] = max(self._current["max_lag_ms"], now * 1000 - exchange_ms)
+            self._current["max_queue_ms"] = max(self._current["max_queue_ms"], (now - received) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._roll()
+            return {"per_second": dict(self.last_second), "totals": dict(self.totals)}
+
 
 class UpbitWebSocket:
-    """Subscribe to real-time trade price via Upbit WebSocket."""
+    """Subscribe to real-time trade price via Upbit WebSocket.
+
+    By default listeners run on the socket thread for every message.  With
+    ``coalesce=True`` the socket thread only decodes and enqueues: trades go
+    to a bounded queue (oldest dropped on overflow) while orderbook and
+    ticker messages keep only the latest value per market.  A dispatcher
+    thread delivers them to listeners, so a slow consumer sees at most one
+    stale update per market instead of an ever-growing backlog.
+    """
 
-    def __init__(self, ticker: str = "KRW-BTC") -> None:
+    def __init__(
+        self,
+        ticker: str = "KRW-BTC",
+        *,
+        codes: List[str] | None = None,
+        types: Sequence[str] = ("trade",),
+        coalesce: bool = False,
+        queue_size: int = 10_000,
+        verbose: bool = True,
+        reconnect: bool = True,
+        url: str = UPBIT_WS_URL,
+    ) -> None:
         self.ticker = ticker
+        self.codes = list(codes) if codes else [ticker]
+        self.types = list(types)
+        self.coalesce = coalesce
+        self.verbose = verbose
+        self.reconnect = reconnect
+        self.url = url
         self.latest_price: float | None = None
         self.ws: websocket.WebSocketApp | None = None
+        self.stats = FeedStats()
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._opened = False
+        self._stopped = threading.Event()
+        self._trades: Deque[Tuple[float, Dict[str, Any]]] = deque(maxlen=queue_size)
+        self._latest: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        self._pending = threading.Condition()
+
+    def add_listener(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Register ``callback`` to receive every decoded message."""
+        self._listeners.append(callback)
 
     # ------------------------------------------------------------------
-    def on_message(self, ws: websocket.WebSocketApp, message: str) -> None:
-        data = json.loads(message)
-        self.latest_price = data.get("trade_price")
-        print(f"[실시간 시세] {self.ticker}: {self.latest_price}")
+    def _deliver(self, data: Dict[str, Any]) -> None:
+        for callback in self._listeners:
+            callback(data)
+
+    def on_message(self, ws: websocket.WebSocketApp, message: str | bytes) -> None:
+        data = decode_message(message)
+        self.stats.incr("messages")
+        recorder = get_recorder()
+        if recorder is not None:
+            recorder.on_message(data)
+        msg_type = data.get("type", "trade")
+        if msg_type == "trade":
+            self.latest_price = data.get("trade_price")
+            if self.verbose:
+                print(f"[실시간 시세] {data.get('code', self.ticker)}: {self.latest_price}")
+        if not self.coalesce:
+            self._deliver(data)
+            return
+        received = time.time()
+        with self._pending:
+            if msg_type == "trade":
+                if len(self._trades) == self._trades.maxlen:
+                    self.stats.incr("dropped")
+                self._trades.append((received, data))
+            else:
+                key = (msg_type, data.get("code", ""))
+                if key in self._latest:
+                    self.stats.incr("coalesced")
+                self._latest[key] = (received, data)
+            self._pending.notify()
+
+    def drain(self) -> int:
+        """Deliver all pending coalesced messages; return how many."""
+        with self._pending:
+            items = list(self._trades) + list(self._latest.values())
+            self._trades.clear()
+            self._latest.clear()
+        for received, data in items:
+            self.stats.lag(data.get("trade_timestamp") or data.get("timestamp"), received)
+            try:
+                self._deliver(data)
+            except Exception as exc:  # keep dispatching on listener bugs
+                print(f"[WebSocket 리스너 오류] {exc}")
+        return len(items)
+
+    def _dispatch_loop(self) -> None:
+        while not self._stopped.is_set():
+            with self._pending:
+                while not self._trades and not self._latest and not self._stopped.is_set():
+                    self._pending.wait(timeout=1.0)
+            self.drain()
 
     def on_error(self, ws: websocket.WebSocketApp, error: Exception) -> None:
         print(f"[WebSocket 오류] {error}")
@@ -44,22 +201,60 @@ class UpbitWebSocket:
         print("[WebSocket 종료됨]")
 
     def on_open(self, ws: websocket.WebSocketApp) -> None:
-        payload = [{"ticket": "price_feed"}, {"type": "trade", "codes": [self.ticker]}]
+        payload: List[Dict[str, Any]] = [{"ticket": "price_feed"}]
+        payload.extend({"type": t, "codes": self.codes} for t in self.types)
         ws.send(json.dumps(payload))
+        reconnected = self._opened
+        self._opened = True
+        if reconnected:
+            # Messages may have been missed while disconnected.
+            self.stats.incr("reconnects")
+            self._deliver({"type": "reconnect"})
 
     # ------------------------------------------------------------------
-    def run(self) -> None:
-        """Start the WebSocket connection in a background thread."""
-        self.ws = websocket.WebSocketApp(
-            "wss://api.upbit.com/websocket/v1",
+    def _create_app(self) -> websocket.WebSocketApp:
+        return websocket.WebSocketApp(
+            self.url,
             on_message=self.on_message,
             on_error=self.on_error,
             on_close=self.on_close,
             on_open=self.on_open,
         )
-        thread = threading.Thread(target=self.ws.run_forever, daemon=True)
+
+    def _run_loop(self) -> None:
+        delay = 1.0
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            self.ws.run_forever(ping_interval=30, ping_timeout=10)
+            if not self.reconnect or self._stopped.is_set():
+                break
+            if time.monotonic() - started > 60:
+                delay = 1.0
+            print(f"[WebSocket 재연결] {delay:.0f}초 후 재시도")
+            self._stopped.wait(delay)
+            delay = min(delay * 2, 30.0)
+            self.ws = self._create_app()
+
+    def run(self) -> None:
+        """Start the WebSocket connection in a background thread."""
+        self.ws = self._create_app()
+        thread = threading.Thread(target=self._run_loop, daemon=True)
         thread.start()
+        if self.coalesce:
+            threading.Thread(target=self._dispatch_loop, daemon=True).start()
+
+    def stop(self) -> None:
+        """Close the connection and stop reconnecting."""
+        self._stopped.set()
+        with self._pending:
+            self._pending.notify_all()
+        if self.ws is not None:
+            self.ws.close()
 
     def get_latest_price(self) -> float | None:
         """Return the most recent trade price received."""
         return self.latest_price
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-second and total message, drop and lag statistics."""
+        return self.stats.snapshot()
@@ -0,0 +1,189 @@
+"""Compile generated strategy genomes into vectorized entry masks.
+
+``StrategyGenerator`` emits conditions such as
+``{"type": "MA", "period": 20, "direction": ">"}``.  :func:`compile_strategy`
+turns a genome into a function that takes the whole close history (oldest
+first) and returns a boolean entry mask, one value per bar, using the
+indicators in :mod:`batch_indicators`.  All conditions must hold:
+
+* ``MA``: the close is ``direction`` its ``period`` simple moving average.
+* ``RSI``: the Cutler RSI over ``period`` is ``op`` ``level``.
+* ``MACD``: the ``(fast, slow, signal)`` histogram is positive.
+
+Bars where an indicator is not yet defined never enter.  Compiled functions
+are cached by :func:`canonical_conditions`, so genomes that differ only in
+condition order, repeats or id share one function.  :class:`IndicatorPlan`
+evaluates a whole population and computes each distinct indicator series
+only once.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import batch_indicators as bi
+from agents.strategy_generator import canonical_conditions
+
+EntryMask = Callable[[Any], np.ndarray]
+Genome = Union[Dict[str, Any], Sequence[Dict[str, Any]]]
+Condition = Tuple[Any, ...]
+SeriesKey = Tuple[Any, ...]
+
+_OPS = {">": np.greater, "<": np.less}
+_CACHE_SIZE = 65_536
+
+
+def _op(symbol: str):
+    try:
+        return _OPS[symbol]
+    except KeyError:
+        raise ValueError(f"unknown comparison: {symbol!r}") from None
+
+
+def _requirements(cond: Condition) -> Tuple[SeriesKey, ...]:
+    """Indicator series a canonical condition reads."""
+    if cond[0] == "MA":
+        return (("SMA", cond[1]),)
+    if cond[0] == "RSI":
+        return (("RSI", cond[1]),)
+    fast, slow, signal = cond[1:]
+    return (("EMA", fast), ("EMA", slow), ("MACD", fast, slow, signal))
+
+
+def _series(key: SeriesKey, closes: np.ndarray, store: Dict[SeriesKey, np.ndarray]) -> np.ndarray:
+    """Return indicator ``key`` for ``closes``, computing it once per ``store``."""
+    values = store.get(key)
+    if values is None:
+        kind = key[0]
+        if kind == "SMA":
+            values = bi.sma(closes, key[1])
+        elif kind == "RSI":
+            values = bi.rsi(closes, key[1])
+        elif kind == "EMA":
+            values = bi.ema(closes, key[1])
+        else:
+            fast, slow, signal = key[1:]
+            values = bi.macd_histogram_from(
+                _series(("EMA", fast), closes, store), _series(("EMA", slow), closes, store), slow, signal
+            )
+        store[key] = values
+    return values
+
+
+def _condition_mask(cond: Condition, closes: np.ndarray, store: Dict[SeriesKey, np.ndarray]) -> np.ndarray:
+    kind = cond[0]
+    series = _series(_requirements(cond)[-1], closes, store)
+    if kind == "MA":
+        # comparisons against the NaN warm-up are False
+        return _op(cond[2])(closes, series)
+    if kind == "RSI":
+        period, level, op = cond[1:]
+        out = _op(op)(series, level)
+        out[:period] = False
+        return out
+    return series > 0
+
+
+def _conditions_of(genome: Genome) -> Iterable[Dict[str, Any]]:
+    if isinstance(genome, dict):
+        return genome.get("conditions", [])
+    return genome
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _compile(key: Tuple[Condition, ...]) -> EntryMask:
+    for cond in key:
+        if cond[0] == "MA":
+            _op(cond[2])
+        elif cond[0] == "RSI":
+            _op(cond[3])
+
+    def entry_mask(closes) -> np.ndarray:
+        closes = np.ascontiguousarray(closes, dtype=np.float64)
+        mask = np.zeros(len(closes), dtype=bool) if not key else None
+        store: Dict[SeriesKey, np.ndarray] = {}
+        for cond in key:
+            part = _condition_mask(cond, closes, store)
+            mask = part if mask is None else mask & part
+        return mask
+
+    entry_mask.genome = key
+    return entry_mask
+
+
+def compile_strategy(genome: Genome) -> EntryMask:
+    """Return the cached entry-mask function for a strategy dict or condition list."""
+    return _compile(canonical_conditions(_conditions_of(genome)))
+
+
+def entry_masks(genomes: Iterable[Genome], closes) -> np.ndarray:
+    """Return a ``(len(genomes), len(closes))`` boolean matrix of entry masks."""
+    return IndicatorPlan(genomes).entry_masks(closes)
+
+
+class IndicatorPlan:
+    """Evaluate a whole population with each indicator series computed once.
+
+    The plan collects the distinct conditions of all genomes and the series
+    they read (``("SMA", 20)``, ``("RSI", 14)``, ``("EMA", 12)``,
+    ``("MACD", 12, 26, 9)``; MACDs share their EMAs).  :meth:`entry_masks`
+    computes every series and every condition mask once and combines them
+    per genome.  Pass a ``store`` dict to keep series across calls on the
+    same closes, e.g. for several chunks of one population.
+    """
+
+    def __init__(self, genomes: Iterable[Genome]) -> None:
+        self.genomes: List[Tuple[Condition, ...]] = [
+            canonical_conditions(_conditions_of(g)) for g in genomes
+        ]
+        self.conditions: List[Condition] = sorted({c for g in self.genomes for c in g})
+        required = set()
+        for cond in self.conditions:
+            required.update(_requirements(cond))
+        self.requirements: List[SeriesKey] = sorted(required)
+        # series a per-genome evaluation would compute
+        self.naive_series = sum(len(_requirements(c)) for g in self.genomes for c in g)
+        self.report: Dict[str, int] = {}
+
+    def entry_masks(self, closes, store: Optional[Dict[SeriesKey, np.ndarray]] = None) -> np.ndarray:
+        """Return a ``(len(genomes), len(closes))`` boolean matrix of entry masks."""
+        closes = np.ascontiguousarray(closes, dtype=np.float64)
+        store = {} if store is None else store
+        cached = sum(1 for key in self.requirements if key in store)
+        for key in self.requirements:
+            _series(key, closes, store)
+        cond_masks = {cond: _condition_mask(cond, closes, store) for cond in self.conditions}
+        out = np.zeros((len(self.genomes), len(closes)), dtype=bool)
+        for row, genome in zip(out, self.genomes):
+            if not genome:
+                continue
+            np.copyto(row, cond_masks[genome[0]])
+            for cond in genome[1:]:
+                row &= cond_masks[cond]
+        self.report = {
+            "genomes": len(self.genomes),
+            "naive_series": self.naive_series,
+            "unique_series": len(self.requirements),
+            "computed_series": len(self.requirements) - cached,
+            "series_bytes": sum(store[key].nbytes for key in self.requirements),
+            "conditions": len(self.conditions),
+            "condition_bytes": sum(m.nbytes for m in cond_masks.values()),
+            "mask_bytes": out.nbytes,
+        }
+        return out
+
+    def memory_report(self) -> Dict[str, int]:
+        """Return counts and byte sizes from the last :meth:`entry_masks` call."""
+        return dict(self.report)
+
+
+def cache_info():
+    """Return hit/miss statistics of the compiled-function cache."""
+    return _compile.cache_info()
+
+
+def clear_cache() -> None:
+    _compile.cache_clear()
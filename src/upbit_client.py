@@ -0,0 +1,247 @@
+"""Shared HTTP client for the Upbit quotation REST API.
+
+All REST calls go through one keep-alive session per process.  Requests are
+throttled by per-group token buckets matching Upbit's per-second quotas and
+retried with jittered exponential backoff on 429/5xx responses and network
+errors.  Latency and error counters are kept per endpoint.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
+except Exception:  # pragma: no cover - fallback for minimal environments
+    class _DummyRequests:
+        class RequestException(Exception):
+            pass
+
+        class HTTPError(RequestException):
+            pass
+
+        class Session:
+            def get(self, *_, **__):
+                raise _DummyRequests.RequestException("requests library not available")
+
+            def mount(self, *_, **__):
+                pass
+
+    requests = _DummyRequests()
+    HTTPAdapter = None
+
+from config import UPBIT_API_URL
+
+RequestException = requests.RequestException
+
+# Upbit quotation API limits (requests per second) per endpoint group
+RATE_LIMITS: Dict[str, float] = {
+    "candles": 10,
+    "orderbook": 10,
+    "ticker": 10,
+    "trades": 10,
+    "market": 10,
+}
+DEFAULT_RATE = 10
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket allowing ``rate`` acquisitions per second."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def drain(self) -> None:
+        """Empty the bucket, e.g. when the server reports no quota left."""
+        with self._lock:
+            self._refill()
+            self.tokens = 0.0
+
+
+def _endpoint_group(path: str) -> str:
+    parts = [p for p in path.split("/") if p]
+    if parts and parts[0].startswith("v"):
+        parts = parts[1:]
+    return parts[0] if parts else "default"
+
+
+def _remaining_per_second(header: Optional[str]) -> Optional[int]:
+    """Parse ``Remaining-Req: group=default; min=1799; sec=29``."""
+    if not header:
+        return None
+    for item in header.split(";"):
+        key, _, value = item.strip().partition("=")
+        if key == "sec":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+
+class UpbitClient:
+    """Pooled, rate-limited GET client for Upbit REST endpoints."""
+
+    def __init__(
+        self,
+        base_url: str = UPBIT_API_URL,
+        *,
+        session: Any = None,
+        rate_limits: Optional[Dict[str, float]] = None,
+        timeout: float = 5,
+        max_retries: int = 5,
+        backoff_base: float = 0.25,
+        backoff_cap: float = 8.0,
+        pool_size: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.rate_limits = dict(RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update(rate_limits)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = random.Random()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        if session is None:
+            session = requests.Session()
+            if HTTPAdapter is not None:
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+        self.session = session
+
+    # ------------------------------------------------------------------
+    def _bucket(self, group: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(group)
+            if bucket is None:
+                rate = self.rate_limits.get(group, DEFAULT_RATE)
+                bucket = TokenBucket(rate, clock=self._clock, sleep=self._sleep)
+                self._buckets[group] = bucket
+            return bucket
+
+    def _record(self, path: str, field: str, value: float = 1.0) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(
+                path,
+                {"calls": 0, "errors": 0, "retries": 0, "throttled": 0, "total_latency": 0.0, "max_latency": 0.0},
+            )
+            if field == "latency":
+                stats["total_latency"] += value
+                stats["max_latency"] = max(stats["max_latency"], value)
+            else:
+                stats[field] += value
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for ``attempt``."""
+        return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    # ------------------------------------------------------------------
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Return the decoded JSON body of ``GET path``.
+
+        Raises ``requests.RequestException`` once retries are exhausted.
+        """
+        url = f"{self.base_url}{path}"
+        bucket = self._bucket(_endpoint_group(path))
+        attempt = 0
+        while True:
+            if bucket.acquire() > 0:
+                self._record(path, "throttled")
+            self._record(path, "calls")
+            start = self._clock()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except RequestException:
+                self._record(path, "latency", self._clock() - start)
+                self._record(path, "errors")
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                self._record(path, "latency", self._clock() - start)
+                remaining = _remaining_per_second(response.headers.get("Remaining-Req"))
+                if remaining == 0:
+                    bucket.drain()
+                if response.status_code not in RETRY_STATUS:
+                    if response.status_code >= 400:
+                        self._record(path, "errors")
+                    response.raise_for_status()
+                    return response.json()
+                self._record(path, "errors")
+                if response.status_code == 429:
+                    bucket.drain()
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+            self._record(path, "retries")
+            self._sleep(self._backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-endpoint counters with the average latency."""
+        with self._lock:
+            result = {}
+            for path, stats in self._stats.items():
+                entry = dict(stats)
+                entry["avg_latency"] = stats["total_latency"] / stats["calls"] if stats["calls"] else 0.0
+                result[path] = entry
+            return result
+
+
+_client: Optional[UpbitClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> UpbitClient:
+    """Return the process-wide :class:`UpbitClient`."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = UpbitClient()
+        return _client
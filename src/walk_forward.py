@@ -0,0 +1,509 @@
+"""Walk-forward search over the entry and exit thresholds.
+
+The thresholds in ``EntryDecisionAgent`` (``DEFAULT_THRESHOLDS``),
+``entry_block_reason`` and ``PositionManager`` are searched on rolling
+train/test windows.  Per-bar features are computed once with
+:mod:`batch_indicators`; every candidate parameter set is turned into entry
+and exit masks with array operations, traded with
+:func:`population_eval.simulate_trades` in each window and scored with
+:func:`batch_metrics.evaluate_batch`.  Candidates are spread over a process
+pool.
+
+The masks mirror ``EntryDecisionAgent.evaluate`` for one fixed strategy with
+the default ``StrategyScorer`` weights.  Weight tuning, the recent-flip part
+of the conflict index, emotion/news offsets and position scaling are
+stateful and left out; one position is held at a time and a stop closes it
+in full.
+
+Usage::
+
+    python src/walk_forward.py --symbol KRW-BTC --start 1700000000 --end 1702600000 \
+        --search random --samples 500 --out wf.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import batch_indicators as bi
+from agents.entry_decision import DEFAULT_THRESHOLDS
+from agents.strategy_scorer import DEFAULT_WEIGHTS
+from batch_metrics import evaluate_batch
+from population_eval import simulate_trades
+
+Params = Dict[str, float]
+Window = Tuple[int, int, int, int]
+
+# Current live values of every searched parameter
+DEFAULT_PARAMS: Params = {
+    "rsi": DEFAULT_THRESHOLDS["rsi"],
+    "volatility": DEFAULT_THRESHOLDS["volatility"],
+    "diff": DEFAULT_THRESHOLDS["diff"],
+    "conflict": DEFAULT_THRESHOLDS["conflict"],
+    "min_confidence": 0.7,
+    "min_score": 75.0,
+    "take_profit": 0.03,
+    "stop_loss": -0.02,
+}
+
+PARAM_SPACE: Dict[str, List[float]] = {
+    "rsi": [40.0, 44.0, 48.0, 52.0, 56.0],
+    "volatility": [0.005, 0.01, 0.02, 0.03],
+    "diff": [1.0, 1.5, 2.0, 2.5],
+    "conflict": [0.3, 0.5, 0.8],
+    "min_confidence": [0.5, 0.7, 0.9],
+    "min_score": [40.0, 55.0, 70.0, 75.0],
+    "take_profit": [0.01, 0.02, 0.03, 0.05],
+    "stop_loss": [-0.01, -0.02, -0.03],
+}
+
+# Parameters that only the listed strategies read
+STRATEGY_PARAMS: Dict[str, Tuple[str, ...]] = {
+    "min_confidence": ("orderbook_weighted",),
+}
+
+METRICS = ("total_return", "max_drawdown", "sqn", "trades")
+
+# Worker-side features and windows
+_worker: Dict[str, Any] = {}
+
+
+def decision_features(
+    closes,
+    *,
+    bid_volume=None,
+    ask_volume=None,
+    notional_score=None,
+    window: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Per-bar inputs of ``EntryDecisionAgent.evaluate``.
+
+    ``window`` is the number of closes the bot sees per tick
+    (``CANDLE_COUNT``); indicators that need more history fall back as in
+    ``candle_features`` (MA34 -> MA20, no golden cross).  The MACD histogram
+    always uses the full history, like the backfill-seeded
+    ``IndicatorEngine`` the live app reads it from.
+    """
+    closes = np.ascontiguousarray(closes, dtype=np.float64)
+    n = len(closes)
+    rsi = bi.rsi(closes, 14)
+    rsi_prev = rsi.copy()
+    rsi_prev[14:] = rsi[13:-1]
+    ma20 = bi.sma(closes, 20)
+    ma34 = bi.sma(closes, 34)
+    golden = bi.golden_cross(closes)
+    macd = bi.macd_histogram(closes)
+    if window is not None:
+        if window < 34:
+            ma34 = ma20
+        if window < 25:
+            golden = np.zeros(n, dtype=bool)
+    ma34 = np.where(np.isnan(ma34), ma20, ma34)
+    std20 = bi.rolling_std(closes, 20)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = np.where(ma20 != 0, std20 / ma20, 0.0)
+    has_book = bid_volume is not None and ask_volume is not None
+    bid = np.asarray(bid_volume, dtype=np.float64) if has_book else np.zeros(n)
+    ask = np.asarray(ask_volume, dtype=np.float64) if has_book else np.zeros(n)
+    return {
+        "close": closes,
+        "rsi": rsi,
+        "rsi_prev": rsi_prev,
+        "ma5": bi.sma(closes, 5),
+        "ma_cross": bi.sma(closes, 10) > ma34,
+        "golden": golden,
+        "bb": bi.bollinger_score(closes).astype(np.int8),
+        "volatility": volatility,
+        "macd": macd,
+        "bias_up": bid > ask,
+        "bias_down": ask > bid,
+        "notional": np.zeros(n) if notional_score is None else np.asarray(notional_score, dtype=np.float64),
+        "has_book": np.array(has_book),
+    }
+
+
+def decision_masks(features: Dict[str, np.ndarray], params: Params, strategy: str = "trend_follow") -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(entries, exits)``: bars where entry is allowed and bars that signal SELL."""
+    f = features
+    thr = params["rsi"]
+    rsi = f["rsi"]
+    up, down = f["bias_up"], f["bias_down"]
+    conditions = {
+        "rsi_above_threshold": rsi > thr,
+        "ma_cross": f["ma_cross"],
+        "golden_cross": f["golden"],
+        "orderbook_bias_up": up,
+        "orderbook_bias_down": down,
+        "volatility_threshold": f["volatility"] < params["volatility"],
+    }
+    score = np.zeros(len(rsi))
+    for name, passed in conditions.items():
+        score += DEFAULT_WEIGHTS.get(name, 0.0) * passed
+    score *= 100
+
+    rsi_diff = rsi - f["rsi_prev"]
+    buy_sens = 1.0 + (rsi_diff > 0)
+    sell_sens = 1.0 + (rsi_diff < 0)
+    buy_score = (rsi > thr).astype(float) + (f["bb"] > 0) + up
+    sell_score = (rsi < thr).astype(float) + (f["bb"] < 0) + down
+    diff = buy_sens * buy_score - sell_sens * sell_score
+
+    signal = np.zeros(len(rsi), dtype=np.int8)
+    book = bool(f["has_book"])
+    if strategy in ("momentum", "trend_follow"):
+        signal[f["golden"] & (rsi > thr)] = 1
+    elif strategy == "reversal":
+        signal[f["close"] < f["ma5"]] = 1
+    elif strategy == "orderbook_weighted" and book:
+        signal[f["notional"] > 0.3] = 1
+        signal[f["notional"] < -0.3] = -1
+
+    any_condition = np.logical_or.reduce(list(conditions.values()))
+    sell_conditions = (rsi < 45) | ~f["ma_cross"] | down
+    conflict = 0.5 * (any_condition & sell_conditions) + 0.3 * (
+        ((rsi > thr) & (f["macd"] < 0)) | ((rsi < 45) & (f["macd"] > 0))
+    )
+    direction = np.sign(diff).astype(np.int8)
+    signal = np.where(conflict >= params["conflict"], direction, signal)
+    signal = np.where(np.abs(diff) >= params["diff"], direction, signal)
+    signal[:19] = 0
+
+    blocked = score < params["min_score"]
+    if strategy == "orderbook_weighted" and book:
+        blocked |= f["notional"] < params["min_confidence"]
+    # ``decide_entry`` lets high scores through when the book bias failed
+    override = (score >= 70) & ~up
+    entries = (signal == 1) & (~blocked | override)
+    return entries, signal == -1
+
+
+def rolling_windows(n: int, train: int, test: int, *, step: Optional[int] = None, start: int = 0) -> List[Window]:
+    """Return ``(train_start, train_end, test_start, test_end)`` bar ranges."""
+    step = step or test
+    out = []
+    lo = start
+    while lo + train + test <= n:
+        out.append((lo, lo + train, lo + train, lo + train + test))
+        lo += step
+    return out
+
+
+def strategy_space(strategy: str, space: Dict[str, Sequence[float]] = PARAM_SPACE) -> Dict[str, Sequence[float]]:
+    """Return ``space`` with the parameters ``strategy`` ignores pinned to their live value.
+
+    Searching those would only add candidates with identical masks.
+    """
+    out = dict(space)
+    for name, strategies in STRATEGY_PARAMS.items():
+        if name in out and strategy not in strategies:
+            out[name] = [DEFAULT_PARAMS[name]]
+    return out
+
+
+def grid_candidates(space: Dict[str, Sequence[float]] = PARAM_SPACE, *, strategy: Optional[str] = None) -> List[Params]:
+    """Return every combination of ``space``, restricted to ``strategy`` when given."""
+    if strategy is not None:
+        space = strategy_space(strategy, space)
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[k] for k in names))]
+
+
+def random_candidates(
+    samples: int,
+    space: Dict[str, Sequence[float]] = PARAM_SPACE,
+    *,
+    seed: int = 0,
+    strategy: Optional[str] = None,
+) -> List[Params]:
+    """Draw ``samples`` distinct parameter sets, always including the live defaults."""
+    if strategy is not None:
+        space = strategy_space(strategy, space)
+    rng = random.Random(seed)
+    size = 1
+    for values in space.values():
+        size *= len(values)
+    default_key = tuple(sorted(DEFAULT_PARAMS.items()))
+    in_space = set(space) == set(DEFAULT_PARAMS) and all(DEFAULT_PARAMS[k] in v for k, v in space.items())
+    total = size if in_space else size + 1
+    if samples >= total:
+        # the whole space is requested; enumerate it instead of sampling
+        grid = [c for c in grid_candidates(space) if tuple(sorted(c.items())) != default_key]
+        return [dict(DEFAULT_PARAMS)] + grid
+    seen = {default_key}
+    out = [dict(DEFAULT_PARAMS)]
+    while len(out) < samples:
+        cand = {k: rng.choice(list(v)) for k, v in space.items()}
+        key = tuple(sorted(cand.items()))
+        if key not in seen:
+            seen.add(key)
+            out.append(cand)
+    return out
+
+
+def candidate_stats(
+    features: Dict[str, np.ndarray],
+    windows: Sequence[Window],
+    params: Params,
+    *,
+    strategy: str = "trend_follow",
+    prices: Optional[List[float]] = None,
+) -> np.ndarray:
+    """Return ``(len(windows), 2, len(METRICS))`` train/test metrics for ``params``."""
+    entries, exits = decision_masks(features, params, strategy)
+    prices = features["close"].tolist() if prices is None else prices
+    rows = []
+    for train_lo, train_hi, test_lo, test_hi in windows:
+        for lo, hi in ((train_lo, train_hi), (test_lo, test_hi)):
+            returns, _ = simulate_trades(
+                entries[lo:hi],
+                prices[lo:hi],
+                take_profit=params["take_profit"],
+                stop_loss=params["stop_loss"],
+                exits=exits[lo:hi],
+            )
+            rows.append(returns)
+    batch = evaluate_batch(rows)
+    stats = np.stack([batch[m] for m in METRICS], axis=1).astype(np.float64)
+    return stats.reshape(len(windows), 2, len(METRICS))
+
+
+def _init_worker(features: Dict[str, np.ndarray], windows: List[Window], strategy: str) -> None:
+    _worker["features"] = features
+    _worker["windows"] = windows
+    _worker["strategy"] = strategy
+    _worker["prices"] = features["close"].tolist()
+
+
+def _evaluate_chunk(candidates: List[Params]) -> List[np.ndarray]:
+    return [
+        candidate_stats(
+            _worker["features"], _worker["windows"], c, strategy=_worker["strategy"], prices=_worker["prices"]
+        )
+        for c in candidates
+    ]
+
+
+class WalkForwardOptimizer:
+    """Rank candidate thresholds on each train window and report test results.
+
+    ``objective`` is one of :data:`METRICS`; candidates with fewer than
+    ``min_trades`` train trades are not selected.  A parameter set is
+    *stable* when it ranks in the train top ``top_k`` of at least
+    ``stability`` of the windows.
+    """
+
+    def __init__(
+        self,
+        features: Dict[str, np.ndarray],
+        *,
+        train_bars: int = 7 * 1440,
+        test_bars: int = 1440,
+        step: Optional[int] = None,
+        strategy: str = "trend_follow",
+        objective: str = "sqn",
+        min_trades: int = 5,
+        top_k: int = 10,
+        stability: float = 0.5,
+        workers: Optional[int] = None,
+        chunk_size: int = 16,
+    ) -> None:
+        self.features = features
+        self.windows = rolling_windows(len(features["close"]), train_bars, test_bars, step=step)
+        if not self.windows:
+            raise ValueError("not enough bars for one train/test window")
+        self.strategy = strategy
+        self.objective = objective
+        self.min_trades = min_trades
+        self.top_k = top_k
+        self.stability = stability
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+
+    def evaluate(self, candidates: Sequence[Params]) -> np.ndarray:
+        """Return ``(len(candidates), windows, 2, metrics)`` statistics."""
+        if self.workers <= 1 or len(candidates) <= self.chunk_size:
+            prices = self.features["close"].tolist()
+            stats = [
+                candidate_stats(self.features, self.windows, c, strategy=self.strategy, prices=prices)
+                for c in candidates
+            ]
+        else:
+            chunks = [list(candidates[i: i + self.chunk_size]) for i in range(0, len(candidates), self.chunk_size)]
+            stats = []
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.features, self.windows, self.strategy),
+            ) as pool:
+                for part in pool.map(_evaluate_chunk, chunks):
+                    stats.extend(part)
+        return np.stack(stats)
+
+    def run(self, candidates: Sequence[Params]) -> Dict[str, Any]:
+        """Search ``candidates`` and return a JSON-serializable report."""
+        candidates = list(candidates)
+        stats = self.evaluate(candidates)
+        obj = METRICS.index(self.objective)
+        trades = METRICS.index("trades")
+        train = np.where(stats[:, :, 0, trades] >= self.min_trades, stats[:, :, 0, obj], -np.inf)
+        test = stats[:, :, 1, :]
+
+        def metrics(row: np.ndarray) -> Dict[str, float]:
+            return {name: float(row[i]) for i, name in enumerate(METRICS)}
+
+        windows = []
+        for w, (train_lo, train_hi, test_lo, test_hi) in enumerate(self.windows):
+            best = int(np.argmax(train[:, w]))
+            if not np.isfinite(train[best, w]):
+                best = -1
+            windows.append({
+                "train": [train_lo, train_hi],
+                "test": [test_lo, test_hi],
+                "params": candidates[best] if best >= 0 else None,
+                "train_stats": metrics(stats[best, w, 0]) if best >= 0 else None,
+                "test_stats": metrics(test[best, w]) if best >= 0 else None,
+            })
+
+        top_k = min(self.top_k, len(candidates))
+        ranks = np.argsort(-train, axis=0, kind="stable")[:top_k]
+        in_top = np.zeros(train.shape, dtype=bool)
+        np.put_along_axis(in_top, ranks, True, axis=0)
+        in_top &= np.isfinite(train)
+        frequency = in_top.mean(axis=1)
+        stable = []
+        for i in np.flatnonzero(frequency >= self.stability):
+            stable.append({
+                "params": candidates[i],
+                "selection_rate": float(frequency[i]),
+                "test_total_return": float(test[i, :, 0].sum()),
+                "test_mean_objective": float(test[i, :, obj].mean()),
+                "test_worst_objective": float(test[i, :, obj].min()),
+                "test_max_drawdown": float(test[i, :, 1].max()),
+                "test_trades": int(test[i, :, trades].sum()),
+            })
+        stable.sort(key=lambda s: s["test_mean_objective"], reverse=True)
+
+        chosen = [w["test_stats"] for w in windows if w["test_stats"] is not None]
+        return {
+            "strategy": self.strategy,
+            "objective": self.objective,
+            "candidates": len(candidates),
+            "windows": windows,
+            "out_of_sample": {
+                "windows": len(chosen),
+                "total_return": sum(s["total_return"] for s in chosen),
+                "mean_objective": float(np.mean([s[self.objective] for s in chosen])) if chosen else 0.0,
+                "trades": int(sum(s["trades"] for s in chosen)),
+            },
+            "stable": stable,
+        }
+
+
+def load_recorded(symbol: str, start_ms: int, end_ms: int, root=None) -> Dict[str, Any]:
+    """Closes and per-bar book totals recorded by :class:`market_recorder.MarketRecorder`.
+
+    Each bar gets the last recorded book at or before its close; without
+    recorded books the volume entries are ``None``.
+    """
+    from market_recorder import load_records
+
+    candles = load_records("candle", symbol, start_ms, end_ms, root=root)
+    data: Dict[str, Any] = {
+        "closes": np.asarray(candles["close"], dtype=np.float64),
+        "bid_volume": None,
+        "ask_volume": None,
+        "notional_score": None,
+    }
+    books = load_records("orderbook", symbol, start_ms, end_ms + 60_000, root=root)
+    if len(books) and len(candles):
+        at = np.searchsorted(books["ts"], candles["ts"] + 60_000, side="right") - 1
+        seen = at >= 0
+        at = np.maximum(at, 0)
+        bid = books["bid_size"].sum(axis=1)[at] * seen
+        ask = books["ask_size"].sum(axis=1)[at] * seen
+        bid_notional = (books["bid_price"] * books["bid_size"]).sum(axis=1)[at] * seen
+        ask_notional = (books["ask_price"] * books["ask_size"]).sum(axis=1)[at] * seen
+        total = bid_notional + ask_notional
+        data["bid_volume"] = bid
+        data["ask_volume"] = ask
+        data["notional_score"] = np.divide(
+            bid_notional - ask_notional, total, out=np.zeros(len(total)), where=total > 0
+        )
+    return data
+
+
+def synthetic_data(bars: int, *, seed: int = 0) -> Dict[str, Any]:
+    """Random-walk closes with skewed book totals, as ``replay.synthetic_orderbook``."""
+    rng = np.random.default_rng(seed)
+    skew = rng.uniform(-0.8, 0.8, bars)
+    bid = rng.uniform(1.0, 10.0, bars) * (1 + skew)
+    ask = rng.uniform(1.0, 10.0, bars) * (1 - skew)
+    return {
+        "closes": 50_000_000 * np.cumprod(1 + rng.normal(0, 0.002, bars)),
+        "bid_volume": bid,
+        "ask_volume": ask,
+        "notional_score": (bid - ask) / (bid + ask),
+    }
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Walk-forward threshold search")
+    parser.add_argument("--symbol", default="KRW-BTC")
+    parser.add_argument("--start", type=int, help="recorded data start (epoch seconds)")
+    parser.add_argument("--end", type=int, help="recorded data end (epoch seconds)")
+    parser.add_argument("--bars", type=int, default=30 * 1440, help="synthetic bars without --start/--end")
+    parser.add_argument("--strategy", default="trend_follow")
+    parser.add_argument("--window", type=int, default=20, help="closes seen per tick (CANDLE_COUNT)")
+    parser.add_argument("--train", type=int, default=7 * 1440)
+    parser.add_argument("--test", type=int, default=1440)
+    parser.add_argument("--search", choices=["grid", "random"], default="random")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--objective", choices=METRICS[:3], default="sqn")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.start is not None and args.end is not None:
+        data = load_recorded(args.symbol, args.start * 1000, args.end * 1000)
+    else:
+        data = synthetic_data(args.bars, seed=args.seed)
+    features = decision_features(
+        data["closes"],
+        bid_volume=data["bid_volume"],
+        ask_volume=data["ask_volume"],
+        notional_score=data["notional_score"],
+        window=args.window,
+    )
+    optimizer = WalkForwardOptimizer(
+        features,
+        train_bars=args.train,
+        test_bars=args.test,
+        strategy=args.strategy,
+        objective=args.objective,
+        workers=args.workers,
+    )
+    if args.search == "grid":
+        candidates = grid_candidates(strategy=args.strategy)
+    else:
+        candidates = random_candidates(args.samples, seed=args.seed, strategy=args.strategy)
+    report = optimizer.run(candidates)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    oos = report["out_of_sample"]
+    print(f"windows: {oos['windows']}  oos return: {oos['total_return']:.4f}  trades: {oos['trades']}")
+    for entry in report["stable"][:5]:
+        print(entry["selection_rate"], entry["test_mean_objective"], entry["params"])
+
+
+if __name__ == "__main__":
+    main()
@@ -50,6 +50,7 @@ state_store = {
     "bid_volume": None,
     "ask_volume": None,
     "orderbook_score": None,
+    "orderbook_imbalance": None,
     "classified_emotion": None,
     "emotion_index": None,
     "rsi": None,
@@ -70,7 +71,22 @@ state_store = {
 
 
 def update_state(**kwargs):
-    """Merge ``kwargs`` into the global ``state_store`` and recompute equity."""
+    """Merge ``kwargs`` into the global ``state_store`` and recompute equity.
+
+    ``order_book`` may be a ``LocalOrderBook``; its levels are already
+    de-duplicated and its totals are read directly instead of re-summed.
+    """
+    book = kwargs.pop("order_book", None)
+    if book is not None:
+        book_bids, book_asks = book.levels()
+        state_store.update(
+            bids=book_bids,
+            asks=book_asks,
+            bid_volume=book.bid_volume,
+            ask_volume=book.ask_volume,
+            orderbook_imbalance=book.imbalance(),
+        )
+
     bids = kwargs.get("bids")
     asks = kwargs.get("asks")
 
@@ -0,0 +1,75 @@
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+import batch_indicators as bi
+from agents.entry_decision import EntryDecisionAgent
+from agents.market_sentiment import MarketSentimentAgent
+
+
+def _walk(n, seed=0):
+    rng = random.Random(seed)
+    price = 100.0
+    out = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.01)
+        out.append(price)
+    return out
+
+
+def test_rsi_matches_live_implementations():
+    closes = _walk(300)
+    # a flat stretch exercises the no-loss branch
+    closes[100:120] = [closes[99] + i for i in range(20)]
+    agent = EntryDecisionAgent()
+    sentiment = MarketSentimentAgent()
+    fast = bi.rsi(closes, 14)
+    slow = bi.rsi(closes, 20)
+    for i in range(len(closes)):
+        assert fast[i] == pytest.approx(agent._calc_rsi(closes[: i + 1]), abs=1e-9)
+        assert slow[i] == pytest.approx(sentiment.calc_rsi(closes[: i + 1], period=20), abs=1e-9)
+
+
+def test_macd_matches_live_implementation():
+    closes = _walk(700, seed=1)
+    agent = EntryDecisionAgent()
+    hist = bi.macd_histogram(closes)
+    for i in range(len(closes)):
+        assert hist[i] == pytest.approx(agent._calc_macd(closes[: i + 1]), rel=1e-9, abs=1e-9)
+
+
+class _Capture:
+    def __init__(self):
+        self.events = []
+
+    def log_event(self, data):
+        self.events.append(data)
+
+
+def test_condition_scores_match_evaluate():
+    closes = _walk(120, seed=2)
+    bids = [random.Random(i).random() for i in range(120)]
+    asks = [random.Random(i + 500).random() for i in range(120)]
+    batch = bi.condition_scores(closes, bid_volume=bids, ask_volume=asks)
+    agent = EntryDecisionAgent(adjuster=type("A", (), {"active": False})())
+    logger = _Capture()
+    for i in range(19, len(closes)):
+        book = {"bid_volume": bids[i], "ask_volume": asks[i]}
+        agent.evaluate("momentum", closes[: i + 1], {}, book, logger=logger)
+        live = logger.events[-1]["condition_scores"]
+        for name, values in batch.items():
+            assert bool(values[i]) == live[name], (i, name)
+    assert not any(v[:19].any() for v in batch.values())
+
+
+def test_bollinger_and_sma():
+    closes = _walk(50, seed=4)
+    mean = bi.sma(closes, 20)
+    assert np.isnan(mean[18]) and mean[19] == pytest.approx(sum(closes[:20]) / 20)
+    score = bi.bollinger_score(closes)
+    assert set(np.unique(score)) <= {-1, 0, 1}
@@ -0,0 +1,103 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from candle_feed import CandleRingBuffer, CandleFeed
+
+
+def _bars(start, closes):
+    return [
+        {"timestamp": start + i * 60, "open": c, "high": c, "low": c, "close": c, "volume": 1.0}
+        for i, c in enumerate(closes)
+    ]
+
+
+def test_ring_buffer_wraps():
+    buf = CandleRingBuffer(capacity=3)
+    for i in range(5):
+        buf.append(i * 60, i, i, i, i)
+    assert len(buf) == 3
+    assert buf.closes() == [2, 3, 4]
+    assert buf.closes(2) == [3, 4]
+    assert buf.last_timestamp == 240
+
+
+def test_trades_build_candles_without_rest():
+    calls = []
+
+    def fetcher(symbol, count):
+        calls.append(count)
+        return _bars(0, [100, 101])
+
+    feed = CandleFeed("KRW-BTC", capacity=10, fetcher=fetcher)
+    feed.backfill()
+    feed.streaming = True
+    feed.on_message({"trade_price": 102, "trade_volume": 0.5, "trade_timestamp": 60_500})
+    feed.on_message({"trade_price": 99, "trade_volume": 0.5, "trade_timestamp": 90_000})
+    feed.on_message({"trade_price": 103, "trade_volume": 1.0, "trade_timestamp": 120_000})
+    assert feed.closes(3) == [100, 99, 103]
+    bar = feed.bars(2)[0]
+    assert bar["high"] == 102 and bar["low"] == 99
+    assert bar["volume"] == 2.0
+    assert calls == [10]
+
+
+def test_gap_triggers_rest_repair():
+    history = _bars(0, [100, 101, 102, 103, 104])
+
+    def fetcher(symbol, count):
+        return history[-count:]
+
+    feed = CandleFeed("KRW-BTC", capacity=10, fetcher=fetcher)
+    feed._backfilled = True
+    feed.streaming = True
+    feed.on_trade(100, 1.0, 0)
+    feed.on_trade(104, 1.0, 240)
+    assert feed.closes(5) == [100, 101, 102, 103, 104]
+
+
+def test_timeframes_aggregate_from_minute_bars():
+    feed = CandleFeed("KRW-BTC", capacity=20, fetcher=lambda s, n: _bars(0, [10, 12, 8, 11, 9, 7]))
+    feed.backfill()
+    five = feed.bars(2, timeframe=5)
+    assert [b["timestamp"] for b in five] == [0, 300]
+    assert five[0]["open"] == 10 and five[0]["high"] == 12 and five[0]["low"] == 8
+    assert five[0]["close"] == 9 and five[0]["volume"] == 5.0
+    assert five[1]["close"] == 7
+    feed.streaming = True
+    # trades update the live 1m bar and the 5m bar built on top of it
+    feed.on_trade(15, 0.5, 330)
+    feed.on_trade(6, 0.5, 360)
+    bar = feed.bars(1, timeframe=5)[0]
+    assert bar["open"] == 7 and bar["high"] == 15 and bar["low"] == 6 and bar["close"] == 6
+    assert bar["volume"] == 2.0
+    assert feed.timeframe_closes(2)[5] == [9, 6]
+    assert feed.timeframe_closes(1)[60] == [6]
+
+
+def test_closed_stream_bars_are_recorded(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    import market_recorder
+    from market_recorder import MarketRecorder, load_records
+
+    rec = MarketRecorder(tmp_path)
+    monkeypatch.setattr(market_recorder, "_recorder", rec)
+    feed = CandleFeed("KRW-BTC", capacity=10, fetcher=lambda s, n: [])
+    feed._backfilled = True
+    feed.streaming = True
+    feed.on_trade(100, 1.0, 0)
+    feed.on_trade(102, 1.0, 30)
+    feed.on_trade(101, 2.0, 60)
+    # the live bar is not recorded until a trade closes it
+    rec.flush()
+    candles = load_records("candle", "KRW-BTC", 0, 600_000, root=tmp_path)
+    assert list(candles["ts"]) == [0]
+    assert candles["high"][0] == 102 and candles["close"][0] == 102 and candles["volume"][0] == 2.0
+    # the bar before a gap is recorded; bars closed while repair is pending are left to REST
+    feed.on_trade(105, 1.0, 240)
+    feed.on_trade(106, 1.0, 300)
+    rec.flush()
+    candles = load_records("candle", "KRW-BTC", 0, 600_000, root=tmp_path)
+    assert list(candles["ts"]) == [0, 60_000]
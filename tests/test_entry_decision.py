@@ -69,3 +69,31 @@ def test_conflict_index_detection():
     ci = agent.last_conflict["conflict_index"]
     assert ci >= 0.5
 
+
+def test_evaluate_all_matches_single_evaluations():
+    chart = [100] * 20 + [100.5, 100, 100.4, 99.8, 100.2]
+    order_book = {
+        "bids": [{"price": 100, "volume": 2}] * 10,
+        "asks": [{"price": 99, "volume": 1}] * 10,
+    }
+    status = {"has_position": True, "return_rate": 0.06}
+    decisions = EntryDecisionAgent().evaluate_all(chart, status, order_book, selected="momentum")
+    assert set(decisions) == {"reversal", "swing", "trend_follow", "momentum", "take_profit", "orderbook_weighted"}
+    for name, decision in decisions.items():
+        agent = EntryDecisionAgent()
+        result = agent.evaluate(name, chart, status, order_book)
+        signal = result["signal"] if isinstance(result, dict) else result
+        assert decision["signal"] == signal
+        assert decision["score_percent"] == agent.last_score_percent
+        assert decision["conflict_index"] == agent.last_conflict["conflict_index"]
+
+
+def test_evaluate_all_records_only_selected():
+    agent = EntryDecisionAgent()
+    chart = [1] * 21 + [2] * 5
+    agent.evaluate_all(chart, None, selected="reversal")
+    assert [s for _, s in agent.decision_history] == ["HOLD"]
+    single = EntryDecisionAgent()
+    single.evaluate("reversal", chart, None)
+    # weights are tuned once per tick, not once per strategy
+    assert agent.scorer.weights == single.scorer.weights
@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("psutil")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from replay import ReplayEngine, synthetic_bars
+from market_snapshot import MarketSnapshot, freeze_order_book
+
+
+def _snapshot(bars, bid=1.0, ask=1.0):
+    return MarketSnapshot(
+        "KRW-BTC",
+        0.0,
+        tuple(b["close"] for b in bars),
+        freeze_order_book({"bids": [], "asks": [], "bid_volume": bid, "ask_volume": ask}),
+        bar_times=tuple(b["timestamp"] for b in bars),
+    )
+
+
+@pytest.fixture
+def app(tmp_path):
+    engine = ReplayEngine(synthetic_bars(30), work_dir=tmp_path)
+    app = engine._build_app()
+    app.heartbeat = 30
+    app.imbalance_delta = 0.1
+    return app
+
+
+def test_unchanged_inputs_are_skipped_until_heartbeat(app, monkeypatch):
+    monkeypatch.setattr("main.track_failed_hold", lambda *a, **k: None)
+    bars = synthetic_bars(25)
+    assert app.step(_snapshot(bars[:20]), now=0) == "start"
+    assert app.step(_snapshot(bars[:20]), now=2) is None
+    # a small imbalance move is not material
+    assert app.step(_snapshot(bars[:20], bid=1.05, ask=1.0), now=4) is None
+    assert app.step(_snapshot(bars[:20], bid=2.0, ask=1.0), now=6) == "orderbook"
+    assert app.step(_snapshot(bars[1:21], bid=2.0, ask=1.0), now=8) == "new_bar"
+    assert app.step(_snapshot(bars[1:21], bid=2.0, ask=1.0), now=40) == "heartbeat"
+    assert app.eval_stats == {"evaluated": 4, "skipped": 2}
+
+
+def test_stream_events_wake_the_loop(app):
+    app._last_bar = 120
+    app._on_market_event({"type": "trade", "trade_price": 1, "trade_timestamp": 150_000})
+    assert not app._wake.is_set()
+    app._on_market_event({"type": "trade", "trade_price": 1, "trade_timestamp": 181_000})
+    assert app._wake.is_set()
+    app._wake.clear()
+    app.order_book.apply_units([{"bid_price": 99, "bid_size": 5, "ask_price": 101, "ask_size": 1}])
+    app._on_market_event({"type": "orderbook", "code": "KRW-BTC"})
+    assert app._wake.is_set()
+
+
+def test_events_during_a_step_wake_the_next_wait(app, monkeypatch):
+    stop = threading.Event()
+    woken = []
+    fetches = []
+
+    class Wake(threading.Event):
+        def wait(self, timeout=None):
+            woken.append(self.is_set())
+            return True
+
+    def fetch():
+        fetches.append(app._wake.is_set())
+        if len(fetches) == 2:
+            stop.set()
+        return _snapshot(synthetic_bars(20))
+
+    app._wake = Wake()
+    app._wake.set()
+    app.candle_feed.streaming = True
+    monkeypatch.setattr(app, "fetch_snapshot", fetch)
+    monkeypatch.setattr(app, "step", lambda snap: app._on_market_event({"type": "reconnect"}))
+    app.run(stop=stop)
+    assert fetches == [False, False]
+    assert woken == [True, True]
+
+
+def test_loop_logs_shadow_decisions(app, monkeypatch):
+    monkeypatch.setattr("main.track_failed_hold", lambda *a, **k: None)
+    app.shadow_strategies = True
+    app.step(_snapshot(synthetic_bars(25)), now=0)
+    events = [e for e in app.logger.events if e["type"] == "shadow_decisions"]
+    assert len(events) == 1
+    event = events[0]
+    assert event["selected"] not in event["decisions"]
+    assert all(signal in ("BUY", "SELL", "HOLD") for signal, *_ in event["decisions"].values())
+
+
+def test_status_reads_streamed_book_totals(app):
+    from main import publish_market_state
+    from status_server import state_store
+
+    snapshot = _snapshot(synthetic_bars(20), bid=3.0, ask=1.0)
+    publish_market_state(app, snapshot)
+    assert state_store["orderbook_imbalance"] == pytest.approx(0.5)
+    assert state_store["bid_volume"] == 3.0
+
+    app.order_book.apply_units([
+        {"bid_price": 99, "bid_size": 5, "ask_price": 101, "ask_size": 1},
+        {"bid_price": 98, "bid_size": 1, "ask_price": 102, "ask_size": 2},
+    ])
+    publish_market_state(app, snapshot)
+    assert state_store["bid_volume"] == 6 and state_store["ask_volume"] == 3
+    assert state_store["orderbook_imbalance"] == pytest.approx(3 / 9)
+    assert state_store["bids"] == [[99, 5], [98, 1]]
+    assert state_store["asks"] == [[101, 1], [102, 2]]
+
+
+def test_stop_loss_exits_reach_performance_with_excursions(app, monkeypatch):
+    monkeypatch.setattr("main.track_failed_hold", lambda *a, **k: None)
+    app.shadow_strategies = False
+    monkeypatch.setattr(app.entry_agent, "evaluate", lambda *a, **k: "HOLD")
+    bars = synthetic_bars(21)
+    price = bars[19]["close"]
+    entry = price / 1.01
+    app.positions.append({"entry_price": entry, "quantity": 1.0, "symbol": "KRW-BTC"})
+    app.loop(_snapshot(bars[:20]))
+    assert app.positions and app.positions[0]["max_profit"] == pytest.approx(0.01)
+    drop = dict(bars[20], close=entry * 0.97)
+    app.loop(_snapshot(bars[1:20] + [drop]))
+    assert not app.positions
+    metrics = app.performance.metrics()
+    assert app.performance.count == 1
+    assert metrics["total_return"] == pytest.approx(-0.03)
+    assert metrics["avg_mfe"] == pytest.approx(0.01)
+    assert metrics["avg_mae"] == pytest.approx(-0.03)
+    assert app.trade_history[-1]["return"] == pytest.approx(-0.03)
@@ -0,0 +1,101 @@
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from agents.strategy_generator import StrategyGenerator, canonical_conditions
+from genome_store import GenomeStore
+
+
+def _population(n=30, seed=2):
+    gen = StrategyGenerator(seed=seed)
+    return [gen.create_strategy() for _ in range(n)]
+
+
+def test_dict_round_trip(tmp_path):
+    population = _population()
+    store = GenomeStore.from_dicts(population)
+    assert store.to_dicts() == population
+    assert store.next_id == 30
+
+    path = tmp_path / "strategies.json"
+    gen = StrategyGenerator()
+    gen.generated = population
+    gen.save(path)
+    assert GenomeStore.load(path).to_dicts() == population
+    store.save(path)
+    assert gen.load(path) == population
+
+
+def test_mutate_changes_one_condition():
+    store = GenomeStore.from_dicts(_population(), seed=0)
+    parents = np.arange(len(store))
+    children = store.mutate(parents)
+    assert (children["id"] >= 30).all()
+    before = store.to_dicts()
+    store.data = children
+    after = store.to_dicts()
+    for old, new in zip(before, after):
+        changed = [(a, b) for a, b in zip(old["conditions"], new["conditions"]) if a != b]
+        assert len(old["conditions"]) == len(new["conditions"])
+        assert len(changed) <= 1
+        for a, b in changed:
+            assert a["type"] == b["type"]
+            if a["type"] == "MA":
+                assert abs(a["period"] - b["period"]) == 5 or b["period"] == 2
+            elif a["type"] == "RSI":
+                assert abs(a["level"] - b["level"]) == 5
+            else:
+                assert abs(a["signal"] - b["signal"]) == 1
+
+
+def test_crossover_joins_prefix_and_suffix():
+    population = _population(40, seed=4)
+    store = GenomeStore.from_dicts(population, seed=1)
+    a = np.arange(20)
+    b = np.arange(20, 40)
+    children = store.crossover(a, b)
+    view = GenomeStore(max_conditions=store.max_conditions)
+    view.data = children
+    for i, child in enumerate(view.to_dicts()):
+        conds = child["conditions"]
+        assert 1 <= len(conds) <= store.max_conditions
+        pa = population[a[i]]["conditions"]
+        pb = population[b[i]]["conditions"]
+        joined = any(
+            conds == (pa[:i1] + pb[i2:])[: store.max_conditions]
+            for i1 in range(len(pa) + 1)
+            for i2 in range(len(pb) + 1)
+        )
+        # empty crossovers fall back to a mutation of a parent
+        assert joined or len(conds) in (len(pa), len(pb))
+
+
+def test_evolve_keeps_size_and_valid_genomes():
+    store = GenomeStore(seed=3).randomize(10_000)
+    assert store.nbytes < 100 * len(store)
+    performance = np.random.default_rng(0).random(len(store))
+    store.evolve(performance)
+    assert len(store) == 10_000
+    assert len(set(store.data["id"].tolist())) == 10_000
+    for strat in store.to_dicts(range(200)):
+        assert strat["conditions"]
+        canonical_conditions(strat["conditions"])
+
+
+def test_evolved_genomes_round_trip_without_truncation(tmp_path):
+    gen = StrategyGenerator(seed=3)
+    population = _population(40, seed=3)
+    for _ in range(10):
+        population = gen.evolve(population, [float(len(s["conditions"])) for s in population])
+    assert max(len(s["conditions"]) for s in population) > 6
+    store = GenomeStore.from_dicts(population)
+    assert store.to_dicts() == population
+    path = tmp_path / "strategies.json"
+    store.save(path)
+    assert GenomeStore.load(path).to_dicts() == population
+    with pytest.raises(ValueError):
+        GenomeStore.from_dicts(population, max_conditions=6)
@@ -0,0 +1,151 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from agents.indicators import IndicatorEngine, RSI
+from agents.entry_decision import EntryDecisionAgent
+from agents.market_sentiment import MarketSentimentAgent
+
+
+def _walk(n, seed=0):
+    rng = random.Random(seed)
+    price = 100.0
+    out = []
+    for _ in range(n):
+        price += rng.choice([-1, 0, 1]) * rng.random()
+        out.append(round(price, 2))
+    return out
+
+
+def _stream(engine, series, window):
+    """Feed ``series`` bar by bar with a few live updates per bar."""
+    rng = random.Random(1)
+    for i, close in enumerate(series):
+        times = list(range(max(0, i - window + 1) * 60, (i + 1) * 60, 60))
+        closes = list(series[max(0, i - window + 1):i + 1])
+        for _ in range(2):
+            live = closes[:-1] + [closes[-1] + rng.uniform(-1, 1)]
+            engine.sync(live, times)
+        engine.sync(closes, times)
+        yield closes
+
+
+def test_engine_matches_list_computations():
+    agent = EntryDecisionAgent()
+    sentiment = MarketSentimentAgent()
+    engine = IndicatorEngine()
+    for closes in _stream(engine, _walk(200), 40):
+        n = len(closes)
+        if n >= 20:
+            mean, std = engine.mean_std(20)
+            ref = sum(closes[-20:]) / 20
+            assert abs(mean - ref) < 1e-9
+            assert abs(std - (sum((c - ref) ** 2 for c in closes[-20:]) / 20) ** 0.5) < 1e-9
+            assert abs(engine.sma(10) - sum(closes[-10:]) / 10) < 1e-9
+        if n >= 35:
+            assert abs(engine.sma(34) - sum(closes[-34:]) / 34) < 1e-9
+            assert abs(engine.sma(20, prev=True) - sum(closes[-21:-1]) / 20) < 1e-9
+        assert abs(engine.rsi(14) - agent._calc_rsi(closes)) < 1e-9
+        assert abs(engine.rsi(14, prev=True) - agent._calc_rsi(closes[:-1])) < 1e-9
+        assert abs(engine.rsi(20) - sentiment.calc_rsi(closes, period=20)) < 1e-9
+        history = RSI.from_history(closes, 14)
+        assert abs(history.value - agent._calc_rsi(closes)) < 1e-9
+        assert abs(history.prev - agent._calc_rsi(closes[:-1])) < 1e-9
+
+
+def test_sync_without_times_rebuilds():
+    engine = IndicatorEngine()
+    engine.sync([1, 2, 3, 4, 5])
+    engine.sync([2, 3, 4, 5, 6])
+    assert list(engine.closes) == [2, 3, 4, 5, 6]
+    assert engine.sma(5) == 4
+
+
+def test_wilder_rsi_replace_last_matches_push():
+    closes = _walk(60, seed=3)
+    a = RSI(14, "wilder")
+    b = RSI(14, "wilder")
+    for c in closes:
+        a.push(c)
+        b.push(c + 5)
+        b.replace_last(c)
+    assert abs(a.value - b.value) < 1e-9
+
+
+def test_agents_agree_with_and_without_engine():
+    closes = _walk(60, seed=7)[-40:]
+    engine = IndicatorEngine()
+    engine.sync(closes, list(range(0, 40 * 60, 60)))
+    book = {"bid_volume": 2.0, "ask_volume": 1.0}
+    plain = EntryDecisionAgent(adjuster=None)
+    fast = EntryDecisionAgent(adjuster=None)
+    fast.scorer = plain.scorer
+    r1 = plain.evaluate(("momentum", {}), closes, {}, book)
+    r2 = fast.evaluate(("momentum", {}), closes, {}, book, indicators=engine)
+    assert r1 == r2
+
+
+def test_streaming_macd_matches_batch_and_seeding():
+    np = __import__("pytest").importorskip("numpy")
+    import batch_indicators as bi
+
+    series = _walk(300, seed=11)
+    engine = IndicatorEngine(capacity=500)
+    hist = []
+    for closes in _stream(engine, series, 20):
+        hist.append(engine.macd_histogram())
+    expected = bi.macd_histogram(series)
+    assert np.allclose(hist, expected, rtol=1e-9, atol=1e-9)
+
+    seeded = IndicatorEngine(capacity=500)
+    seeded.reset(series[:250], list(range(0, 250 * 60, 60)))
+    seeded.sync(series[230:260], list(range(230 * 60, 260 * 60, 60)))
+    assert abs(seeded.macd_histogram() - expected[259]) < 1e-9
+
+
+def test_feature_cache_reuses_candle_features_within_a_bar():
+    from agents.features import FeatureCache, candle_features
+
+    closes = _walk(40, seed=5)
+    times = list(range(0, 40 * 60, 60))
+    engine = IndicatorEngine()
+    cache = FeatureCache("KRW-BTC", engine)
+    engine.sync(closes, times)
+    first = cache.get(closes, {"bid_volume": 1, "ask_volume": 2, "version": 1}, times)
+    second = cache.get(closes, {"bid_volume": 3, "ask_volume": 1, "version": 2}, times)
+    assert second.candle is first.candle
+    assert second.book.bid_volume == 3 and second.book.imbalance == 0.5
+    assert cache.hits == 1 and cache.misses == 1
+    live = closes[:-1] + [closes[-1] + 1]
+    engine.sync(live, times)
+    third = cache.get(live, None, times)
+    assert third.candle is not first.candle and not third.book.present
+    # engine-backed and list-backed features agree
+    plain = candle_features(live)
+    assert abs(third.candle.rsi - plain.rsi) < 1e-9
+    assert abs(third.candle.rsi_prev - plain.rsi_prev) < 1e-9
+    assert abs(third.candle.rsi20 - plain.rsi20) < 1e-9
+    assert abs(third.candle.macd_hist - plain.macd_hist) < 1e-9
+    assert third.candle.bb_score == plain.bb_score
+
+
+def test_gap_reseeds_from_history_instead_of_window():
+    np = __import__("pytest").importorskip("numpy")
+    import batch_indicators as bi
+
+    series = _walk(260, seed=13)
+    times = list(range(0, 260 * 60, 60))
+    engine = IndicatorEngine(capacity=200)
+    engine.reset(series[:200], times[:200])
+    engine.macd_histogram()
+    # after a repair the next window skips ahead of the stored series
+    window, window_times = series[220:240], times[220:240]
+    engine.sync(window, window_times, history=lambda: (times[40:241], series[40:241]))
+    assert len(engine) == 200
+    assert engine.window == 20
+    assert list(engine.closes)[-20:] == window
+    assert abs(engine.macd_histogram() - bi.macd_histogram(series[40:240])[-1]) < 1e-9
+    # without usable history the window alone is used
+    engine.sync(series[240:260], times[240:260], history=lambda: ([], []))
+    assert len(engine) == 20
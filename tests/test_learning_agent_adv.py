@@ -15,3 +15,41 @@ def test_learning_agent_update(tmp_path):
     assert 's1' in weights
     assert weights['s1'] > 0
 
+
+def test_learning_agent_journal_replay(tmp_path):
+    state = tmp_path / 'state.json'
+    agent = LearningAgent(state_path=state, snapshot_every=3600)
+    agent.adjust_from_signal('s1', 80, 0.5)
+    agent.record_trade('s1', 0.02, market_phase='TREND')
+    # changes only reach the journal until a snapshot is due
+    assert not state.exists()
+    assert len(agent.journal_path.read_text(encoding='utf-8').splitlines()) == 2
+
+    restored = LearningAgent(state_path=state)
+    assert restored.weights == agent.weights
+    assert restored.history == agent.history
+
+    agent.snapshot()
+    assert agent.journal_path.read_text(encoding='utf-8') == ''
+    agent.adjust_from_signal('s2', 50, None)
+    # a stale journal line left by a crash before truncation is skipped
+    with open(agent.journal_path, 'a', encoding='utf-8') as f:
+        f.write('{"seq":1,"trade":{"strategy":"s1"}}\n{"seq":9')
+    restored = LearningAgent(state_path=state)
+    assert restored.weights == agent.weights
+    assert len(restored.history) == 1
+    assert restored.seq == agent.seq
+    # the torn tail is dropped, so entries written after the crash survive
+    restored.record_trade('s2', 0.01)
+    again = LearningAgent(state_path=state)
+    assert len(again.history) == 2
+    assert again.seq == restored.seq
+
+
+def test_learning_agent_snapshot_schedule(tmp_path):
+    state = tmp_path / 'state.json'
+    agent = LearningAgent(state_path=state, snapshot_every=0)
+    agent.adjust_from_signal('s1', 100, 1.0)
+    assert state.exists()
+    assert agent.journal_path.read_text(encoding='utf-8') == ''
+    assert LearningAgent(state_path=state).weights == {'s1': 1.01}
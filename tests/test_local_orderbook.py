@@ -0,0 +1,57 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from local_orderbook import LocalOrderBook
+from agents.entry_decision import EntryDecisionAgent
+
+
+def _units(levels):
+    return [
+        {"bid_price": bp, "bid_size": bs, "ask_price": ap, "ask_size": as_}
+        for bp, bs, ap, as_ in levels
+    ]
+
+
+def test_running_totals_match_full_sum():
+    rng = random.Random(1)
+    book = LocalOrderBook("KRW-BTC", depth=5)
+    for _ in range(200):
+        levels = [
+            (100 - i - rng.randint(0, 2), rng.random(), 101 + i + rng.randint(0, 2), rng.random())
+            for i in range(8)
+        ]
+        book.on_message({"type": "orderbook", "code": "KRW-BTC", "orderbook_units": _units(levels)})
+        top = levels[:5]
+        bids = {}
+        asks = {}
+        for bp, bs, ap, as_ in top:
+            bids[bp] = bs
+            asks[ap] = as_
+        assert book.bid_volume == pytest.approx(sum(bids.values()))
+        assert book.ask_notional == pytest.approx(sum(p * s for p, s in asks.items()))
+    assert book.version == 200
+    assert book.ready
+
+
+def test_ignores_other_markets_and_trades():
+    book = LocalOrderBook("KRW-BTC")
+    book.on_message({"type": "orderbook", "code": "KRW-ETH", "orderbook_units": _units([(1, 1, 2, 1)])})
+    book.on_message({"type": "trade", "code": "KRW-BTC", "trade_price": 1})
+    assert book.version == 0
+    assert not book.ready
+
+
+def test_entry_agent_uses_precomputed_strength():
+    book = LocalOrderBook("KRW-BTC")
+    book.apply_units(_units([(100, 2, 99, 1)] * 10))
+    agent = EntryDecisionAgent()
+    snapshot = book.to_dict()
+    expected = agent.normalize_orderbook_strength(snapshot["bids"], snapshot["asks"])
+    assert book.strength() == pytest.approx(expected)
+    res = agent.evaluate(("orderbook_weighted", {}), [1] * 25, None, snapshot)
+    assert res["confidence"] == pytest.approx(expected)
+    assert res["signal"] == "BUY"
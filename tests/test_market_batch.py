@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from agents import utils
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def get(self, path, params=None):
+        markets = params["markets"].split(",")
+        self.calls.append((path, markets))
+        return [
+            {
+                "market": m,
+                "orderbook_units": [{"bid_price": 1, "bid_size": 2, "ask_price": 3, "ask_size": 4}],
+            }
+            for m in markets
+        ]
+
+
+def test_orderbooks_batched_per_request(monkeypatch):
+    client = FakeClient()
+    monkeypatch.setattr(utils, "get_client", lambda: client)
+    symbols = [f"KRW-C{i}" for i in range(120)]
+    books = utils.get_upbit_orderbooks(symbols)
+    assert len(client.calls) == 3
+    assert set(books) == set(symbols)
+    assert books["KRW-C7"]["bid_volume"] == 2
+    assert books["KRW-C7"]["asks"] == [{"price": 3, "volume": 4}]
@@ -0,0 +1,63 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from market_recorder import MarketRecorder, load_records, DAY_MS
+
+
+def test_trades_round_trip_across_days(tmp_path):
+    rec = MarketRecorder(tmp_path, batch_size=4)
+    base = 20_000 * DAY_MS
+    stamps = [base - 120_000 + i * 30_000 for i in range(10)]
+    for i, ts in enumerate(stamps):
+        rec.record_trade("KRW-BTC", ts, 100 + i, 0.1, 1)
+    rec.flush()
+
+    day_files = sorted(p.name for p in (tmp_path / "trade" / "KRW-BTC").glob("*.bin"))
+    assert len(day_files) == 2
+
+    rows = load_records("trade", "KRW-BTC", stamps[2], stamps[7], root=tmp_path)
+    assert list(rows["price"]) == [102, 103, 104, 105, 106]
+
+    same_day = load_records("trade", "KRW-BTC", base, base + 60_000, root=tmp_path)
+    assert isinstance(same_day.base, np.memmap) or isinstance(same_day, np.memmap)
+    assert list(same_day["ts"]) == [base, base + 30_000]
+
+
+def test_candles_deduplicated_and_orderbook_levels(tmp_path):
+    rec = MarketRecorder(tmp_path)
+    bars = [{"timestamp": 60 * i, "open": i, "high": i, "low": i, "close": i, "volume": 1} for i in range(5)]
+    rec.record_candles("KRW-BTC", bars[:3])
+    rec.record_candles("KRW-BTC", bars)
+    units = [{"bid_price": 10 - i, "bid_size": 1, "ask_price": 11 + i, "ask_size": 2} for i in range(15)]
+    rec.record_orderbook("KRW-BTC", 1_000, units)
+    rec.flush()
+    candles = load_records("candle", "KRW-BTC", 0, 10 * 60_000, root=tmp_path)
+    assert list(candles["close"]) == [0, 1, 2, 3, 4]
+    book = load_records("orderbook", "KRW-BTC", 0, 2_000, root=tmp_path)
+    assert book["bid_price"][0][0] == 10
+    assert book["ask_size"][0].sum() == 20
+
+
+def test_concurrent_candle_recording_stays_sorted(tmp_path):
+    import threading
+
+    rec = MarketRecorder(tmp_path, batch_size=8)
+    bars = [{"timestamp": 60 * i, "open": i, "high": i, "low": i, "close": i, "volume": 1} for i in range(400)]
+    start = threading.Barrier(4)
+
+    def writer(offset):
+        start.wait()
+        for i in range(offset, len(bars), 3):
+            rec.record_candles("KRW-BTC", bars[max(0, i - 5): i + 1])
+
+    threads = [threading.Thread(target=writer, args=(k,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    rec.flush()
+    ts = load_records("candle", "KRW-BTC", 0, 400 * 60_000, root=tmp_path)["ts"]
+    assert (np.diff(ts) > 0).all()
@@ -24,3 +24,14 @@ def test_calc_rsi_general_case():
     closes = [1, 2, 3, 4, 5, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 13, 14, 15, 16, 17]
     rsi = agent.calc_rsi(closes, period=20)
     assert math.isclose(rsi, 90.0, abs_tol=1e-6)
+
+
+def test_update_accepts_frozen_order_book(tmp_path):
+    from market_snapshot import freeze_order_book
+
+    closes = [100 + (i % 3) for i in range(30)]
+    book = {'bid_volume': 90.0, 'ask_volume': 10.0, 'bids': [{'price': 100, 'volume': 90.0}]}
+    ma_path = tmp_path / 'emotion_MA.json'
+    expected = MarketSentimentAgent(ma_path).update(closes, book)
+    assert expected == 'GREED'
+    assert MarketSentimentAgent(ma_path).update(closes, freeze_order_book(book)) == expected
@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from market_snapshot import SnapshotFetcher
+from agents.entry_decision import EntryDecisionAgent
+
+
+def _slow_candles(count):
+    time.sleep(0.2)
+    return [1] * 21 + [2] * 5
+
+
+def _slow_orderbook(symbol):
+    time.sleep(0.2)
+    return {
+        "bids": [{"price": 100, "volume": 2}] * 10,
+        "asks": [{"price": 99, "volume": 0}] * 10,
+        "bid_volume": 20,
+        "ask_volume": 0,
+    }
+
+
+def test_sources_fetched_concurrently():
+    fetcher = SnapshotFetcher("KRW-BTC", _slow_candles, _slow_orderbook, candle_count=26)
+    start = time.perf_counter()
+    snap = fetcher.fetch()
+    assert time.perf_counter() - start < 0.35
+    assert snap.price == 2
+    assert snap.bid_levels() == [[100, 2]] * 10
+    assert snap.ask_levels() == []
+    fetcher.close()
+
+
+def test_snapshot_is_read_only_and_usable_by_agents():
+    fetcher = SnapshotFetcher("KRW-BTC", _slow_candles, _slow_orderbook)
+    snap = fetcher.fetch()
+    with pytest.raises(TypeError):
+        snap.order_book["bid_volume"] = 0
+    with pytest.raises(AttributeError):
+        snap.closes.append(3)
+    res = EntryDecisionAgent().evaluate(("orderbook_weighted", {}), snap.closes, None, snap.order_book)
+    assert res["signal"] == "BUY"
+    fetcher.close()
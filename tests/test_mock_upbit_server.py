@@ -0,0 +1,113 @@
+import base64
+import json
+import os
+import socket
+import struct
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import datetime, timezone
+
+from mock_upbit_server import FaultConfig, _candle_row, start_mock_server
+from price_feed_upbit_ws import decode_message
+
+
+@pytest.fixture
+def server():
+    srv = start_mock_server(["KRW-BTC", "KRW-ETH"], rate=200)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=5) as resp:
+        return resp.status, resp.headers, json.loads(resp.read())
+
+
+def test_rest_endpoints_match_upbit_shapes(server):
+    status, headers, candles = _get(f"{server.url}/v1/candles/minutes/1?market=KRW-BTC&count=20")
+    assert status == 200 and len(candles) == 20
+    assert "Remaining-Req" in headers
+    # newest first, like Upbit
+    assert candles[0]["candle_date_time_utc"] > candles[-1]["candle_date_time_utc"]
+    _, _, books = _get(f"{server.url}/v1/orderbook?markets=KRW-BTC,KRW-ETH")
+    assert [b["market"] for b in books] == ["KRW-BTC", "KRW-ETH"]
+    assert len(books[0]["orderbook_units"]) == 15
+    _, _, tickers = _get(f"{server.url}/v1/ticker?markets=KRW-ETH")
+    assert tickers[0]["trade_price"] > 0
+    _, _, markets = _get(f"{server.url}/v1/market/all")
+    assert {m["market"] for m in markets} == {"KRW-BTC", "KRW-ETH"}
+
+
+@pytest.mark.skipif(not hasattr(time, "tzset"), reason="needs time.tzset")
+def test_candle_timestamp_is_utc_regardless_of_local_zone(monkeypatch):
+    monkeypatch.setenv("TZ", "Asia/Seoul")
+    time.tzset()
+    try:
+        row = _candle_row("KRW-BTC", datetime(2024, 1, 1, 0, 0), 1, 1, 1, 1, 1)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+    expected = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp() * 1000
+    assert row["timestamp"] == int(expected)
+
+
+def test_injected_429():
+    srv = start_mock_server(["KRW-BTC"], faults=FaultConfig(error_rate=1.0))
+    try:
+        with pytest.raises(urllib.error.HTTPError) as exc:
+            _get(f"{srv.url}/v1/ticker?markets=KRW-BTC")
+        assert exc.value.code == 429
+        assert srv.counters["rest_429"] == 1
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def _read_frame(sock):
+    def exact(n):
+        data = b""
+        while len(data) < n:
+            chunk = sock.recv(n - len(data))
+            assert chunk
+            data += chunk
+        return data
+
+    b1, b2 = exact(2)
+    length = b2 & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", exact(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", exact(8))[0]
+    return b1 & 0x0F, exact(length)
+
+
+def test_websocket_streams_subscribed_messages(server):
+    host, port = server.server_address[:2]
+    sock = socket.create_connection((host, port), timeout=5)
+    key = base64.b64encode(os.urandom(16)).decode()
+    sock.sendall(
+        (
+            "GET /websocket/v1 HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode()
+    )
+    response = b""
+    while b"\r\n\r\n" not in response:
+        response += sock.recv(1)
+    assert b" 101 " in response
+    payload = json.dumps([{"ticket": "t"}, {"type": "trade", "codes": ["KRW-ETH"]}]).encode()
+    mask = os.urandom(4)
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    sock.sendall(bytes([0x81, 0x80 | len(payload)]) + mask + masked)
+    records = [decode_message(_read_frame(sock)[1]) for _ in range(5)]
+    sock.close()
+    assert all(r["type"] == "trade" and r["code"] == "KRW-ETH" for r in records)
@@ -0,0 +1,94 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("psutil")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import multi_market
+from replay import ReplayLearningAgent, ReplayLogger, synthetic_bars
+
+
+class FakeMarket:
+    """Ticker and orderbook fetchers driven by per-symbol bar lists."""
+
+    def __init__(self, bars):
+        self.bars = bars
+        self.index = {s: 0 for s in bars}
+        self.volumes = {s: (1.0, 1.0) for s in bars}
+        self.requests = []
+
+    def tickers(self, symbols):
+        self.requests.append(("ticker", list(symbols)))
+        return {
+            s: {
+                "trade_price": self.bars[s][self.index[s]]["close"],
+                "trade_timestamp": self.bars[s][self.index[s]]["timestamp"] * 1000,
+            }
+            for s in symbols
+        }
+
+    def orderbooks(self, symbols):
+        self.requests.append(("orderbook", list(symbols)))
+        return {
+            s: {"bids": [], "asks": [], "bid_volume": self.volumes[s][0], "ask_volume": self.volumes[s][1]}
+            for s in symbols
+        }
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr("main.track_failed_hold", lambda *a, **k: None)
+    monkeypatch.setattr(multi_market, "LOG_BASE_DIR", tmp_path)
+    monkeypatch.setattr(multi_market, "LoggerAgent", lambda: ReplayLogger(tmp_path / "log"))
+    monkeypatch.setattr(multi_market, "LearningAgent", lambda: ReplayLearningAgent(tmp_path / "state.json"))
+    bars = {
+        "KRW-A": synthetic_bars(30, seed=1),
+        "KRW-B": synthetic_bars(30, price=1000.0, seed=2),
+    }
+    market = FakeMarket(bars)
+    engine = multi_market.MultiMarketEngine(
+        list(bars), orderbook_fetcher=market.orderbooks, ticker_fetcher=market.tickers
+    )
+    for symbol, app in engine.apps.items():
+        for bar in bars[symbol][:25]:
+            app.candle_feed.on_trade(bar["close"], bar["volume"], bar["timestamp"])
+        app.candle_feed.streaming = True
+        app.candle_feed._backfilled = True
+        app.heartbeat = 30
+        app.imbalance_delta = 0.1
+    market.index = {s: 24 for s in bars}
+    engine.market = market
+    return engine
+
+
+def test_markets_keep_independent_state(engine):
+    assert engine.tick() == ["KRW-A", "KRW-B"]
+    a, b = engine.apps["KRW-A"], engine.apps["KRW-B"]
+    assert a.current_price == engine.market.bars["KRW-A"][24]["close"]
+    assert b.current_price == engine.market.bars["KRW-B"][24]["close"]
+    assert a.positions is not b.positions
+    assert a.entry_agent is not b.entry_agent
+    assert a.position_manager is b.position_manager
+
+    a.positions.append({"entry_price": a.current_price, "quantity": 1.0})
+    summary = engine.summary()
+    assert summary["KRW-A"]["positions"] == 1
+    assert summary["KRW-B"]["positions"] == 0
+    # one batched request per data type and tick
+    assert engine.market.requests == [("ticker", ["KRW-A", "KRW-B"]), ("orderbook", ["KRW-A", "KRW-B"])]
+
+
+def test_unchanged_markets_are_skipped(engine):
+    market = engine.market
+    assert engine.tick() == ["KRW-A", "KRW-B"]
+    # REST volumes jitter on every poll without a material imbalance move
+    market.volumes["KRW-A"] = (1.02, 0.99)
+    market.index["KRW-B"] += 1
+    assert engine.tick() == ["KRW-B"]
+    market.volumes["KRW-A"] = (3.0, 1.0)
+    assert engine.tick() == ["KRW-A"]
+    assert engine.tick() == []
+    assert engine.apps["KRW-A"].eval_stats == {"evaluated": 2, "skipped": 2}
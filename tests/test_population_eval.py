@@ -0,0 +1,78 @@
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from agents.strategy_generator import StrategyGenerator
+from population_eval import PopulationEvaluator, simulate_trades
+
+
+def _walk(n, seed=11):
+    rng = random.Random(seed)
+    price = 100.0
+    out = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.01)
+        out.append(price)
+    return out
+
+
+def test_simulate_trades_exits_on_mask_or_thresholds():
+    closes = np.array([100, 101, 102, 104, 104, 100, 99, 98.5, 98, 99], dtype=float)
+    mask = np.array([1, 1, 1, 1, 1, 1, 1, 1, 0, 0], dtype=bool)
+    returns, trades = simulate_trades(mask, closes)
+    # +4% take profit at bar 3, re-entry at bar 4 stopped out at bar 5,
+    # re-entry at bar 6 closed when the mask turns off at bar 8
+    assert returns == pytest.approx([0.04, 100 / 104 - 1, 98 / 99 - 1])
+    assert trades[1]["max_profit"] == 0.0
+    assert trades[1]["max_loss"] == pytest.approx(100 / 104 - 1)
+
+
+def test_parallel_matches_in_process():
+    closes = _walk(1500)
+    gen = StrategyGenerator(seed=3)
+    population = [gen.create_strategy() for _ in range(40)]
+    serial = PopulationEvaluator(closes, workers=0).evaluate(population)
+    with PopulationEvaluator(closes, workers=2, chunk_size=8, min_parallel=1) as engine:
+        parallel = engine.evaluate(population)
+        assert engine._shm is not None
+    assert engine._shm is None
+    # chunks are scored as separate batches, so sums may differ in the last bit
+    assert len(parallel) == len(serial)
+    for p, s in zip(parallel, serial):
+        assert p == pytest.approx(s)
+    assert any(m["trades"] for m in serial)
+
+
+def test_evolve_uses_metrics():
+    closes = _walk(600)
+    gen = StrategyGenerator(seed=4)
+    population = [gen.create_strategy() for _ in range(10)]
+    engine = PopulationEvaluator(closes, workers=0)
+    children, metrics = engine.evolve(gen, population, fitness=lambda m: m["total_return"])
+    assert len(children) == len(metrics) == 10
+    assert set(metrics[0]) >= {"total_return", "max_drawdown", "sqn", "trades"}
+
+
+def test_cached_genomes_are_not_reevaluated(monkeypatch):
+    import population_eval
+
+    closes = _walk(400)
+    gen = StrategyGenerator(seed=5)
+    population = [gen.create_strategy() for _ in range(6)]
+    population.append({"id": "gen_x", "conditions": list(reversed(population[0]["conditions"]))})
+    engine = PopulationEvaluator(closes, workers=0)
+    first = engine.evaluate(population, cache=gen.fitness_cache)
+    assert first == engine.evaluate(population)
+
+    calls = []
+    real = population_eval.evaluate_genomes
+    monkeypatch.setattr(population_eval, "evaluate_genomes", lambda g, *a, **k: calls.append(len(g)) or real(g, *a, **k))
+    assert engine.evaluate(population, cache=gen.fitness_cache) == first
+    assert calls == []
+    other = PopulationEvaluator(closes, workers=0, take_profit=0.05)
+    assert other.dataset_version != engine.dataset_version
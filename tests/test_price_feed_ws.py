@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from price_feed_upbit_ws import UpbitWebSocket, decode_message
+
+
+def _book(code, size):
+    return json.dumps({
+        "type": "orderbook",
+        "code": code,
+        "orderbook_units": [{"bid_price": 1, "bid_size": size, "ask_price": 2, "ask_size": 1}],
+        "stream_type": "REALTIME",
+    }).encode("utf-8")
+
+
+def test_decode_binary_frame_keeps_compact_fields():
+    raw = json.dumps({"type": "trade", "code": "KRW-BTC", "trade_price": 5, "trade_volume": 1,
+                      "trade_timestamp": 1, "sequential_id": 99}).encode("utf-8")
+    rec = decode_message(raw)
+    assert rec["trade_price"] == 5
+    assert "sequential_id" not in rec
+
+
+def test_orderbooks_coalesce_latest_wins():
+    ws = UpbitWebSocket("KRW-BTC", coalesce=True, verbose=False)
+    seen = []
+    ws.add_listener(seen.append)
+    for size in range(5):
+        ws.on_message(None, _book("KRW-BTC", size))
+    ws.on_message(None, _book("KRW-ETH", 7))
+    assert ws.drain() == 2
+    sizes = {m["code"]: m["orderbook_units"][0]["bid_size"] for m in seen}
+    assert sizes == {"KRW-BTC": 4, "KRW-ETH": 7}
+    assert ws.get_stats()["totals"]["coalesced"] == 4
+
+
+def test_trade_queue_overflow_counts_drops():
+    ws = UpbitWebSocket("KRW-BTC", coalesce=True, queue_size=3, verbose=False)
+    seen = []
+    ws.add_listener(seen.append)
+    for i in range(5):
+        ws.on_message(None, json.dumps({"type": "trade", "code": "KRW-BTC", "trade_price": i}))
+    ws.drain()
+    assert [m["trade_price"] for m in seen] == [2, 3, 4]
+    assert ws.get_stats()["totals"]["dropped"] == 2
+    assert ws.latest_price == 4
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("psutil")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from replay import ReplayEngine, synthetic_bars
+from agents import clock
+from agents.clock import VirtualClock
+from agents.emotion_axis import EmotionAxis
+
+
+def _strip_timing(report):
+    return {k: v for k, v in report.items() if k not in ("elapsed_sec", "bars_per_sec")}
+
+
+def test_replay_is_deterministic(tmp_path):
+    bars = synthetic_bars(300, seed=3)
+    first = ReplayEngine(bars, seed=3, work_dir=tmp_path / "a").run()
+    second = ReplayEngine(bars, seed=3, work_dir=tmp_path / "b").run()
+    assert _strip_timing(first) == _strip_timing(second)
+    assert first["bars"] == 300
+    assert sum(first["signals"].values()) == 300
+
+
+def test_replay_writes_only_inside_work_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr("agents.strategy_scorer.LOG_BASE_DIR", tmp_path / "live")
+    ReplayEngine(synthetic_bars(40), work_dir=tmp_path / "work").run()
+    assert [p.name for p in tmp_path.iterdir()] == ["work"]
+    assert (tmp_path / "work" / "strategy_scorer").is_dir()
+
+
+def test_emotion_axis_follows_virtual_clock():
+    vc = VirtualClock(1_700_000_000)
+    clock.set_clock(vc)
+    try:
+        axis = EmotionAxis()
+        for _ in range(3):
+            axis.record_result(False)
+        assert axis.in_cooldown()
+        vc.advance(31 * 60)
+        assert not axis.in_cooldown()
+    finally:
+        clock.set_clock(None)
@@ -0,0 +1,98 @@
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from agents.entry_decision import EntryDecisionAgent
+from agents.strategy_generator import StrategyGenerator
+from strategy_compiler import cache_info, compile_strategy, entry_masks
+
+
+def _walk(n, seed=3):
+    rng = random.Random(seed)
+    price = 100.0
+    out = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, 0.01)
+        out.append(price)
+    return out
+
+
+def test_mask_matches_per_bar_conditions():
+    closes = _walk(120)
+    conds = [
+        {"type": "MA", "period": 20, "direction": ">"},
+        {"type": "RSI", "period": 14, "level": 45, "op": ">"},
+    ]
+    mask = compile_strategy({"id": "gen_0", "conditions": conds})(closes)
+    agent = EntryDecisionAgent()
+    for i in range(len(closes)):
+        window = closes[: i + 1]
+        expected = (
+            len(window) >= 20
+            and window[-1] > sum(window[-20:]) / 20
+            and len(window) >= 15
+            and agent._calc_rsi(window, 14) > 45
+        )
+        assert mask[i] == expected
+
+
+def test_macd_condition_uses_histogram_sign():
+    closes = _walk(200, seed=5)
+    mask = compile_strategy([{"type": "MACD", "fast": 12, "slow": 26, "signal": 9}])(closes)
+    agent = EntryDecisionAgent()
+    for i in range(len(closes)):
+        assert mask[i] == (agent._calc_macd(closes[: i + 1]) > 0)
+
+
+def test_compiled_functions_are_shared_by_canonical_genome():
+    a = {"type": "MA", "period": 10, "direction": "<"}
+    b = {"type": "RSI", "period": 20, "level": 70, "op": "<"}
+    before = cache_info().hits
+    f1 = compile_strategy({"id": "gen_1", "conditions": [a, b]})
+    f2 = compile_strategy({"id": "gen_2", "conditions": [b, a, dict(a)]})
+    assert f1 is f2
+    assert cache_info().hits == before + 1
+
+
+def test_population_screen():
+    gen = StrategyGenerator(seed=7)
+    population = [gen.create_strategy() for _ in range(50)]
+    closes = _walk(300)
+    masks = entry_masks(population, closes)
+    assert masks.shape == (50, 300) and masks.dtype == bool
+    assert (masks[0] == compile_strategy(population[0])(closes)).all()
+    assert not compile_strategy({"conditions": []})(closes).any()
+
+
+def test_unknown_condition_is_rejected():
+    with pytest.raises(ValueError):
+        compile_strategy([{"type": "VWAP", "period": 5}])
+
+
+def test_indicator_plan_computes_each_series_once():
+    from strategy_compiler import IndicatorPlan
+
+    gen = StrategyGenerator(seed=9)
+    population = [gen.create_strategy() for _ in range(200)]
+    closes = _walk(400)
+    plan = IndicatorPlan(population)
+    masks = plan.entry_masks(closes)
+    for genome, row in zip(population, masks):
+        assert (row == compile_strategy(genome)(closes)).all()
+    report = plan.memory_report()
+    assert report["unique_series"] < report["naive_series"]
+    assert report["computed_series"] == report["unique_series"]
+    assert report["series_bytes"] == report["unique_series"] * 400 * 8
+    assert report["mask_bytes"] == masks.nbytes
+    # MACD conditions share their EMAs
+    assert ("EMA", 26) in plan.requirements
+
+    store = {}
+    plan.entry_masks(closes, store)
+    plan.entry_masks(closes, store)
+    assert plan.memory_report()["computed_series"] == 0
@@ -17,3 +17,65 @@ def test_evaluate_metrics():
     assert res['total_return'] == pytest.approx(0.25)
     assert res['market_fit'] == 'TREND'
 
+
+def _series(seed, n):
+    import random
+
+    rng = random.Random(seed)
+    return [rng.gauss(0.002, 0.02) for _ in range(n)]
+
+
+def test_incremental_matches_evaluate():
+    from agents.strategy_evaluator import IncrementalEvaluator
+
+    returns = _series(1, 50)
+    trades = [
+        {'market_phase': 'TREND' if i % 3 else 'RANGE', 'max_profit': abs(r) * 1.5, 'max_loss': -abs(r)}
+        for i, r in enumerate(returns)
+    ]
+    live = IncrementalEvaluator()
+    for r, t in zip(returns, trades):
+        live.add(r, t)
+    expected = StrategyEvaluator().evaluate(returns, trades)
+    got = live.metrics()
+    assert got['market_fit'] == expected['market_fit']
+    for key in ('total_return', 'max_drawdown', 'sqn', 'fit_ratio', 'avg_mfe', 'avg_mae'):
+        assert got[key] == pytest.approx(expected[key])
+
+
+def test_batch_matches_evaluate():
+    pytest.importorskip('numpy')
+    from batch_metrics import evaluate_batch, metric_dicts
+
+    rows = [_series(i, n) for i, n in enumerate([0, 1, 2, 30, 200])] + [[0.1, 0.1, 0.1]]
+    profits = [[abs(r) for r in row] for row in rows]
+    batch = metric_dicts(evaluate_batch(rows, max_profit=profits))
+    evaluator = StrategyEvaluator()
+    for row, prof, got in zip(rows, profits, batch):
+        expected = evaluator.evaluate(row, [{'max_profit': p} for p in prof])
+        assert got['trades'] == len(row)
+        for key in ('total_return', 'max_drawdown', 'sqn', 'avg_mfe', 'avg_mae'):
+            assert got[key] == pytest.approx(expected[key], abs=1e-12)
+
+
+def test_bootstrap_intervals():
+    np = pytest.importorskip("numpy")
+    from trade_bootstrap import block_indices, bootstrap_metrics
+
+    idx = block_indices(10, 4, 3, np.random.default_rng(0))
+    assert idx.shape == (4, 10)
+    # every run inside a block steps by one, wrapping around the end
+    steps = (np.diff(idx, axis=1) % 10)[:, [0, 1, 3, 4, 6, 7]]
+    assert (steps == 1).all()
+
+    returns = list(np.random.default_rng(1).normal(0.01, 0.02, 200))
+    metrics = StrategyEvaluator().evaluate(returns, [], bootstrap=10_000, seed=7)
+    boot = metrics["bootstrap"]
+    assert boot["samples"] == 10_000 and boot["block"] == 6
+    for key in ("total_return", "max_drawdown", "sqn"):
+        assert boot[key]["low"] <= metrics[key] <= boot[key]["high"]
+    assert boot["total_return"]["mean"] == pytest.approx(metrics["total_return"], rel=0.05)
+    assert 0.0 <= boot["prob_loss"] < 0.05
+    assert bootstrap_metrics(returns, samples=500, seed=7) == bootstrap_metrics(returns, samples=500, seed=7)
+    assert "bootstrap" not in StrategyEvaluator().evaluate(returns, [])
+    assert StrategyEvaluator().evaluate([0.1], [], bootstrap=100)["bootstrap"] is None
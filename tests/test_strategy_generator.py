@@ -11,3 +11,29 @@ def test_create_strategy():
     assert 'conditions' in strat
     assert isinstance(strat['conditions'], list)
     assert strat['id'].startswith('gen_')
+
+
+def test_genome_signature_ignores_order_and_ids():
+    from agents.strategy_generator import genome_signature
+
+    a = {'type': 'MA', 'period': 20, 'direction': '>'}
+    b = {'type': 'RSI', 'period': 14, 'level': 30, 'op': '<'}
+    assert genome_signature([a, b]) == genome_signature([b, a, a])
+    assert genome_signature([a]) != genome_signature([b])
+    assert genome_signature([dict(b, level=30.0)]) == genome_signature([b])
+
+
+def test_fitness_cache_persists_with_save(tmp_path):
+    gen = StrategyGenerator(seed=1)
+    strat = gen.create_strategy()
+    gen.fitness_cache.put(strat, 'v1', {'sqn': 1.5})
+    twin = {'id': 'gen_99', 'conditions': list(reversed(strat['conditions']))}
+    assert gen.fitness_cache.get(twin, 'v1') == {'sqn': 1.5}
+    assert gen.fitness_cache.get(twin, 'v2') is None
+
+    path = tmp_path / 'strategies.json'
+    gen.save(path)
+    loaded = StrategyGenerator()
+    loaded.load(path)
+    assert loaded.fitness_cache.get(strat, 'v1') == {'sqn': 1.5}
+    assert len(loaded.fitness_cache) == 1
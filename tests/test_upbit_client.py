@@ -0,0 +1,74 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from upbit_client import RequestException, TokenBucket, UpbitClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code = status
+        self._body = body
+        self.headers = headers or {}
+
+    def json(self):
+        return self._body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RequestException(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.urls = []
+
+    def get(self, url, params=None, timeout=None):
+        self.urls.append(url)
+        return self.responses.pop(0)
+
+
+def test_token_bucket_throttles():
+    clock = FakeClock()
+    bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+    waits = [bucket.acquire() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_retry_on_429_then_success():
+    clock = FakeClock()
+    session = FakeSession([FakeResponse(429), FakeResponse(200, [{"ok": 1}])])
+    client = UpbitClient("http://test", session=session, clock=clock, sleep=clock.sleep)
+    assert client.get("/v1/ticker", {"markets": "KRW-BTC"}) == [{"ok": 1}]
+    stats = client.stats()["/v1/ticker"]
+    assert stats["calls"] == 2
+    assert stats["errors"] == 1
+    assert stats["retries"] == 1
+    assert session.urls[0] == "http://test/v1/ticker"
+
+
+def test_gives_up_after_max_retries():
+    clock = FakeClock()
+    session = FakeSession([FakeResponse(503)] * 3)
+    client = UpbitClient("http://test", session=session, max_retries=2, clock=clock, sleep=clock.sleep)
+    with pytest.raises(RequestException):
+        client.get("/v1/orderbook")
+    assert client.stats()["/v1/orderbook"]["calls"] == 3
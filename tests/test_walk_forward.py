@@ -0,0 +1,129 @@
+import os
+import random
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from agents.entry_decision import EntryDecisionAgent
+from agents.features import FeatureCache
+from agents.indicators import IndicatorEngine
+from agents.position_manager import entry_block_reason
+from walk_forward import (
+    DEFAULT_PARAMS,
+    WalkForwardOptimizer,
+    decision_features,
+    decision_masks,
+    grid_candidates,
+    random_candidates,
+    rolling_windows,
+)
+
+
+def _walk(n, seed=8, vol=0.004):
+    rng = random.Random(seed)
+    price = 100.0
+    out = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, vol)
+        out.append(price)
+    return out
+
+
+@pytest.mark.parametrize("engine", [False, True])
+@pytest.mark.parametrize("strategy", ["trend_follow", "reversal"])
+def test_masks_match_live_decisions(strategy, engine):
+    closes = _walk(200)
+    times = [i * 60 for i in range(len(closes))]
+    rng = random.Random(1)
+    bids = [rng.uniform(0.5, 1.5) for _ in closes]
+    asks = [rng.uniform(0.5, 1.5) for _ in closes]
+    # conflict 0.8 only triggers with the MACD term, so the MACD column matters
+    params = dict(DEFAULT_PARAMS, min_score=40.0, rsi=52.0, diff=2.0, conflict=0.8)
+    features = decision_features(closes, bid_volume=bids, ask_volume=asks, window=20)
+    if engine:
+        # TradingApp reads the MACD histogram from its persistent engine
+        indicators = IndicatorEngine(capacity=500)
+        cache = FeatureCache("KRW-BTC", indicators)
+        indicators.sync(closes[:19], times[:19])
+        indicators.macd_histogram()
+    else:
+        # agents given only the 20-close list compute no MACD
+        features = dict(features, macd=np.zeros(len(closes)))
+    entries, exits = decision_masks(features, params, strategy)
+    assert not engine or (features["macd"] != 0).any()
+    thresholds = {k: params[k] for k in ("rsi", "volatility", "diff", "conflict")}
+    for i in range(19, len(closes)):
+        agent = EntryDecisionAgent(thresholds=thresholds)
+        book = {"bids": [], "asks": [], "bid_volume": bids[i], "ask_volume": asks[i]}
+        window = closes[i - 19: i + 1]
+        if engine:
+            indicators.sync(window, times[i - 19: i + 1])
+            snapshot = cache.get(window, book, times[i - 19: i + 1])
+            signal = agent.evaluate(strategy, window, None, book, features=snapshot)
+        else:
+            signal = agent.evaluate(strategy, window, None, book)
+        score = agent.last_score_percent
+        reason = entry_block_reason(False, None, score, min_score=params["min_score"])
+        allow, _ = agent.decide_entry(signal, reason, score)
+        assert entries[i] == allow
+        assert exits[i] == (signal == "SELL")
+    assert entries.any() and exits.any()
+
+
+def test_rolling_windows():
+    assert rolling_windows(100, 40, 20) == [(0, 40, 40, 60), (20, 60, 60, 80), (40, 80, 80, 100)]
+
+
+def test_candidates_skip_unused_parameters():
+    grid = grid_candidates(strategy="trend_follow")
+    assert len(grid) * 3 == len(grid_candidates(strategy="orderbook_weighted"))
+    assert {c["min_confidence"] for c in grid} == {DEFAULT_PARAMS["min_confidence"]}
+    sample = random_candidates(50, seed=2, strategy="trend_follow")
+    assert len({tuple(sorted(c.items())) for c in sample}) == 50
+    assert {c["min_confidence"] for c in sample} == {DEFAULT_PARAMS["min_confidence"]}
+    # asking for more than the space holds returns each set once
+    everything = random_candidates(len(grid) + 100, strategy="trend_follow")
+    assert everything[0] == DEFAULT_PARAMS
+    assert len(everything) == len(grid)
+    assert len({tuple(sorted(c.items())) for c in everything}) == len(grid)
+
+
+def test_walk_forward_report():
+    features = decision_features(_walk(3000, vol=0.006), window=20)
+    candidates = random_candidates(24, seed=1, strategy="trend_follow")
+    assert candidates[0] == DEFAULT_PARAMS
+    serial = WalkForwardOptimizer(features, train_bars=1000, test_bars=500, workers=0, min_trades=1)
+    parallel = WalkForwardOptimizer(features, train_bars=1000, test_bars=500, workers=2, chunk_size=6, min_trades=1)
+    assert np.allclose(serial.evaluate(candidates), parallel.evaluate(candidates))
+    report = serial.run(candidates)
+    assert len(report["windows"]) == 4
+    for window in report["windows"]:
+        if window["params"] is not None:
+            assert window["params"] in candidates
+            assert window["train_stats"]["trades"] >= 1
+    for entry in report["stable"]:
+        assert entry["selection_rate"] >= 0.5
+    assert report["out_of_sample"]["windows"] <= 4
+
+
+def test_load_recorded_aligns_books_to_bars(tmp_path):
+    from market_recorder import MarketRecorder
+    from walk_forward import load_recorded
+
+    start = 1_700_000_040
+    rec = MarketRecorder(tmp_path)
+    rec.record_candles("KRW-BTC", [
+        {"timestamp": start + 60 * i, "open": 1, "high": 1, "low": 1, "close": 100 + i, "volume": 1}
+        for i in range(3)
+    ])
+    unit = {"bid_price": 99.0, "bid_size": 3.0, "ask_price": 101.0, "ask_size": 1.0}
+    rec.record_orderbook("KRW-BTC", (start + 90) * 1000, [unit])
+    rec.flush()
+    data = load_recorded("KRW-BTC", start * 1000, (start + 180) * 1000, root=tmp_path)
+    assert data["closes"].tolist() == [100, 101, 102]
+    # the first bar closed before any book was recorded
+    assert data["bid_volume"].tolist() == [0.0, 3.0, 3.0]
+    assert data["notional_score"][1] == pytest.approx((297 - 101) / (297 + 101))
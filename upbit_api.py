@@ -1,14 +1,15 @@
-import requests
+import os
+import sys
 from typing import Dict, Any
 
+sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
+
+from upbit_client import get_client
+
 
 def get_orderbook(market: str = "KRW-BTC", depth: int = 5) -> Dict[str, Any]:
     """Return simplified orderbook snapshot from Upbit."""
-    url = "https://api.upbit.com/v1/orderbook"
-    params = {"markets": market}
-    response = requests.get(url, params=params, timeout=5)
-    response.raise_for_status()
-    data = response.json()[0]
+    data = get_client().get("/v1/orderbook", {"markets": market})[0]
     units = data.get("orderbook_units", [])[:depth]
     bids = [{"price": u["bid_price"], "volume": u["bid_size"]} for u in units]
     asks = [{"price": u["ask_price"], "volume": u["ask_size"]} for u in units]
@@ -17,11 +18,7 @@ def get_orderbook(market: str = "KRW-BTC", depth: int = 5) -> Dict[str, Any]:
 
 def get_current_price(market: str = "KRW-BTC") -> Dict[str, Any]:
     """Return current trade price and change rate."""
-    url = "https://api.upbit.com/v1/ticker"
-    params = {"markets": market}
-    response = requests.get(url, params=params, timeout=5)
-    response.raise_for_status()
-    data = response.json()[0]
+    data = get_client().get("/v1/ticker", {"markets": market})[0]
     return {
         "trade_price": data.get("trade_price"),
         "signed_change_rate": data.get("signed_change_rate"),